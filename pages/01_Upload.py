@@ -19,10 +19,10 @@ from fuzzywuzzy import fuzz, process
 from fuzzywuzzy.utils import full_process
 import mysql.connector
 import psycopg2
-import math
 from difflib import SequenceMatcher
 from utils.guided_tour import guided_tour
 from utils.milestone_rewards import milestone_rewards
+from utils.geospatial import spatial_join
 
 
 
@@ -166,45 +166,6 @@ def perform_range_join(df1, df2, col1, col2, range_col, tolerance=1):
     
     return matches
 
-def calculate_distance(lat1, lon1, lat2, lon2):
-    """Calculate distance between two points using Haversine formula"""
-    R = 6371  # Earth's radius in km
-    
-    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    
-    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-    c = 2 * math.asin(math.sqrt(a))
-    
-    return R * c
-
-def perform_spatial_join(df1, df2, lat1_col, lon1_col, lat2_col, lon2_col, max_distance=1):
-    """Join based on spatial proximity"""
-    matches = []
-    
-    for idx1, row1 in df1.iterrows():
-        if pd.isna(row1[lat1_col]) or pd.isna(row1[lon1_col]):
-            continue
-            
-        for idx2, row2 in df2.iterrows():
-            if pd.isna(row2[lat2_col]) or pd.isna(row2[lon2_col]):
-                continue
-                
-            distance = calculate_distance(
-                row1[lat1_col], row1[lon1_col],
-                row2[lat2_col], row2[lon2_col]
-            )
-            
-            if distance <= max_distance:
-                matches.append({
-                    'df1_idx': idx1,
-                    'df2_idx': idx2,
-                    'distance': distance
-                })
-    
-    return matches
-
 # ==================== DATABASE CONNECTIONS ====================
 def connect_to_database(db_type, connection_params):
     """Enhanced database connection with multiple database types"""
@@ -1292,14 +1253,14 @@ with merge_tabs[1]:
                 
                 if st.button("🗺️ Perform Spatial Join"):
                     try:
-                        matches = perform_spatial_join(main_df, merge_df, main_lat, main_lon, merge_lat, merge_lon, max_distance)
+                        matches = spatial_join(main_df, merge_df, main_lat, main_lon, merge_lat, merge_lon, max_distance)
                         
-                        if matches:
+                        if len(matches) > 0:
                             st.success(f"✅ Found {len(matches)} spatial matches")
                             
                             # Create a preview of matches
                             match_preview = []
-                            for match in matches[:10]:
+                            for match in matches.head(10).to_dict('records'):
                                 match_preview.append({
                                     'Main Coordinates': f"({main_df.loc[match['df1_idx'], main_lat]:.4f}, {main_df.loc[match['df1_idx'], main_lon]:.4f})",
                                     'Matched Coordinates': f"({merge_df.loc[match['df2_idx'], merge_lat]:.4f}, {merge_df.loc[match['df2_idx'], merge_lon]:.4f})",
@@ -12,6 +12,7 @@ import matplotlib.pyplot as plt
 from sklearn.preprocessing import LabelEncoder
 import statsmodels.api as sm
 from statsmodels.stats.outliers_influence import variance_inflation_factor
+from utils.type_inference import infer_column_types
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -268,63 +269,35 @@ with overview_tabs[2]:
     def detect_column_types(df):
         """Enhanced column type detection"""
         type_info = {}
+        text_labels = {
+            'integer': "Numeric (Text)", 'float': "Numeric (Text)",
+            'currency': "Currency (Text)", 'percent': "Percentage (Text)"
+        }
         
-        for col in df.columns:
-            col_data = df[col].dropna()
+        for col, inference in infer_column_types(df).items():
+            semantic_type = inference['semantic_type']
+            is_numeric = pd.api.types.is_numeric_dtype(df[col])
             
-            if len(col_data) == 0:
+            if semantic_type == 'empty':
                 type_info[col] = "Empty"
-                continue
-            
-            # Numeric detection
-            if pd.api.types.is_numeric_dtype(col_data):
-                if col_data.dtype in ['int64', 'int32', 'int16', 'int8']:
-                    if col_data.nunique() == 2:
-                        type_info[col] = "Boolean (Numeric)"
-                    elif col_data.nunique() / len(col_data) < 0.05:
-                        type_info[col] = "Categorical (Numeric)"
-                    else:
-                        type_info[col] = "Integer"
-                else:
-                    type_info[col] = "Float"
-            
-            # DateTime detection
-            elif col_data.dtype == 'datetime64[ns]':
-                type_info[col] = "DateTime"
-            
-            # String/Object detection
+            elif semantic_type == 'boolean':
+                type_info[col] = "Boolean (Numeric)" if is_numeric else "Boolean (Text)"
+            elif semantic_type == 'datetime':
+                type_info[col] = "DateTime" if pd.api.types.is_datetime64_any_dtype(df[col]) else "Potential DateTime"
+            elif semantic_type in text_labels and not is_numeric:
+                type_info[col] = text_labels[semantic_type]
+            elif semantic_type == 'integer':
+                type_info[col] = "Categorical (Numeric)" if inference['sample_unique_ratio'] < 0.05 else "Integer"
+            elif semantic_type == 'float':
+                type_info[col] = "Float"
+            elif semantic_type == 'categorical':
+                type_info[col] = "Categorical"
+            elif semantic_type == 'id':
+                type_info[col] = "ID Column"
+            elif semantic_type == 'geo':
+                type_info[col] = "Geospatial"
             else:
-                # Try to parse as datetime
-                try:
-                    sample_data = col_data.astype(str).head(100)
-                    parsed_dates = pd.to_datetime(sample_data, errors='coerce', infer_datetime_format=True)
-                    success_rate = parsed_dates.notna().sum() / len(sample_data)
-                    if success_rate > 0.7:
-                        type_info[col] = "Potential DateTime"
-                        continue
-                except:
-                    pass
-                
-                # Check for boolean strings
-                unique_vals = set(col_data.astype(str).str.lower().unique())
-                if unique_vals.issubset({'true', 'false', 'yes', 'no', '1', '0', 't', 'f', 'y', 'n'}):
-                    type_info[col] = "Boolean (Text)"
-                
-                # Check for categorical
-                elif col_data.nunique() / len(col_data) < 0.05:
-                    type_info[col] = "Categorical"
-                
-                # Check for ID columns
-                elif col.lower() in ['id', 'user_id', 'customer_id', 'order_id'] or '_id' in col.lower():
-                    type_info[col] = "ID Column"
-                
-                # Check for geospatial
-                elif any(geo_keyword in col.lower() for geo_keyword in ['lat', 'lon', 'latitude', 'longitude', 'address', 'zip', 'postal']):
-                    type_info[col] = "Geospatial"
-                
-                # Default to text
-                else:
-                    type_info[col] = "Text"
+                type_info[col] = "Text"
         
         return type_info
     
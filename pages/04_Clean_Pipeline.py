@@ -16,6 +16,10 @@ import math
 import seaborn as sns
 import matplotlib.pyplot as plt
 from collections import Counter
+from utils.missingness_engine import get_missingness_profile, co_missing_columns
+from utils.visualizations import create_missing_heatmap
+from utils.type_inference import infer_column_types, is_text_column, convert_column, NUMERIC_SEMANTIC_TYPES, MATCH_THRESHOLD
+from utils.text_profiling import get_text_profile
 
 import warnings
 warnings.filterwarnings('ignore')
@@ -164,15 +168,15 @@ def ai_analyze_columns_for_treatment(df, analysis_type):
                 })
     
     elif analysis_type == "text_cleaning":
-        text_cols = df.select_dtypes(include=['object']).columns
+        text_cols = [col for col in df.columns if is_text_column(df[col])]
         for col in text_cols:
             issues = []
-            sample_text = df[col].dropna().astype(str).head(100)
+            pattern_counts = get_text_profile(df[col].dropna().astype(str))['pattern_counts']
             
-            # Check for common text issues
-            has_extra_spaces = sample_text.str.contains(r'\s{2,}').any()
-            has_special_chars = sample_text.str.contains(r'[^\w\s]').any()
-            has_mixed_case = sample_text.str.islower().any() and sample_text.str.isupper().any()
+            # Check for common text issues across the whole column
+            has_extra_spaces = pattern_counts['extra_spaces'] > 0
+            has_special_chars = pattern_counts['special_chars'] > 0
+            has_mixed_case = pattern_counts['all_lower'] > 0 and pattern_counts['all_caps'] > 0
             
             if has_extra_spaces:
                 issues.append("extra whitespace")
@@ -704,16 +708,8 @@ class SmartColumnTreatmentExplainer:
         if issue_type == "missing_values":
             # Check if other columns have missing values in same rows
             if column in self.df.columns:
-                missing_mask = self.df[column].isnull()
-                correlated_missing = []
-                
-                for other_col in self.df.columns:
-                    if other_col != column:
-                        other_missing = self.df[other_col].isnull()
-                        # Check if missing values often occur together
-                        correlation = (missing_mask & other_missing).sum() / missing_mask.sum() if missing_mask.sum() > 0 else 0
-                        if correlation > 0.5:
-                            correlated_missing.append(other_col)
+                # Co-missingness comes from the cached bit-packed profile of this dataset version
+                correlated_missing = co_missing_columns(get_missingness_profile(self.df), column, min_overlap=0.5)
                 
                 if correlated_missing:
                     dependencies.append({
@@ -988,6 +984,7 @@ def apply_auto_data_types(df):
     """Apply automatic data type detection and conversion"""
     activities = []
     suggestions = auto_detect_column_types(df)
+    inferred = infer_column_types(df)
     conversions_made = 0
     
     for col, suggested_type in suggestions.items():
@@ -995,17 +992,16 @@ def apply_auto_data_types(df):
         
         if suggested_type != current_type:
             try:
-                if suggested_type == 'datetime64':
-                    df[col] = pd.to_datetime(df[col], errors='coerce')
-                    activities.append(f"Converted {col} from {current_type} to datetime")
-                    conversions_made += 1
-                elif suggested_type == 'numerical':
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-                    activities.append(f"Converted {col} from {current_type} to numeric")
-                    conversions_made += 1
-                elif suggested_type == 'boolean':
-                    df[col] = df[col].astype('bool')
-                    activities.append(f"Converted {col} from {current_type} to boolean")
+                if suggested_type in ('datetime64', 'numerical', 'boolean'):
+                    if suggested_type == 'numerical' and pd.api.types.is_numeric_dtype(df[col]):
+                        continue
+                    # Validate the sample-based suggestion against the whole column
+                    converted, success_rate = convert_column(df[col], inferred[col])
+                    if success_rate < MATCH_THRESHOLD:
+                        activities.append(f"Skipped {col}: only {success_rate:.1%} of values convert to {suggested_type}")
+                        continue
+                    df[col] = converted
+                    activities.append(f"Converted {col} from {current_type} to {suggested_type}")
                     conversions_made += 1
                 elif suggested_type == 'categorical':
                     df[col] = df[col].astype('category')
@@ -1022,32 +1018,14 @@ def apply_auto_data_types(df):
 def auto_detect_column_types(df):
     """Automatically detect and suggest column types"""
     suggestions = {}
-    for col in df.columns:
-        # Try to detect datetime
-        if df[col].dtype == 'object':
-            try:
-                pd.to_datetime(df[col].dropna().head(100), infer_datetime_format=True)
-                suggestions[col] = 'datetime64'
-                continue
-            except:
-                pass
-        
-        # Detect boolean
-        unique_vals = df[col].dropna().unique()
-        if len(unique_vals) == 2 and all(str(v).lower() in ['true', 'false', '1', '0', 'yes', 'no'] for v in unique_vals):
+    for col, inference in infer_column_types(df).items():
+        semantic_type = inference['semantic_type']
+        if semantic_type == 'datetime' and is_text_column(df[col]):
+            suggestions[col] = 'datetime64'
+        elif semantic_type == 'boolean':
             suggestions[col] = 'boolean'
-            continue
-            
-        # Detect numerical
-        if df[col].dtype in ['int64', 'float64']:
+        elif df[col].dtype in ['int64', 'float64'] or (is_text_column(df[col]) and semantic_type in NUMERIC_SEMANTIC_TYPES):
             suggestions[col] = 'numerical'
-        elif df[col].dtype == 'object':
-            # Check if can be converted to numeric
-            try:
-                pd.to_numeric(df[col].dropna().head(100))
-                suggestions[col] = 'numerical'
-            except:
-                suggestions[col] = 'categorical'
         else:
             suggestions[col] = 'categorical'
     
@@ -1461,7 +1439,7 @@ elif current_tab == 2:
         with col2:
             # Missing Values Heatmap
             st.markdown("#### Missing Values Heatmap")
-            fig_missing = px.imshow(df.isnull().T, aspect="auto", title="Missing Values Pattern")
+            fig_missing = create_missing_heatmap(df)
             st.plotly_chart(fig_missing, use_container_width=True)
         
         # Manual Controls
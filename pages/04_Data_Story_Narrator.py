@@ -6,6 +6,7 @@ import plotly.graph_objects as go
 from datetime import datetime
 import json
 import random
+from utils.visualizations import create_missing_heatmap
 
 # Page config
 st.set_page_config(page_title="Data Story Narrator - KlinItAll", layout="wide")
@@ -456,11 +457,9 @@ with col1:
                 
                 # Missing data heatmap
                 if len(missing_cols) > 1:
-                    missing_data = df[missing_cols].isnull()
-                    fig = px.imshow(missing_data.T, 
-                                  title="The Missing Data Map",
-                                  color_continuous_scale=["lightblue", "darkred"])
-                    fig.update_layout(height=400)
+                    fig = create_missing_heatmap(df[missing_cols])
+                    fig.update_layout(title="The Missing Data Map", height=400)
+                    fig.update_coloraxes(colorscale=["lightblue", "darkred"])
                     st.plotly_chart(fig, use_container_width=True)
             else:
                 st.success("🎉 No missing data mysteries in this dataset!")
@@ -7,9 +7,9 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import re  # For more robust text cleaning
 import nltk  # For NLP tasks
-from nltk.sentiment.vader import SentimentIntensityAnalyzer  # For sentiment analysis
 from nltk.corpus import stopwords  # For stopword removal
 from nltk.tokenize import word_tokenize  # For tokenization
+from utils.sentiment_engine import analyze_sentiment, score_text, ENGINE_COLUMNS
 
 # Download necessary NLTK data (only needs to be done once)
 try:
@@ -212,9 +212,7 @@ def data_visualizations(df):
 
 def perform_sentiment_analysis(text):
     """Performs sentiment analysis on the given text using VADER."""
-    sid = SentimentIntensityAnalyzer()
-    scores = sid.polarity_scores(text)
-    return scores
+    return dict(zip(ENGINE_COLUMNS['vader'], score_text(text, engine='vader')))
 
 def remove_stopwords(text):
     """Removes stopwords from the given text."""
@@ -294,9 +292,11 @@ def answer_question(question, df=None):
             if not text_cols.empty:
                 # Perform sentiment analysis on the first text column
                 first_text_col = text_cols[0]
-                sentiment_scores = df[first_text_col].astype(str).apply(perform_sentiment_analysis)
+                sentiment_scores, sentiment_stats = analyze_sentiment(df[first_text_col].astype(str), engine='vader')
                 st.write(f"Sentiment analysis scores for the first text column ('{first_text_col}'):")
                 st.write(sentiment_scores)
+                st.caption(f"{sentiment_stats['distinct_texts']:,} distinct texts, {sentiment_stats['scored']:,} newly scored, "
+                           f"{sentiment_stats['rows_per_second']:,.0f} rows/s")
                 return "I've performed sentiment analysis on the first text column of your dataset.  See the results above!"
             else:
                 return "There are no text columns in your dataset to perform sentiment analysis on."
@@ -4,6 +4,7 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
+from utils.type_inference import infer_column_types, is_text_column, convert_column, MATCH_THRESHOLD
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -26,59 +27,22 @@ def auto_detect_column_types(df):
     suggestions = {}
     confidence_scores = {}
     
+    # Sample-based inference, cached per column fingerprint across reruns
+    inferred = infer_column_types(df)
+    
     for col in df.columns:
-        sample_data = df[col].dropna().head(100)  # Use larger sample
         current_type = str(df[col].dtype)
         
-        # Initialize with current type
-        suggestions[col] = current_type
-        confidence_scores[col] = 0.5  # Default confidence
-        
-        # Skip if already numeric or datetime
-        if df[col].dtype in ['int64', 'float64', 'datetime64[ns]']:
+        # Keep existing numeric/datetime types as they are
+        if not is_text_column(df[col]):
+            suggestions[col] = current_type
             confidence_scores[col] = 0.9
             continue
         
-        if df[col].dtype == 'object' and len(sample_data) > 0:
-            # Test for datetime
-            try:
-                parsed_dates = pd.to_datetime(sample_data, infer_datetime_format=True, errors='coerce')
-                success_rate = parsed_dates.notna().sum() / len(sample_data)
-                if success_rate > 0.8:
-                    suggestions[col] = 'datetime64'
-                    confidence_scores[col] = success_rate
-                    continue
-            except:
-                pass
-            
-            # Test for numeric
-            try:
-                numeric_series = pd.to_numeric(sample_data, errors='coerce')
-                success_rate = numeric_series.notna().sum() / len(sample_data)
-                if success_rate > 0.8:
-                    # Determine if int or float
-                    if all(val == int(val) for val in numeric_series.dropna()):
-                        suggestions[col] = 'int64'
-                    else:
-                        suggestions[col] = 'float64'
-                    confidence_scores[col] = success_rate
-                    continue
-            except:
-                pass
-            
-            # Test for boolean
-            unique_vals = sample_data.str.lower().unique()
-            bool_patterns = ['true', 'false', '1', '0', 'yes', 'no', 'y', 'n', 't', 'f']
-            if len(unique_vals) <= 3 and all(str(val).lower() in bool_patterns for val in unique_vals):
-                suggestions[col] = 'boolean'
-                confidence_scores[col] = 0.9
-                continue
-            
-            # Default to category for object types
-            suggestions[col] = 'category'
-            confidence_scores[col] = 0.7
+        suggestions[col] = inferred[col]['storage_type']
+        confidence_scores[col] = inferred[col]['confidence']
     
-    return suggestions, confidence_scores
+    return suggestions, confidence_scores, inferred
 
 # Data Type Analysis
 st.markdown("### 📊 Current Data Types Analysis")
@@ -87,7 +51,7 @@ col1, col2 = st.columns([2, 1])
 
 with col1:
     # Get type suggestions
-    type_suggestions, confidence_scores = auto_detect_column_types(df)
+    type_suggestions, confidence_scores, type_inferences = auto_detect_column_types(df)
     
     # Create analysis dataframe
     type_analysis = []
@@ -220,20 +184,14 @@ with col1:
                     col = rec['Column']
                     target = rec['To']
                     
-                    if target == "datetime64":
-                        df[col] = pd.to_datetime(df[col], errors='coerce')
-                    elif target == "boolean":
-                        bool_map = {'true': True, 'false': False, '1': True, '0': False, 
-                                   'yes': True, 'no': False, 'y': True, 'n': False}
-                        if df[col].dtype == 'object':
-                            df[col] = df[col].str.lower().map(bool_map).fillna(df[col])
-                        df[col] = df[col].astype('bool')
-                    elif target in ["int64", "float64"]:
-                        df[col] = pd.to_numeric(df[col], errors='coerce')
-                        if target == "int64":
-                            df[col] = df[col].astype('int64')
-                    elif target == "category":
-                        df[col] = df[col].astype('category')
+                    # Full-column validation: the suggestion came from a sample
+                    converted, success_rate = convert_column(df[col], type_inferences[col])
+                    if success_rate < MATCH_THRESHOLD:
+                        failed_conversions.append(f"{col}: only {success_rate:.1%} of values match {target}")
+                        continue
+                    if target == "int64" and str(converted.dtype) != "int64":
+                        converted = converted.astype('Int64')
+                    df[col] = converted
                     
                     conversions_made += 1
                 
@@ -3,10 +3,11 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from sklearn.impute import SimpleImputer, KNNImputer
-from sklearn.experimental import enable_iterative_imputer
-from sklearn.impute import IterativeImputer
+from sklearn.impute import SimpleImputer
 from datetime import datetime
+from utils.imputation_engine import knn_impute, iterative_impute, group_impute
+from utils.missingness_engine import get_missingness_profile
+from utils.visualizations import create_missing_heatmap
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -76,15 +77,16 @@ with analysis_tabs[0]:
     with col2:
         # Missing values heatmap
         st.markdown("#### Missing Value Heatmap")
-        if len(df) <= 1000:  # Only show for reasonable sizes
-            missing_matrix = df.isnull().astype(int)
-            fig = px.imshow(missing_matrix.T, aspect="auto", 
-                          color_continuous_scale=['white', 'red'],
-                          title="Missing Values Pattern")
-            fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.info("Dataset too large for heatmap visualization")
+        heatmap_mode = st.radio(
+            "Heatmap view:",
+            ['auto', 'buckets', 'patterns'],
+            format_func=lambda x: {'auto': 'Auto', 'buckets': 'Row buckets', 'patterns': 'Top patterns'}[x],
+            horizontal=True,
+            help="Large datasets are aggregated so the chart size stays constant"
+        )
+        fig = create_missing_heatmap(df, mode=heatmap_mode)
+        fig.update_layout(height=400)
+        st.plotly_chart(fig, use_container_width=True)
 
 with analysis_tabs[1]:
     st.markdown("### 🔍 Missing Value Pattern Analysis")
@@ -95,7 +97,8 @@ with analysis_tabs[1]:
         st.markdown("#### Missing Value Correlation")
         
         # Calculate correlation between missing value patterns
-        missing_corr = df.isnull().corr()
+        missingness_profile = get_missingness_profile(df)
+        missing_corr = missingness_profile['correlation']
         
         # Show only columns with missing values
         relevant_cols = [col for col in missing_corr.columns if col in missing_cols.index]
@@ -116,12 +119,27 @@ with analysis_tabs[1]:
         st.markdown("#### Missing Value Distribution")
         
         # Distribution of missing values across rows
-        missing_per_row = df.isnull().sum(axis=1)
+        missing_per_row = missingness_profile['missing_per_row']
         
-        fig = px.histogram(missing_per_row, 
-                         title="Distribution of Missing Values per Row",
-                         labels={'value': 'Missing Values per Row', 'count': 'Frequency'})
+        fig = px.bar(x=missing_per_row.index, y=missing_per_row.values,
+                     title="Distribution of Missing Values per Row",
+                     labels={'x': 'Missing Values per Row', 'y': 'Frequency'})
         st.plotly_chart(fig, use_container_width=True)
+    
+    st.markdown("#### Most Frequent Missing Patterns")
+    
+    # Each pattern is a distinct combination of missing columns within a row
+    patterns = missingness_profile['patterns']
+    pattern_rows = missingness_profile['pattern_rows']
+    pattern_display = pd.DataFrame({
+        'Missing Columns': [
+            ', '.join(col for col, missing in zip(missing_cols.index, row) if missing) or '(complete row)'
+            for row in patterns[missing_cols.index].to_numpy()
+        ],
+        'Rows': pattern_rows.map('{:,}'.format),
+        'Row %': (pattern_rows / max(missingness_profile['n_rows'], 1) * 100).round(2).astype(str)
+    })
+    st.dataframe(pattern_display.head(20), use_container_width=True, hide_index=True)
 
 with analysis_tabs[2]:
     st.markdown("### 🔧 Missing Value Treatment")
@@ -189,9 +207,25 @@ with analysis_tabs[2]:
         
         if "KNN" in treatment_method:
             n_neighbors = st.slider("Number of neighbors:", 1, 10, 5)
+            knn_reference_sample = st.number_input(
+                "Reference rows (sampled from complete rows):",
+                min_value=1000, max_value=max(1000, len(df)), value=min(max(1000, len(df)), 200000), step=1000,
+                help="Neighbours are searched among this many complete rows; smaller is faster on very large data"
+            )
         
         if "Iterative" in treatment_method:
             max_iter = st.slider("Maximum iterations:", 1, 20, 10)
+            iter_training_sample = st.number_input(
+                "Training rows per column model:",
+                min_value=1000, max_value=max(1000, len(df)), value=min(max(1000, len(df)), 100000), step=1000,
+                help="Each round fits column models on this many sampled rows"
+            )
+            iter_tol = st.select_slider(
+                "Convergence tolerance:",
+                options=[0.001, 0.005, 0.01, 0.05, 0.1],
+                value=0.01,
+                help="Stop once imputed values change by less than this many standard deviations"
+            )
     
     with col2:
         st.markdown("#### Preview & Apply")
@@ -247,9 +281,13 @@ with analysis_tabs[2]:
                     # KNN Imputation for numeric columns
                     numeric_cols = df.select_dtypes(include=[np.number]).columns
                     if selected_column in numeric_cols:
-                        imputer = KNNImputer(n_neighbors=n_neighbors)
-                        df[numeric_cols] = imputer.fit_transform(df[numeric_cols])
-                        result_msg = f"Applied KNN imputation (k={n_neighbors})"
+                        df, knn_stats = knn_impute(
+                            df, numeric_cols, n_neighbors=n_neighbors, reference_sample=int(knn_reference_sample)
+                        )
+                        result_msg = (f"Applied KNN imputation (k={n_neighbors}, {knn_stats['reference_size']:,} reference rows, "
+                                      f"{knn_stats['elapsed_seconds']:.1f}s)")
+                        if knn_stats['empty_columns']:
+                            result_msg += f"; skipped empty columns: {', '.join(map(str, knn_stats['empty_columns']))}"
                     else:
                         st.error("KNN imputation only available for numeric columns")
                         st.stop()
@@ -258,9 +296,16 @@ with analysis_tabs[2]:
                     # Iterative Imputation for numeric columns
                     numeric_cols = df.select_dtypes(include=[np.number]).columns
                     if selected_column in numeric_cols:
-                        imputer = IterativeImputer(max_iter=max_iter, random_state=42)
-                        df[numeric_cols] = imputer.fit_transform(df[numeric_cols])
-                        result_msg = f"Applied iterative imputation (max_iter={max_iter})"
+                        df, iter_stats = iterative_impute(
+                            df, numeric_cols, max_iter=max_iter, tol=iter_tol,
+                            training_sample=int(iter_training_sample)
+                        )
+                        round_times = ", ".join(f"{r['seconds']:.1f}s" for r in iter_stats['rounds'])
+                        stop_reason = "converged" if iter_stats['converged'] else "reached max_iter"
+                        result_msg = (f"Applied iterative imputation ({len(iter_stats['rounds'])} rounds, {stop_reason}; "
+                                      f"round times: {round_times or 'n/a'})")
+                        if iter_stats['empty_columns']:
+                            result_msg += f"; skipped empty columns: {', '.join(map(str, iter_stats['empty_columns']))}"
                     else:
                         st.error("Iterative imputation only available for numeric columns")
                         st.stop()
@@ -327,8 +372,7 @@ with analysis_tabs[3]:
                             # More missing - use KNN if possible
                             numeric_cols = df.select_dtypes(include=[np.number]).columns
                             if len(numeric_cols) > 1:
-                                imputer = KNNImputer(n_neighbors=5)
-                                df[numeric_cols] = imputer.fit_transform(df[numeric_cols])
+                                df, _ = knn_impute(df, numeric_cols, n_neighbors=5)
                                 treatments_applied.append(f"✅ {col}: Applied KNN imputation")
                             else:
                                 fill_value = col_data.median()
@@ -366,6 +410,67 @@ with analysis_tabs[3]:
             st.success(f"✅ Auto-imputation complete! Processed {len(treatments_applied)} columns.")
             st.rerun()
         
+        st.markdown("""
+        <div class="imputation-option">
+            <strong>🏬 Group-Wise Imputation</strong><br>
+            Fill gaps using statistics within each group (e.g. median per store or region)
+        </div>
+        """, unsafe_allow_html=True)
+        
+        group_fill_columns = st.multiselect(
+            "Columns to fill:",
+            missing_cols.index.tolist(),
+            default=missing_cols.index.tolist(),
+            key="group_fill_columns"
+        )
+        group_by_columns = st.multiselect(
+            "Group by:",
+            [col for col in df.columns if col not in group_fill_columns],
+            help="Missing values are filled from rows in the same group"
+        )
+        group_strategy = st.selectbox(
+            "Group fill strategy:",
+            ['median', 'mean', 'mode', 'ffill', 'bfill', 'interpolate'],
+            format_func=lambda x: {
+                'median': 'Group median',
+                'mean': 'Group mean',
+                'mode': 'Group mode',
+                'ffill': 'Forward fill within group',
+                'bfill': 'Backward fill within group',
+                'interpolate': 'Interpolate within group'
+            }[x]
+        )
+        group_time_column = None
+        if group_strategy in ['ffill', 'bfill', 'interpolate']:
+            time_choice = st.selectbox(
+                "Order rows by (optional):",
+                ["Current row order"] + [col for col in df.columns if col not in group_fill_columns + group_by_columns]
+            )
+            group_time_column = None if time_choice == "Current row order" else time_choice
+        
+        if st.button("🏬 Apply Group-Wise Imputation") and group_fill_columns and group_by_columns:
+            try:
+                df, group_stats = group_impute(
+                    df, group_fill_columns, group_by_columns, group_strategy, time_column=group_time_column
+                )
+                st.session_state.current_dataset = df
+                
+                if 'processing_log' not in st.session_state:
+                    st.session_state.processing_log = []
+                
+                st.session_state.processing_log.append({
+                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    'action': 'Missing Value Treatment',
+                    'details': (f"Applied group {group_strategy} by {', '.join(group_by_columns)} to "
+                                f"{len(group_stats['columns'])} columns: filled {group_stats['values_filled']:,} values "
+                                f"across {group_stats['groups']:,} groups")
+                })
+                
+                st.success(f"✅ Filled {group_stats['values_filled']:,} values across {group_stats['groups']:,} groups")
+                st.rerun()
+            except Exception as e:
+                st.error(f"❌ Group-wise imputation failed: {str(e)}")
+        
         st.markdown("""
         <div class="imputation-option">
             <strong>🗑️ Drop Strategy</strong><br>
@@ -7,6 +7,8 @@ from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
 from scipy import stats
 from datetime import datetime
+from utils.outlier_engine import detect_outliers_mahalanobis, detect_outliers_lof, detect_outliers_rolling
+from utils.quantile_sketch import streaming_iqr_bounds, iter_chunks
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -29,14 +31,18 @@ if len(numeric_cols) == 0:
     st.stop()
 
 # Outlier Detection Functions
-def detect_outliers_iqr(data, column, multiplier=1.5):
+def detect_outliers_iqr(data, column, multiplier=1.5, use_sketch=False):
     """Detect outliers using IQR method"""
-    Q1 = data[column].quantile(0.25)
-    Q3 = data[column].quantile(0.75)
-    IQR = Q3 - Q1
-    
-    lower_bound = Q1 - multiplier * IQR
-    upper_bound = Q3 + multiplier * IQR
+    if use_sketch:
+        # Quartiles from a chunked KLL sketch keep memory bounded on very large columns
+        lower_bound, upper_bound = streaming_iqr_bounds(iter_chunks(data[[column]]), [column], multiplier)[column]
+    else:
+        Q1 = data[column].quantile(0.25)
+        Q3 = data[column].quantile(0.75)
+        IQR = Q3 - Q1
+        
+        lower_bound = Q1 - multiplier * IQR
+        upper_bound = Q3 + multiplier * IQR
     
     outlier_mask = (data[column] < lower_bound) | (data[column] > upper_bound)
     
@@ -103,10 +109,10 @@ with col3:
         st.metric("Sample Outliers (IQR)", f"{sample_outliers['count']}")
 
 with col4:
-    st.metric("Analysis Methods", "4 Algorithms")
+    st.metric("Analysis Methods", "6 Algorithms")
 
 # Analysis tabs
-outlier_tabs = st.tabs(["📊 Overview", "📈 IQR Method", "📉 Z-Score Method", "🤖 Isolation Forest", "🔧 Treatment"])
+outlier_tabs = st.tabs(["📊 Overview", "📈 IQR Method", "📉 Z-Score Method", "🤖 Isolation Forest", "🧭 Multivariate", "⏱️ Time-Series", "🔧 Treatment"])
 
 with outlier_tabs[0]:
     st.markdown("### 📊 Outlier Detection Overview")
@@ -190,9 +196,14 @@ with outlier_tabs[1]:
         iqr_column = st.selectbox("Column for IQR analysis:", numeric_cols, key="iqr_col")
         iqr_multiplier = st.slider("IQR Multiplier:", 1.0, 3.0, 1.5, 0.1,
                                   help="Higher values = less sensitive to outliers")
+        iqr_use_sketch = st.checkbox(
+            "Use streaming quantile sketch",
+            value=len(df) > 1_000_000,
+            help="Approximate quartiles chunk by chunk with bounded memory (recommended for millions of rows)"
+        )
 
         if st.button("🔍 Detect IQR Outliers", type="primary"):
-            iqr_results = detect_outliers_iqr(df, iqr_column, iqr_multiplier)
+            iqr_results = detect_outliers_iqr(df, iqr_column, iqr_multiplier, use_sketch=iqr_use_sketch)
 
             st.markdown(f"#### Results for {iqr_column}")
             st.metric("Outliers Found", f"{iqr_results['count']}",
@@ -428,6 +439,218 @@ with outlier_tabs[3]:
             st.plotly_chart(fig, use_container_width=True)
 
 with outlier_tabs[4]:
+    st.markdown("### 🧭 Robust Multivariate Detection")
+    
+    st.markdown("""
+    <div class="method-info">
+        <strong>🧭 Multivariate Methods:</strong><br>
+        • Mahalanobis: distance from a robust (MinCovDet) centre and covariance<br>
+        • Local Outlier Factor: compares local density with nearest neighbours<br>
+        • Models are fitted on a bounded sample, then every row is scored in chunks<br>
+        • Best for: Related columns whose outliers coincide, large datasets
+    </div>
+    """, unsafe_allow_html=True)
+    
+    col1, col2 = st.columns([1, 1])
+    
+    with col1:
+        mv_columns = st.multiselect(
+            "Select columns for multivariate analysis:",
+            numeric_cols,
+            default=numeric_cols[:3] if len(numeric_cols) >= 3 else numeric_cols,
+            key="mv_columns",
+            help="Outliers are judged on the joint distribution of these columns"
+        )
+        
+        mv_method = st.radio(
+            "Detection method:",
+            ["Mahalanobis (robust covariance)", "Local Outlier Factor"],
+            horizontal=True
+        )
+        
+        mv_sample_size = st.slider(
+            "Rows used to fit the model:",
+            1000, 100000, 20000, 1000,
+            help="Model is fitted on this many sampled rows; all rows are still scored"
+        )
+        
+        if mv_method == "Mahalanobis (robust covariance)":
+            mv_quantile = st.slider(
+                "Chi-square cutoff quantile:",
+                0.90, 0.999, 0.975, 0.005,
+                help="Higher values = less sensitive to outliers"
+            )
+        else:
+            mv_neighbors = st.slider("Number of neighbours:", 5, 100, 20)
+            mv_contamination = st.slider(
+                "Expected outlier proportion:",
+                0.01, 0.5, 0.05, 0.01,
+                key="mv_contamination"
+            )
+        
+        if st.button("🧭 Run Multivariate Detection", type="primary") and mv_columns:
+            if mv_method == "Local Outlier Factor" or len(mv_columns) >= 2:
+                with st.spinner("Scoring rows..."):
+                    if mv_method == "Mahalanobis (robust covariance)":
+                        mv_results = detect_outliers_mahalanobis(
+                            df, mv_columns, quantile=mv_quantile, support_sample=mv_sample_size
+                        )
+                    else:
+                        mv_results = detect_outliers_lof(
+                            df, mv_columns, n_neighbors=mv_neighbors,
+                            contamination=mv_contamination, reference_sample=mv_sample_size
+                        )
+                
+                st.markdown(f"#### Results for {len(mv_columns)} columns")
+                st.metric("Outliers Found", f"{mv_results['count']}",
+                         f"{mv_results['percentage']:.2f}% of data")
+                
+                st.write(f"**Score Threshold:** {mv_results['threshold']:.2f}")
+                st.write(f"**Rows Used for Fitting:** {mv_results['support_size']:,}")
+                
+                if mv_results['count'] > 0:
+                    st.markdown("**Sample Outliers:**")
+                    sample_outliers = mv_results['outliers'][mv_columns].head(10)
+                    sample_outliers['Score'] = mv_results['scores'].loc[sample_outliers.index].round(2)
+                    for col in sample_outliers.columns:
+                        sample_outliers[col] = sample_outliers[col].astype(str)
+                    st.dataframe(sample_outliers, use_container_width=True)
+                    
+                    # Store results
+                    st.session_state.mv_outliers = mv_results
+                else:
+                    st.info("✅ No outliers detected with current settings")
+            else:
+                st.warning("Mahalanobis distance needs at least 2 columns")
+    
+    with col2:
+        # Visualization for multivariate scores
+        if 'mv_outliers' in st.session_state and st.session_state.mv_outliers['count'] > 0:
+            outlier_data = st.session_state.mv_outliers
+            
+            fig = px.histogram(
+                outlier_data['scores'], nbins=100, log_y=True,
+                title=f"Outlier Score Distribution ({outlier_data['method']})"
+            )
+            fig.add_vline(x=outlier_data['threshold'], line_dash="dash", line_color="orange",
+                         annotation_text="Threshold")
+            fig.update_layout(xaxis_title="Score", yaxis_title="Rows", showlegend=False)
+            st.plotly_chart(fig, use_container_width=True)
+
+with outlier_tabs[5]:
+    st.markdown("### ⏱️ Time-Aware Detection")
+    
+    st.markdown("""
+    <div class="method-info">
+        <strong>⏱️ Time-Series Methods:</strong><br>
+        • Rolling median/MAD: compares each reading with its local time window<br>
+        • Seasonal residual: compares each reading with the usual value for its hour/day<br>
+        • Runs per entity (e.g. device ID) in one grouped pass<br>
+        • Best for: Sensor and event data with trends or seasonal peaks
+    </div>
+    """, unsafe_allow_html=True)
+    
+    datetime_candidates = df.select_dtypes(include=['datetime', 'datetimetz']).columns.tolist()
+    datetime_candidates += [col for col in df.select_dtypes(include=['object']).columns
+                            if any(word in col.lower() for word in ['date', 'time', 'timestamp'])]
+    
+    col1, col2 = st.columns([1, 1])
+    
+    with col1:
+        ts_time_column = st.selectbox(
+            "Datetime column:",
+            datetime_candidates + [col for col in df.columns if col not in datetime_candidates],
+            key="ts_time_col"
+        )
+        ts_value_column = st.selectbox("Value column:", numeric_cols, key="ts_value_col")
+        entity_options = ["None"] + [col for col in df.columns if col not in [ts_time_column, ts_value_column]]
+        ts_entity_column = st.selectbox(
+            "Entity column (optional):",
+            entity_options,
+            help="Detect separately per device, store, sensor, etc."
+        )
+        
+        ts_method = st.radio(
+            "Detection method:",
+            ["rolling_mad", "seasonal"],
+            format_func=lambda x: {"rolling_mad": "Rolling median/MAD", "seasonal": "Seasonal residual"}[x],
+            horizontal=True,
+            key="ts_method"
+        )
+        
+        if ts_method == "rolling_mad":
+            ts_window = st.text_input("Rolling window:", value="7D", help="Pandas offset such as 12h, 7D, 30D")
+            ts_min_periods = st.slider("Minimum readings per window:", 2, 50, 5)
+            ts_seasonality = "hour"
+        else:
+            ts_seasonality = st.selectbox(
+                "Seasonal period:",
+                ["hour", "dayofweek", "hour_of_week", "month"],
+                format_func=lambda x: x.replace('_', ' ').title()
+            )
+            ts_window, ts_min_periods = "7D", 5
+        
+        ts_threshold = st.slider("Robust Z-Score threshold:", 2.0, 10.0, 3.5, 0.5, key="ts_threshold")
+        
+        if st.button("⏱️ Detect Time-Series Outliers", type="primary"):
+            try:
+                with st.spinner("Scoring readings..."):
+                    ts_results = detect_outliers_rolling(
+                        df, ts_value_column, ts_time_column,
+                        entity_column=None if ts_entity_column == "None" else ts_entity_column,
+                        method=ts_method, window=ts_window, min_periods=ts_min_periods,
+                        threshold=ts_threshold, seasonality=ts_seasonality
+                    )
+                
+                st.markdown(f"#### Results for {ts_value_column}")
+                st.metric("Outliers Found", f"{ts_results['count']}",
+                         f"{ts_results['percentage']:.2f}% of data")
+                st.write(f"**Entities Analyzed:** {ts_results['entities']:,}")
+                
+                if ts_results['count'] > 0:
+                    st.markdown("**Sample Outliers:**")
+                    sample_outliers = ts_results['outliers'].head(10)[[ts_time_column, ts_value_column]]
+                    sample_outliers['Expected'] = ts_results['expected'].loc[sample_outliers.index].round(2)
+                    sample_outliers['Score'] = ts_results['scores'].loc[sample_outliers.index].round(2)
+                    for col in sample_outliers.columns:
+                        sample_outliers[col] = sample_outliers[col].astype(str)
+                    st.dataframe(sample_outliers, use_container_width=True)
+                    
+                    # Store results
+                    st.session_state.ts_outliers = ts_results
+                else:
+                    st.info("✅ No outliers detected with current settings")
+            except Exception as e:
+                st.error(f"❌ Time-series detection failed: {str(e)}")
+    
+    with col2:
+        # Visualization: readings against the expected baseline (sampled for display)
+        if 'ts_outliers' in st.session_state and st.session_state.ts_outliers['count'] > 0:
+            outlier_data = st.session_state.ts_outliers
+            value_col = outlier_data['columns'][0]
+            time_col = outlier_data['time_column']
+            
+            if value_col in df.columns and time_col in df.columns:
+                plot_index = df.index[:5000]
+                plot_df = pd.DataFrame({
+                    'time': pd.to_datetime(df.loc[plot_index, time_col], errors='coerce'),
+                    'value': df.loc[plot_index, value_col],
+                    'expected': outlier_data['expected'].reindex(plot_index)
+                }).sort_values('time')
+                is_outlier = plot_df.index.isin(outlier_data['outlier_indices'])
+                
+                fig = go.Figure()
+                fig.add_trace(go.Scatter(x=plot_df['time'], y=plot_df['value'], mode='markers',
+                                         name='Readings', marker=dict(color='blue', size=3)))
+                fig.add_trace(go.Scatter(x=plot_df['time'], y=plot_df['expected'], mode='markers',
+                                         name='Expected', marker=dict(color='green', size=2)))
+                fig.add_trace(go.Scatter(x=plot_df.loc[is_outlier, 'time'], y=plot_df.loc[is_outlier, 'value'],
+                                         mode='markers', name='Outliers', marker=dict(color='red', size=7, symbol='x')))
+                fig.update_layout(title=f"Time-Series Outliers: {value_col} (first 5,000 rows)",
+                                  xaxis_title=time_col, yaxis_title=value_col)
+                st.plotly_chart(fig, use_container_width=True)
+
+with outlier_tabs[6]:
     st.markdown("### 🔧 Outlier Treatment")
     
     # Check if any outliers have been detected
@@ -438,6 +661,20 @@ with outlier_tabs[4]:
         available_methods.append("Z-Score")
     if 'if_outliers' in st.session_state and st.session_state.if_outliers['count'] > 0:
         available_methods.append("Isolation Forest")
+    if 'mv_outliers' in st.session_state and st.session_state.mv_outliers['count'] > 0:
+        available_methods.append("Multivariate")
+    if 'ts_outliers' in st.session_state and st.session_state.ts_outliers['count'] > 0:
+        available_methods.append("Time-Series")
+    
+    # Session state key holding the results of each detection method
+    outlier_state_keys = {
+        "IQR": "iqr_outliers",
+        "Z-Score": "zscore_outliers",
+        "Isolation Forest": "if_outliers",
+        "Multivariate": "mv_outliers",
+        "Time-Series": "ts_outliers"
+    }
+    multivariate_methods = ["Isolation Forest", "Multivariate"]
     
     if not available_methods:
         st.info("ℹ️ Run outlier detection first to see treatment options.")
@@ -473,8 +710,11 @@ with outlier_tabs[4]:
             elif selected_method == "Z-Score":
                 outlier_data = st.session_state.zscore_outliers
                 target_column = [col for col in numeric_cols if col in zscore_column][0] if 'zscore_column' in locals() else numeric_cols[0]
-            else:  # Isolation Forest
-                outlier_data = st.session_state.if_outliers
+            elif selected_method == "Time-Series":
+                outlier_data = st.session_state.ts_outliers
+                target_column = outlier_data['columns'][0]
+            else:  # Isolation Forest or Multivariate
+                outlier_data = st.session_state[outlier_state_keys[selected_method]]
                 target_column = "Multiple Columns"
             
             st.write(f"**Outliers to treat:** {outlier_data['count']}")
@@ -503,7 +743,7 @@ with outlier_tabs[4]:
                             st.warning("Capping only available for IQR method")
                     
                     elif treatment_method == "Transform (log)":
-                        if selected_method != "Isolation Forest":
+                        if selected_method not in multivariate_methods:
                             # Apply log transform (add 1 to handle zeros)
                             df[target_column] = np.log1p(df[target_column])
                             result_msg = f"Applied log transformation to {target_column}"
@@ -512,7 +752,7 @@ with outlier_tabs[4]:
                             st.warning("Log transform not applicable to multivariate outliers")
                     
                     elif treatment_method == "Replace with median":
-                        if selected_method != "Isolation Forest":
+                        if selected_method not in multivariate_methods:
                             median_val = df[target_column].median()
                             df.loc[outlier_indices, target_column] = median_val
                             result_msg = f"Replaced {len(outlier_indices)} outliers with median ({median_val:.2f})"
@@ -521,7 +761,7 @@ with outlier_tabs[4]:
                             st.warning("Median replacement not applicable to multivariate outliers")
                     
                     elif treatment_method == "Replace with mean":
-                        if selected_method != "Isolation Forest":
+                        if selected_method not in multivariate_methods:
                             mean_val = df[target_column].mean()
                             df.loc[outlier_indices, target_column] = mean_val
                             result_msg = f"Replaced {len(outlier_indices)} outliers with mean ({mean_val:.2f})"
@@ -530,13 +770,13 @@ with outlier_tabs[4]:
                             st.warning("Mean replacement not applicable to multivariate outliers")
                     
                     elif treatment_method == "Mark as missing (NaN)":
-                        if selected_method != "Isolation Forest":
+                        if selected_method not in multivariate_methods:
                             df.loc[outlier_indices, target_column] = np.nan
                             result_msg = f"Marked {len(outlier_indices)} outliers as missing values"
                             treatment_applied = True
                         else:
                             # For multivariate, mark all involved columns as NaN
-                            for col in if_columns if 'if_columns' in locals() else numeric_cols:
+                            for col in outlier_data.get('columns', if_columns if 'if_columns' in locals() else numeric_cols):
                                 df.loc[outlier_indices, col] = np.nan
                             result_msg = f"Marked {len(outlier_indices)} rows as missing in multiple columns"
                             treatment_applied = True
@@ -562,6 +802,10 @@ with outlier_tabs[4]:
                             del st.session_state.zscore_outliers
                         if 'if_outliers' in st.session_state:
                             del st.session_state.if_outliers
+                        if 'mv_outliers' in st.session_state:
+                            del st.session_state.mv_outliers
+                        if 'ts_outliers' in st.session_state:
+                            del st.session_state.ts_outliers
                         
                         st.success(f"✅ {result_msg}")
                         st.rerun()
@@ -574,7 +818,7 @@ with outlier_tabs[4]:
             
             # Show impact of each treatment method
             if selected_method in available_methods:
-                outlier_count = st.session_state[f"{selected_method.lower().replace('-', '_')}_outliers"]['count']
+                outlier_count = st.session_state[outlier_state_keys[selected_method]]['count']
                 
                 st.write("**Expected Impact:**")
                 
@@ -591,11 +835,11 @@ with outlier_tabs[4]:
                     st.metric("Total Rows", f"{len(df):,}", "Unchanged")
                 
                 # Show sample outliers that will be treated
-                outlier_data = st.session_state[f"{selected_method.lower().replace('-', '_')}_outliers"]
+                outlier_data = st.session_state[outlier_state_keys[selected_method]]
                 if outlier_data['count'] > 0:
                     st.markdown("**Sample Outliers to Treat:**")
                     sample = outlier_data['outliers'].head(5)
-                    if selected_method != "Isolation Forest":
+                    if selected_method not in multivariate_methods:
                         # Show specific column
                         display_cols = [target_column] if target_column in sample.columns else sample.columns[:2]
                     else:
@@ -637,6 +881,8 @@ with st.sidebar:
         "**IQR:** Best for skewed data",
         "**Z-Score:** Best for normal distributions",  
         "**Isolation Forest:** Best for complex patterns",
+        "**Mahalanobis / LOF:** Best for related columns",
+        "**Rolling / Seasonal:** Best for time-series data",
         "**Modified Z-Score:** Robust alternative"
     ]
     
@@ -3,9 +3,12 @@ import pandas as pd
 import numpy as np
 import re
 import plotly.express as px
-from textblob import TextBlob
 from collections import Counter
 from datetime import datetime
+from utils.text_cleaning import compile_text_pipeline, clean_text_series
+from utils.sentiment_engine import analyze_sentiment, sentiment_labels
+from utils.text_profiling import get_text_profile
+from utils.term_frequency import get_term_frequencies
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -43,25 +46,38 @@ def clean_text_advanced(text, operations):
     if pd.isna(text) or text == "":
         return text
     
-    text = str(text)
-    
-    for op in operations:
-        if op == "lowercase":
-            text = text.lower()
-        elif op == "remove_numbers":
-            text = re.sub(r'\d+', '', text)
-        elif op == "remove_punctuation":
-            text = re.sub(r'[^\w\s]', '', text)
-        elif op == "remove_special_chars":
-            text = re.sub(r'[^a-zA-Z0-9\s]', '', text)
-        elif op == "remove_extra_spaces":
-            text = re.sub(r'\s+', ' ', text).strip()
-        elif op == "remove_urls":
-            text = re.sub(r'http\S+|www\S+|https\S+', '', text)
-        elif op == "remove_emails":
-            text = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '', text)
-    
-    return text
+    # Precompiled once per operation list; "remove_extra_spaces" also strips here
+    operations = tuple('standardize_whitespace' if op == "remove_extra_spaces" else op for op in operations)
+    return compile_text_pipeline(operations)(str(text))
+
+# UI labels -> text cleaning operations (basic operations always run in this order)
+BASIC_OPERATIONS = {
+    "Remove leading/trailing whitespace": 'strip',
+    "Remove extra spaces": 'remove_extra_spaces',
+    "Convert to lowercase": 'lowercase',
+    "Remove numbers": 'remove_numbers',
+    "Remove punctuation": 'remove_punctuation',
+    "Remove special characters": 'remove_special_chars'
+}
+ADVANCED_OPERATIONS = {
+    "Remove URLs": 'remove_urls',
+    "Remove email addresses": 'remove_emails',
+    "Remove phone numbers": 'remove_phones',
+    "Remove HTML tags": 'remove_html',
+    "Standardize whitespace": 'standardize_whitespace',
+    "Remove duplicate words": 'remove_duplicate_words',
+    "Expand contractions": 'expand_contractions',
+    "Remove stop words (common words)": 'remove_stop_words'
+}
+STANDARDIZATION_OPERATIONS = {
+    "Title Case": 'title_case',
+    "Sentence Case": 'sentence_case',
+    "UPPER CASE": 'uppercase',
+    "lower case": 'lowercase',
+    "Remove leading/trailing spaces": 'strip',
+    "Standardize line breaks": 'standardize_line_breaks',
+    "Fix encoding issues": 'fix_encoding'
+}
 
 # Overview metrics
 col1, col2, col3, col4 = st.columns(4)
@@ -94,18 +110,21 @@ with text_tabs[0]:
         selected_text_col = st.selectbox("Select column for analysis:", text_cols)
         
         col_data = df[selected_text_col].dropna().astype(str)
+        profile = get_text_profile(col_data)
         
-        # Text statistics
+        # Text statistics (one profiling pass over the distinct values)
         text_stats = {
-            'Metric': ['Total Values', 'Unique Values', 'Average Length', 'Min Length', 'Max Length', 'Empty Values', 'Numeric Values'],
+            'Metric': ['Total Values', 'Unique Values', 'Average Length', 'Median Length', 'Min Length', 'Max Length',
+                       'Empty Values', 'Numeric Values'],
             'Value': [
-                f"{len(col_data):,}",
-                f"{col_data.nunique():,}",
-                f"{col_data.str.len().mean():.1f}",
-                f"{col_data.str.len().min()}",
-                f"{col_data.str.len().max()}",
-                f"{(col_data == '').sum():,}",
-                f"{col_data.str.isnumeric().sum():,}"
+                f"{profile['rows']:,}",
+                f"{profile['distinct']:,}",
+                f"{profile['length_mean']:.1f}",
+                f"{profile['length_median']:g}",
+                f"{profile['length_min']}",
+                f"{profile['length_max']}",
+                f"{profile['empty']:,}",
+                f"{profile['pattern_counts']['numeric']:,}"
             ]
         }
         
@@ -122,22 +141,37 @@ with text_tabs[0]:
     with col2:
         # Text length distribution
         if len(col_data) > 0:
-            lengths = col_data.str.len()
+            length_counts = profile['length_counts']
             
-            fig = px.histogram(x=lengths, nbins=30, title=f"Text Length Distribution: {selected_text_col}")
+            fig = px.histogram(x=length_counts.index, y=length_counts.values, histfunc='sum', nbins=30,
+                               title=f"Text Length Distribution: {selected_text_col}",
+                               labels={'x': 'length', 'y': 'count'})
             fig.update_layout(height=300)
             st.plotly_chart(fig, use_container_width=True)
             
+            # Character classes across all values
+            char_histogram = profile['char_histogram'].rename(lambda name: name.replace('_', ' ').title())
+            fig_chars = px.bar(x=char_histogram.index, y=char_histogram.values, title="Character Classes",
+                               labels={'x': 'class', 'y': 'characters'})
+            fig_chars.update_layout(height=300)
+            st.plotly_chart(fig_chars, use_container_width=True)
+            
             # Word frequency
             if st.checkbox("Show word frequency"):
-                all_text = ' '.join(col_data.head(1000))  # Limit for performance
-                words = re.findall(r'\w+', all_text.lower())
-                word_freq = Counter(words).most_common(10)
+                ngram_label = st.selectbox("Terms:", ["Words", "Bigrams", "Trigrams"], key="freq_ngram")
+                skip_stop_words = st.checkbox("Exclude stop words", value=True, key="freq_stop_words")
+                ngram = {"Words": 1, "Bigrams": 2, "Trigrams": 3}[ngram_label]
+                
+                # Whole column, streamed in chunks of distinct values
+                word_freq, freq_stats = get_term_frequencies(col_data, top_k=10, ngram_range=(ngram, ngram),
+                                                             remove_stop_words=skip_stop_words)
                 
-                if word_freq:
-                    freq_df = pd.DataFrame(word_freq, columns=['Word', 'Frequency'])
-                    fig_words = px.bar(freq_df, x='Word', y='Frequency', title="Top 10 Words")
+                if len(word_freq) > 0:
+                    freq_df = word_freq.rename(columns={'term': 'Word', 'count': 'Frequency'})
+                    fig_words = px.bar(freq_df, x='Word', y='Frequency', title=f"Top 10 {ngram_label}")
                     st.plotly_chart(fig_words, use_container_width=True)
+                    if not freq_stats['exact']:
+                        st.caption("Approximate counts (Space-Saving sketch): the vocabulary is too large to count exactly.")
 
 with text_tabs[1]:
     st.markdown("### 🧹 Basic Text Cleaning")
@@ -149,14 +183,7 @@ with text_tabs[1]:
         
         basic_operations = st.multiselect(
             "Select cleaning operations:",
-            [
-                "Remove leading/trailing whitespace",
-                "Remove extra spaces", 
-                "Convert to lowercase",
-                "Remove numbers",
-                "Remove punctuation",
-                "Remove special characters"
-            ],
+            list(BASIC_OPERATIONS),
             help="Choose basic text cleaning operations"
         )
         
@@ -174,24 +201,9 @@ with text_tabs[1]:
                 try:
                     original_sample = df[col].head(3).tolist()
                     
-                    # Apply selected operations
-                    if "Remove leading/trailing whitespace" in basic_operations:
-                        df[col] = df[col].str.strip()
-                    
-                    if "Remove extra spaces" in basic_operations:
-                        df[col] = df[col].str.replace(r'\s+', ' ', regex=True)
-                    
-                    if "Convert to lowercase" in basic_operations:
-                        df[col] = df[col].str.lower()
-                    
-                    if "Remove numbers" in basic_operations:
-                        df[col] = df[col].str.replace(r'\d+', '', regex=True)
-                    
-                    if "Remove punctuation" in basic_operations:
-                        df[col] = df[col].str.replace(r'[^\w\s]', '', regex=True)
-                    
-                    if "Remove special characters" in basic_operations:
-                        df[col] = df[col].str.replace(r'[^a-zA-Z0-9\s]', '', regex=True)
+                    # All selected operations run as one pass over the distinct values
+                    operations = [op for label, op in BASIC_OPERATIONS.items() if label in basic_operations]
+                    df[col], clean_stats = clean_text_series(df[col], operations)
                     
                     cleaned_count += 1
                     
@@ -226,20 +238,8 @@ with text_tabs[1]:
             st.code(str(sample_text)[:200] + "..." if len(str(sample_text)) > 200 else str(sample_text))
             
             # Show what it would look like after cleaning
-            preview_text = str(sample_text)
-            
-            if "Remove leading/trailing whitespace" in basic_operations:
-                preview_text = preview_text.strip()
-            if "Remove extra spaces" in basic_operations:
-                preview_text = re.sub(r'\s+', ' ', preview_text)
-            if "Convert to lowercase" in basic_operations:
-                preview_text = preview_text.lower()
-            if "Remove numbers" in basic_operations:
-                preview_text = re.sub(r'\d+', '', preview_text)
-            if "Remove punctuation" in basic_operations:
-                preview_text = re.sub(r'[^\w\s]', '', preview_text)
-            if "Remove special characters" in basic_operations:
-                preview_text = re.sub(r'[^a-zA-Z0-9\s]', '', preview_text)
+            operations = tuple(op for label, op in BASIC_OPERATIONS.items() if label in basic_operations)
+            preview_text = compile_text_pipeline(operations)(str(sample_text))
             
             st.markdown("**After:**")
             st.code(preview_text[:200] + "..." if len(preview_text) > 200 else preview_text)
@@ -256,16 +256,7 @@ with text_tabs[2]:
         
         advanced_ops = st.multiselect(
             "Advanced cleaning operations:",
-            [
-                "Remove URLs",
-                "Remove email addresses",
-                "Remove phone numbers",
-                "Remove HTML tags",
-                "Standardize whitespace",
-                "Remove duplicate words",
-                "Expand contractions",
-                "Remove stop words (common words)"
-            ],
+            list(ADVANCED_OPERATIONS),
             help="Advanced text processing operations"
         )
         
@@ -276,27 +267,13 @@ with text_tabs[2]:
         
         if st.button("⚡ Apply Advanced Cleaning", type="primary"):
             try:
-                # Apply advanced operations
-                col_data = df[advanced_col].copy()
-                
-                for op in advanced_ops:
-                    if op == "Remove URLs":
-                        col_data = col_data.str.replace(r'http\S+|www\S+|https\S+', '', regex=True)
-                    elif op == "Remove email addresses":
-                        col_data = col_data.str.replace(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '', regex=True)
-                    elif op == "Remove phone numbers":
-                        col_data = col_data.str.replace(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', '', regex=True)
-                    elif op == "Remove HTML tags":
-                        col_data = col_data.str.replace(r'<[^<>]*>', '', regex=True)
-                    elif op == "Standardize whitespace":
-                        col_data = col_data.str.replace(r'\s+', ' ', regex=True).str.strip()
-                    elif op == "Remove duplicate words":
-                        # This is complex - simplified version
-                        col_data = col_data.apply(lambda x: ' '.join(dict.fromkeys(str(x).split())) if pd.notna(x) else x)
-                
-                # Apply custom pattern if provided
-                if custom_pattern:
-                    col_data = col_data.str.replace(custom_pattern, replacement if replacement else '', regex=True)
+                # Selected operations and the custom pattern are compiled into one transform
+                col_data, clean_stats = clean_text_series(
+                    df[advanced_col],
+                    [ADVANCED_OPERATIONS[op] for op in advanced_ops],
+                    custom_pattern=custom_pattern,
+                    replacement=replacement
+                )
                 
                 # Update dataframe
                 df[advanced_col] = col_data
@@ -330,14 +307,15 @@ with text_tabs[2]:
             total_words = col_data.str.split().str.len().sum()
             
             # Detect potential issues
+            pattern_counts = get_text_profile(col_data)['pattern_counts']
             issues = {
-                'URLs detected': col_data.str.contains(r'http|www', case=False, na=False).sum(),
-                'Email addresses': col_data.str.contains(r'@.*\.', case=False, na=False).sum(),
-                'Phone numbers': col_data.str.contains(r'\d{3}[-.]?\d{3}[-.]?\d{4}', na=False).sum(),
-                'HTML tags': col_data.str.contains(r'<.*?>', na=False).sum(),
-                'Extra spaces': col_data.str.contains(r'\s{2,}', na=False).sum(),
-                'All caps entries': col_data.str.isupper().sum(),
-                'Numeric entries': col_data.str.isnumeric().sum()
+                'URLs detected': pattern_counts['url'],
+                'Email addresses': pattern_counts['email'],
+                'Phone numbers': pattern_counts['phone'],
+                'HTML tags': pattern_counts['html'],
+                'Extra spaces': pattern_counts['extra_spaces'],
+                'All caps entries': pattern_counts['all_caps'],
+                'Numeric entries': pattern_counts['numeric']
             }
             
             st.markdown("**Potential Issues Found:**")
@@ -377,21 +355,16 @@ with text_tabs[3]:
                 results = {}
                 
                 if "Sentiment analysis" in nlp_operations:
-                    sentiments = []
-                    for text in col_data:
-                        try:
-                            blob = TextBlob(text)
-                            sentiment = blob.sentiment.polarity
-                            if sentiment > 0.1:
-                                sentiments.append('Positive')
-                            elif sentiment < -0.1:
-                                sentiments.append('Negative')
-                            else:
-                                sentiments.append('Neutral')
-                        except:
-                            sentiments.append('Unknown')
+                    # Whole column: distinct texts are scored once and cached across runs
+                    sentiment_scores, sentiment_stats = analyze_sentiment(df[nlp_col].dropna().astype(str))
+                    sentiments = sentiment_labels(sentiment_scores['polarity'])
                     
-                    results['Sentiment Distribution'] = Counter(sentiments)
+                    results['Sentiment Distribution'] = Counter(sentiments.value_counts().to_dict())
+                    st.caption(
+                        f"Scored {sentiment_stats['rows']:,} rows ({sentiment_stats['distinct_texts']:,} distinct, "
+                        f"{sentiment_stats['memory_hits'] + sentiment_stats['disk_hits']:,} cached) in "
+                        f"{sentiment_stats['elapsed_seconds']:.1f}s - {sentiment_stats['rows_per_second']:,.0f} rows/s"
+                    )
                 
                 if "Text length analysis" in nlp_operations:
                     lengths = col_data.str.len()
@@ -403,13 +376,10 @@ with text_tabs[3]:
                     }
                 
                 if "Extract keywords" in nlp_operations:
-                    # Simple keyword extraction using word frequency
-                    all_text = ' '.join(col_data.head(50))  # Limit for performance
-                    words = re.findall(r'\w+', all_text.lower())
-                    # Filter out common words
-                    common_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should'}
-                    filtered_words = [word for word in words if word not in common_words and len(word) > 2]
-                    results['Top Keywords'] = Counter(filtered_words).most_common(10)
+                    # Keyword extraction using word frequency over the whole column
+                    keywords, _ = get_term_frequencies(df[nlp_col].dropna().astype(str), top_k=10,
+                                                       remove_stop_words=True, min_length=3)
+                    results['Top Keywords'] = list(keywords.itertuples(index=False, name=None))
                 
                 # Display results
                 st.markdown("#### Analysis Results")
@@ -436,39 +406,15 @@ with text_tabs[3]:
         
         std_operations = st.multiselect(
             "Standardization operations:",
-            [
-                "Title Case",
-                "Sentence Case", 
-                "UPPER CASE",
-                "lower case",
-                "Remove leading/trailing spaces",
-                "Standardize line breaks",
-                "Fix encoding issues"
-            ]
+            list(STANDARDIZATION_OPERATIONS)
         )
         
         if st.button("📝 Apply Standardization") and std_operations:
             try:
-                col_data = df[standardization_col].copy()
-                
-                for op in std_operations:
-                    if op == "Title Case":
-                        col_data = col_data.str.title()
-                    elif op == "Sentence Case":
-                        col_data = col_data.str.capitalize()
-                    elif op == "UPPER CASE":
-                        col_data = col_data.str.upper()
-                    elif op == "lower case":
-                        col_data = col_data.str.lower()
-                    elif op == "Remove leading/trailing spaces":
-                        col_data = col_data.str.strip()
-                    elif op == "Standardize line breaks":
-                        col_data = col_data.str.replace(r'\r\n|\r|\n', ' ', regex=True)
-                    elif op == "Fix encoding issues":
-                        # Basic encoding fixes
-                        col_data = col_data.str.replace('\u2019', "'", regex=False)
-                        col_data = col_data.str.replace('\u201c', '"', regex=False)
-                        col_data = col_data.str.replace('\u201d', '"', regex=False)
+                col_data, clean_stats = clean_text_series(
+                    df[standardization_col],
+                    [STANDARDIZATION_OPERATIONS[op] for op in std_operations]
+                )
                 
                 df[standardization_col] = col_data
                 st.session_state.current_dataset = df
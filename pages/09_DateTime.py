@@ -5,11 +5,31 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import calendar
+from utils.type_inference import is_text_column
+from utils.datetime_parsing import parse_datetimes, datetime_parse_rate
+from utils.datetime_features import add_datetime_features
 import warnings
 warnings.filterwarnings('ignore')
 
 st.set_page_config(page_title="DateTime", page_icon="📅", layout="wide")
 
+# Feature labels -> utils.datetime_features keys
+CALENDAR_FEATURES = {
+    "Year": 'year', "Month": 'month', "Day": 'day', "Weekday": 'weekday', "Week of Year": 'week',
+    "Quarter": 'quarter', "Hour": 'hour', "Minute": 'minute', "Day of Year": 'dayofyear',
+    "Is Weekend": 'is_weekend', "Is Month End": 'is_month_end', "Is Month Start": 'is_month_start',
+    "Is Holiday (US federal)": 'is_holiday', "Season": 'season',
+    "Time Period (Morning/Afternoon/Evening/Night)": 'time_period'
+}
+ADVANCED_FEATURES = {
+    "Days since earliest date": 'days_since_start',
+    "Days until latest date": 'days_until_end',
+    "Business days from start": 'bdays_since_start',
+    "Age in years (from date)": 'age_years',
+    "Time since midnight (seconds)": 'seconds_since_midnight',
+    "Cyclical features (sin/cos)": 'cyclical'
+}
+
 st.title("📅 DateTime")
 st.markdown("Advanced datetime analysis, conversion, and feature extraction capabilities")
 
@@ -25,15 +45,13 @@ df = st.session_state.current_dataset.copy()
 datetime_cols = df.select_dtypes(include=['datetime64']).columns.tolist()
 potential_datetime_cols = []
 
-# Check object columns for potential datetime data
-for col in df.select_dtypes(include=['object']).columns:
+# Check text columns for potential datetime data (format matched on a stratified sample)
+for col in df.columns:
+    if not is_text_column(df[col]):
+        continue
     try:
-        sample_data = df[col].dropna().head(20)
-        if len(sample_data) > 0:
-            parsed_dates = pd.to_datetime(sample_data, errors='coerce', infer_datetime_format=True)
-            success_rate = parsed_dates.notna().sum() / len(sample_data)
-            if success_rate > 0.7:  # 70% of samples successfully parsed
-                potential_datetime_cols.append(col)
+        if datetime_parse_rate(df[col]) > 0.7:  # 70% of samples successfully parsed
+            potential_datetime_cols.append(col)
     except:
         continue
 
@@ -84,9 +102,9 @@ if len(all_datetime_cols) == 0:
         if st.button("🔄 Convert to DateTime"):
             try:
                 if date_format:
-                    df[manual_col] = pd.to_datetime(df[manual_col], format=date_format, errors='coerce')
+                    df[manual_col], _ = parse_datetimes(df[manual_col], fmt=date_format, fallback=False)
                 else:
-                    df[manual_col] = pd.to_datetime(df[manual_col], errors='coerce', infer_datetime_format=True)
+                    df[manual_col], _ = parse_datetimes(df[manual_col])
                 
                 st.session_state.current_dataset = df
                 st.success(f"✅ Converted {manual_col} to datetime!")
@@ -113,7 +131,7 @@ with datetime_tabs[0]:
         # Convert to datetime if not already
         if analysis_col not in datetime_cols:
             try:
-                df[analysis_col] = pd.to_datetime(df[analysis_col], errors='coerce', infer_datetime_format=True)
+                df[analysis_col], _ = parse_datetimes(df[analysis_col])
                 st.info(f"Converted {analysis_col} to datetime for analysis")
             except:
                 st.error(f"Failed to convert {analysis_col} to datetime")
@@ -224,32 +242,22 @@ with datetime_tabs[1]:
                     original_type = str(df[convert_col].dtype)
                     
                     if conversion_method == "Auto-detect format":
-                        df[convert_col] = pd.to_datetime(df[convert_col], errors='coerce', infer_datetime_format=True)
+                        df[convert_col], parse_info = parse_datetimes(df[convert_col])
                     
                     elif conversion_method == "Specify custom format":
                         if custom_format:
-                            df[convert_col] = pd.to_datetime(df[convert_col], format=custom_format, errors='coerce')
+                            df[convert_col], parse_info = parse_datetimes(df[convert_col], fmt=custom_format, fallback=False)
                         else:
                             st.error("Please specify a custom format")
                             st.stop()
                     
                     elif conversion_method == "Try multiple formats":
-                        # Try common formats
+                        # Try common formats; each pass only sees values the earlier formats missed
                         formats = ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%Y-%m-%d %H:%M:%S', '%m/%d/%Y %H:%M:%S']
-                        converted = False
-                        
-                        for fmt in formats:
-                            try:
-                                df[convert_col] = pd.to_datetime(df[convert_col], format=fmt, errors='coerce')
-                                if df[convert_col].notna().sum() > 0:
-                                    converted = True
-                                    st.info(f"Successfully used format: {fmt}")
-                                    break
-                            except:
-                                continue
-                        
-                        if not converted:
-                            df[convert_col] = pd.to_datetime(df[convert_col], errors='coerce', infer_datetime_format=True)
+                        df[convert_col], parse_info = parse_datetimes(df[convert_col], formats=formats)
+                    
+                    if parse_info['formats_used']:
+                        st.info(f"Parsed {parse_info['unique_values']:,} distinct values using: {', '.join(parse_info['formats_used'])}")
                     
                     # Update session state
                     st.session_state.current_dataset = df
@@ -343,89 +351,17 @@ with datetime_tabs[2]:
             # Feature extraction options
             features_to_extract = st.multiselect(
                 "Select features to extract:",
-                [
-                    "Year", "Month", "Day", "Weekday", "Week of Year",
-                    "Quarter", "Hour", "Minute", "Day of Year",
-                    "Is Weekend", "Is Month End", "Is Month Start",
-                    "Season", "Time Period (Morning/Afternoon/Evening/Night)"
-                ],
+                list(CALENDAR_FEATURES),
                 default=["Year", "Month", "Weekday"],
                 help="Choose datetime components to extract as new columns"
             )
             
             if st.button("⚙️ Extract Features", type="primary") and features_to_extract:
                 try:
-                    dt_data = df[feature_col]
-                    features_created = []
-                    
-                    for feature in features_to_extract:
-                        if feature == "Year":
-                            df[f"{feature_col}_year"] = dt_data.dt.year
-                            features_created.append(f"{feature_col}_year")
-                        
-                        elif feature == "Month":
-                            df[f"{feature_col}_month"] = dt_data.dt.month
-                            features_created.append(f"{feature_col}_month")
-                        
-                        elif feature == "Day":
-                            df[f"{feature_col}_day"] = dt_data.dt.day
-                            features_created.append(f"{feature_col}_day")
-                        
-                        elif feature == "Weekday":
-                            df[f"{feature_col}_weekday"] = dt_data.dt.dayofweek
-                            features_created.append(f"{feature_col}_weekday")
-                        
-                        elif feature == "Week of Year":
-                            df[f"{feature_col}_week"] = dt_data.dt.isocalendar().week
-                            features_created.append(f"{feature_col}_week")
-                        
-                        elif feature == "Quarter":
-                            df[f"{feature_col}_quarter"] = dt_data.dt.quarter
-                            features_created.append(f"{feature_col}_quarter")
-                        
-                        elif feature == "Hour":
-                            df[f"{feature_col}_hour"] = dt_data.dt.hour
-                            features_created.append(f"{feature_col}_hour")
-                        
-                        elif feature == "Minute":
-                            df[f"{feature_col}_minute"] = dt_data.dt.minute
-                            features_created.append(f"{feature_col}_minute")
-                        
-                        elif feature == "Day of Year":
-                            df[f"{feature_col}_dayofyear"] = dt_data.dt.dayofyear
-                            features_created.append(f"{feature_col}_dayofyear")
-                        
-                        elif feature == "Is Weekend":
-                            df[f"{feature_col}_is_weekend"] = (dt_data.dt.dayofweek >= 5).astype(int)
-                            features_created.append(f"{feature_col}_is_weekend")
-                        
-                        elif feature == "Is Month End":
-                            df[f"{feature_col}_is_month_end"] = dt_data.dt.is_month_end.astype(int)
-                            features_created.append(f"{feature_col}_is_month_end")
-                        
-                        elif feature == "Is Month Start":
-                            df[f"{feature_col}_is_month_start"] = dt_data.dt.is_month_start.astype(int)
-                            features_created.append(f"{feature_col}_is_month_start")
-                        
-                        elif feature == "Season":
-                            seasons = dt_data.dt.month.map({
-                                12: 'Winter', 1: 'Winter', 2: 'Winter',
-                                3: 'Spring', 4: 'Spring', 5: 'Spring',
-                                6: 'Summer', 7: 'Summer', 8: 'Summer',
-                                9: 'Fall', 10: 'Fall', 11: 'Fall'
-                            })
-                            df[f"{feature_col}_season"] = seasons
-                            features_created.append(f"{feature_col}_season")
-                        
-                        elif feature == "Time Period (Morning/Afternoon/Evening/Night)":
-                            time_periods = dt_data.dt.hour.map(lambda x: 
-                                'Night' if x < 6 else
-                                'Morning' if x < 12 else
-                                'Afternoon' if x < 18 else
-                                'Evening'
-                            )
-                            df[f"{feature_col}_time_period"] = time_periods
-                            features_created.append(f"{feature_col}_time_period")
+                    # All features computed in one pass and attached with a single concat
+                    df, features_created = add_datetime_features(
+                        df, feature_col, [CALENDAR_FEATURES[feature] for feature in features_to_extract]
+                    )
                     
                     # Update session state
                     st.session_state.current_dataset = df
@@ -457,55 +393,15 @@ with datetime_tabs[2]:
             # Advanced feature options
             advanced_features = st.multiselect(
                 "Advanced features:",
-                [
-                    "Days since earliest date",
-                    "Days until latest date", 
-                    "Business days from start",
-                    "Age in years (from date)",
-                    "Time since midnight (seconds)",
-                    "Cyclical features (sin/cos)"
-                ],
+                list(ADVANCED_FEATURES),
                 help="Create advanced time-based features"
             )
             
             if st.button("🚀 Create Advanced Features") and advanced_features:
                 try:
-                    dt_data = df[adv_col].dropna()
-                    
-                    for feature in advanced_features:
-                        if feature == "Days since earliest date":
-                            earliest = dt_data.min()
-                            df[f"{adv_col}_days_since_start"] = (df[adv_col] - earliest).dt.days
-                        
-                        elif feature == "Days until latest date":
-                            latest = dt_data.max()
-                            df[f"{adv_col}_days_until_end"] = (latest - df[adv_col]).dt.days
-                        
-                        elif feature == "Business days from start":
-                            earliest = dt_data.min()
-                            df[f"{adv_col}_bdays_since_start"] = df[adv_col].apply(
-                                lambda x: pd.bdate_range(earliest, x).size if pd.notna(x) else np.nan
-                            )
-                        
-                        elif feature == "Age in years (from date)":
-                            reference_date = datetime.now()
-                            df[f"{adv_col}_age_years"] = (reference_date - df[adv_col]).dt.days / 365.25
-                        
-                        elif feature == "Time since midnight (seconds)":
-                            df[f"{adv_col}_seconds_since_midnight"] = (
-                                df[adv_col].dt.hour * 3600 + 
-                                df[adv_col].dt.minute * 60 + 
-                                df[adv_col].dt.second
-                            )
-                        
-                        elif feature == "Cyclical features (sin/cos)":
-                            # Create cyclical features for month
-                            df[f"{adv_col}_month_sin"] = np.sin(2 * np.pi * df[adv_col].dt.month / 12)
-                            df[f"{adv_col}_month_cos"] = np.cos(2 * np.pi * df[adv_col].dt.month / 12)
-                            
-                            # Create cyclical features for day of week
-                            df[f"{adv_col}_weekday_sin"] = np.sin(2 * np.pi * df[adv_col].dt.dayofweek / 7)
-                            df[f"{adv_col}_weekday_cos"] = np.cos(2 * np.pi * df[adv_col].dt.dayofweek / 7)
+                    df, _ = add_datetime_features(
+                        df, adv_col, [ADVANCED_FEATURES[feature] for feature in advanced_features]
+                    )
                     
                     st.session_state.current_dataset = df
                     st.success(f"✅ Created {len(advanced_features)} advanced time features!")
@@ -3,8 +3,11 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-import math
 from datetime import datetime
+from utils.geospatial import validate_coordinates, columns_look_swapped, coordinate_values, DISTANCE_FUNCTIONS
+from utils.spatial_density import get_density_pyramid, hexbin_counts, SCATTER_POINT_LIMIT
+from utils.spatial_clustering import cluster_points, AGGREGATION_THRESHOLD
+from utils.reverse_geocoding import load_gazetteer, reverse_geocode
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -46,39 +49,6 @@ def detect_geo_columns(df):
     
     return detected
 
-# Geospatial utility functions
-def validate_coordinates(lat, lon):
-    """Validate latitude and longitude coordinates"""
-    try:
-        lat_val = float(lat)
-        lon_val = float(lon)
-        
-        lat_valid = -90 <= lat_val <= 90
-        lon_valid = -180 <= lon_val <= 180
-        
-        return lat_valid and lon_valid
-    except:
-        return False
-
-def calculate_distance(lat1, lon1, lat2, lon2):
-    """Calculate distance between two points using Haversine formula"""
-    try:
-        # Convert to radians
-        lat1, lon1, lat2, lon2 = map(math.radians, [float(lat1), float(lon1), float(lat2), float(lon2)])
-        
-        # Haversine formula
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-        c = 2 * math.asin(math.sqrt(a))
-        
-        # Earth's radius in kilometers
-        r = 6371
-        
-        return c * r
-    except:
-        return np.nan
-
 # Detect geospatial columns
 geo_columns = detect_geo_columns(df)
 numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
@@ -205,19 +175,10 @@ with geo_tabs[1]:
             
             if st.button("🔍 Validate Coordinates", type="primary"):
                 try:
-                    # Validate coordinates
-                    valid_coords = []
-                    invalid_coords = []
-                    
-                    for idx, row in df.iterrows():
-                        lat_val = row[lat_col]
-                        lon_val = row[lon_col]
-                        
-                        if pd.notna(lat_val) and pd.notna(lon_val):
-                            if validate_coordinates(lat_val, lon_val):
-                                valid_coords.append(idx)
-                            else:
-                                invalid_coords.append(idx)
+                    # Validate coordinates (whole columns at once; DMS strings are parsed)
+                    checks = validate_coordinates(df[lat_col], df[lon_col])
+                    valid_coords = df.index[checks['valid'].to_numpy()].tolist()
+                    invalid_coords = df.index[(checks['out_of_range'] | checks['unparseable']).to_numpy()].tolist()
                     
                     # Results
                     total_coords = len(valid_coords) + len(invalid_coords)
@@ -234,6 +195,12 @@ with geo_tabs[1]:
                     with col_c:
                         st.metric("Success Rate", f"{valid_percentage:.1f}%")
                     
+                    swapped_count = int(checks['likely_swapped'].sum())
+                    if columns_look_swapped(df[lat_col], df[lon_col]):
+                        st.warning(f"⚠️ {lat_col} and {lon_col} look swapped: most invalid pairs become valid when exchanged.")
+                    elif swapped_count > 0:
+                        st.info(f"ℹ️ {swapped_count:,} invalid pairs would be valid with latitude and longitude swapped.")
+                    
                     # Show invalid coordinates
                     if invalid_coords:
                         st.markdown("#### Sample Invalid Coordinates")
@@ -348,10 +315,19 @@ with geo_tabs[2]:
                 ref_lat = st.number_input("Reference latitude:", value=0.0, format="%.6f")
                 ref_lon = st.number_input("Reference longitude:", value=0.0, format="%.6f")
             
+            distance_formula = st.selectbox(
+                "Distance formula:",
+                ["Haversine (sphere)", "Vincenty (WGS-84 ellipsoid)"],
+                help="Vincenty is more accurate (about 0.5%) but slower"
+            )
+            
             if st.button("📏 Calculate Distances", type="primary"):
                 try:
                     # Get clean coordinate data
-                    coord_data = df[[dist_lat, dist_lon]].dropna()
+                    lat_values = coordinate_values(df[dist_lat]).to_numpy()
+                    lon_values = coordinate_values(df[dist_lon]).to_numpy()
+                    valid = ~(np.isnan(lat_values) | np.isnan(lon_values))
+                    coord_data = pd.DataFrame({dist_lat: lat_values[valid], dist_lon: lon_values[valid]})
                     
                     if len(coord_data) == 0:
                         st.error("No valid coordinate pairs found.")
@@ -365,18 +341,16 @@ with geo_tabs[2]:
                         ref_lat = coord_data[dist_lat].iloc[0]
                         ref_lon = coord_data[dist_lon].iloc[0]
                     
-                    # Calculate distances
-                    distances = []
-                    for _, row in coord_data.iterrows():
-                        dist = calculate_distance(ref_lat, ref_lon, row[dist_lat], row[dist_lon])
-                        distances.append(dist)
+                    # Calculate distances for all points at once
+                    distance_function = DISTANCE_FUNCTIONS['vincenty' if distance_formula.startswith('Vincenty') else 'haversine']
+                    distances = distance_function(coord_data[dist_lat].to_numpy(), coord_data[dist_lon].to_numpy(),
+                                                  ref_lat, ref_lon)
                     
-                    # Add distances to dataframe
+                    # Add distances to dataframe (rows without coordinates stay NaN)
                     distance_col_name = f"distance_from_reference_km"
-                    coord_data[distance_col_name] = distances
-                    
-                    # Update original dataframe
-                    df = df.merge(coord_data[[distance_col_name]], left_index=True, right_index=True, how='left')
+                    all_distances = np.full(len(df), np.nan)
+                    all_distances[valid] = distances
+                    df[distance_col_name] = all_distances
                     st.session_state.current_dataset = df
                     
                     # Distance statistics
@@ -416,74 +390,220 @@ with geo_tabs[2]:
             density_lat = st.selectbox("Latitude column:", lat_candidates, key="density_lat")
             density_lon = st.selectbox("Longitude column:", lon_candidates, key="density_lon")
             
+            density_binning = st.selectbox("Binning:", ["Square grid", "Hexagonal"], key="density_binning")
+            density_resolution = st.select_slider(
+                "Grid resolution (cells per side):",
+                options=[2 ** zoom for zoom in range(2, 10)],
+                value=16,
+                help="Counts come from a precomputed multi-resolution pyramid, so any resolution is instant"
+            )
+            
             if st.button("🗺️ Analyze Point Density"):
                 try:
-                    coord_data = df[[density_lat, density_lon]].dropna()
+                    density_lat_values = coordinate_values(df[density_lat])
+                    density_lon_values = coordinate_values(df[density_lon])
                     
-                    if len(coord_data) < 2:
+                    if (density_lat_values.notna() & density_lon_values.notna()).sum() < 2:
                         st.error("Need at least 2 valid coordinate pairs for density analysis.")
                         st.stop()
                     
-                    # Simple density analysis using coordinate clustering
-                    # Divide space into grid cells and count points
-                    lat_min, lat_max = coord_data[density_lat].min(), coord_data[density_lat].max()
-                    lon_min, lon_max = coord_data[density_lon].min(), coord_data[density_lon].max()
+                    if density_binning == "Square grid":
+                        pyramid = get_density_pyramid(density_lat_values, density_lon_values)
+                        zoom = int(np.log2(density_resolution))
+                        density_stats = pyramid.stats(zoom)
+                        cells = pyramid.cells(zoom)
+                        grid = pyramid.grid(zoom)
+                        fig_density = go.Figure(go.Heatmap(
+                            z=grid.where(grid > 0).to_numpy(), x=grid.columns, y=grid.index, colorscale='Viridis'
+                        ))
+                    else:
+                        cells = hexbin_counts(density_lat_values.to_numpy(), density_lon_values.to_numpy(),
+                                              resolution=density_resolution)
+                        cells = cells.rename(columns={'lat': 'lat_center', 'lon': 'lon_center'})
+                        density_stats = {
+                            'occupied_cells': len(cells),
+                            'max_count': int(cells['count'].iloc[0]),
+                            'mean_count': float(cells['count'].mean()),
+                            'total_points': int(cells['count'].sum()),
+                            'hotspot': cells.iloc[0].to_dict()
+                        }
+                        fig_density = px.scatter(cells, x='lon_center', y='lat_center', color='count',
+                                                 color_continuous_scale='Viridis')
+                        fig_density.update_traces(marker=dict(symbol='hexagon', size=10))
                     
-                    # Grid resolution (adjust based on data range)
-                    lat_range = lat_max - lat_min
-                    lon_range = lon_max - lon_min
+                    fig_density.update_layout(title=f"Point Density ({density_binning}, {density_resolution} per side)",
+                                              xaxis_title="Longitude", yaxis_title="Latitude", height=350)
+                    st.plotly_chart(fig_density, use_container_width=True)
                     
-                    if lat_range > 0 and lon_range > 0:
-                        grid_size = min(10, max(3, int(len(coord_data) ** 0.5)))  # Adaptive grid size
-                        
-                        lat_bins = np.linspace(lat_min, lat_max, grid_size + 1)
-                        lon_bins = np.linspace(lon_min, lon_max, grid_size + 1)
-                        
-                        # Count points in each grid cell
-                        density_counts = []
-                        grid_coords = []
-                        
-                        for i in range(grid_size):
-                            for j in range(grid_size):
-                                lat_low, lat_high = lat_bins[i], lat_bins[i + 1]
-                                lon_low, lon_high = lon_bins[j], lon_bins[j + 1]
-                                
-                                points_in_cell = len(coord_data[
-                                    (coord_data[density_lat] >= lat_low) & 
-                                    (coord_data[density_lat] < lat_high) &
-                                    (coord_data[density_lon] >= lon_low) & 
-                                    (coord_data[density_lon] < lon_high)
-                                ])
-                                
-                                if points_in_cell > 0:
-                                    density_counts.append(points_in_cell)
-                                    grid_coords.append({
-                                        'lat_center': (lat_low + lat_high) / 2,
-                                        'lon_center': (lon_low + lon_high) / 2,
-                                        'count': points_in_cell
-                                    })
-                        
-                        # Density statistics
-                        if density_counts:
-                            st.markdown("#### Density Statistics")
-                            st.write(f"**Grid Cells with Data:** {len(density_counts)}")
-                            st.write(f"**Max Points per Cell:** {max(density_counts)}")
-                            st.write(f"**Avg Points per Cell:** {np.mean(density_counts):.1f}")
-                            st.write(f"**Total Points Analyzed:** {len(coord_data)}")
-                            
-                            # Find highest density area
-                            max_density_cell = max(grid_coords, key=lambda x: x['count'])
-                            st.write(f"**Highest Density Location:** ({max_density_cell['lat_center']:.4f}, {max_density_cell['lon_center']:.4f}) with {max_density_cell['count']} points")
-                        
-                        else:
-                            st.info("Points are too dispersed for meaningful density analysis with current grid resolution.")
+                    # Density statistics
+                    st.markdown("#### Density Statistics")
+                    st.write(f"**Grid Cells with Data:** {density_stats['occupied_cells']:,}")
+                    st.write(f"**Max Points per Cell:** {density_stats['max_count']:,}")
+                    st.write(f"**Avg Points per Cell:** {density_stats['mean_count']:.1f}")
+                    st.write(f"**Total Points Analyzed:** {density_stats['total_points']:,}")
                     
-                    else:
-                        st.info("Coordinate range too small for density analysis.")
+                    # Highest density areas
+                    hotspot = density_stats['hotspot']
+                    st.write(f"**Highest Density Location:** ({hotspot['lat_center']:.4f}, {hotspot['lon_center']:.4f}) with {int(hotspot['count']):,} points")
+                    st.dataframe(cells.head(10).rename(columns={
+                        'lat_center': 'Latitude', 'lon_center': 'Longitude', 'count': 'Points'
+                    }), use_container_width=True, hide_index=True)
                         
                 except Exception as e:
                     st.error(f"❌ Density analysis failed: {str(e)}")
 
+    st.markdown("#### Spatial Clustering")
+
+    if lat_candidates and lon_candidates:
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            cluster_lat = st.selectbox("Latitude column:", lat_candidates, key="cluster_lat")
+            cluster_lon = st.selectbox("Longitude column:", lon_candidates, key="cluster_lon")
+
+        with col2:
+            cluster_method = st.selectbox(
+                "Clustering algorithm:",
+                ["DBSCAN", "HDBSCAN"],
+                help="DBSCAN groups points within a fixed radius; HDBSCAN finds clusters of varying density"
+            )
+            cluster_eps_km = st.number_input("Neighbourhood radius (km):", min_value=0.001, value=0.5, step=0.1,
+                                             format="%.3f", help="DBSCAN radius; also sets the grid cell size (radius / 4)")
+
+        with col3:
+            cluster_min_samples = st.number_input("Min points per neighbourhood:", min_value=1, value=5)
+            cluster_min_size = st.number_input("Min cluster size (HDBSCAN):", min_value=2, value=10)
+            if cluster_method == "DBSCAN":
+                cluster_aggregation = st.selectbox(
+                    "Pre-aggregate to grid cells:",
+                    ["Auto", "Always", "Never"],
+                    help=f"Auto aggregates above {AGGREGATION_THRESHOLD:,} points so millions of pings cluster in minutes"
+                )
+            else:
+                cluster_aggregation = "Never"
+                st.caption("HDBSCAN clusters every point: it cannot weight grid cells by their point counts, "
+                           "so grid aggregation is only available for DBSCAN.")
+
+        if st.button("🎯 Run Spatial Clustering"):
+            try:
+                with st.spinner("Clustering points..."):
+                    clusters, cluster_summary, cluster_stats = cluster_points(
+                        df[cluster_lat], df[cluster_lon],
+                        method=cluster_method.lower(),
+                        eps_km=cluster_eps_km,
+                        min_samples=int(cluster_min_samples),
+                        min_cluster_size=int(cluster_min_size),
+                        aggregate={'Auto': 'auto', 'Always': True, 'Never': False}[cluster_aggregation]
+                    )
+
+                if cluster_stats['points'] == 0:
+                    st.error("No valid coordinate pairs found.")
+                    st.stop()
+
+                df['cluster_id'] = clusters['cluster_id']
+                df['cluster_centroid_distance_km'] = clusters['centroid_distance_km']
+                st.session_state.current_dataset = df
+
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("Clusters", f"{cluster_stats['clusters']:,}")
+                col2.metric("Noise Points", f"{cluster_stats['noise_points']:,}")
+                col3.metric("Points Clustered", f"{cluster_stats['points']:,}")
+                col4.metric("Time", f"{cluster_stats['elapsed_seconds']:.1f}s")
+
+                if cluster_stats['aggregated']:
+                    st.info(f"ℹ️ Points were aggregated to {cluster_stats['clustered_units']:,} grid cells before clustering")
+
+                st.dataframe(cluster_summary.head(20).rename(columns={
+                    'cluster_id': 'Cluster', 'points': 'Points', 'centroid_lat': 'Centroid Latitude',
+                    'centroid_lon': 'Centroid Longitude', 'mean_distance_km': 'Mean Distance (km)',
+                    'max_distance_km': 'Max Distance (km)'
+                }), use_container_width=True, hide_index=True)
+
+                st.success("✅ Added 'cluster_id' (-1 = noise) and 'cluster_centroid_distance_km' columns!")
+
+                # Log action
+                if 'processing_log' not in st.session_state:
+                    st.session_state.processing_log = []
+
+                st.session_state.processing_log.append({
+                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    'action': 'Spatial Clustering',
+                    'details': f"{cluster_method} (radius {cluster_eps_km} km) found {cluster_stats['clusters']} clusters "
+                               f"and {cluster_stats['noise_points']} noise points in {cluster_stats['points']} coordinates"
+                })
+
+            except Exception as e:
+                st.error(f"❌ Spatial clustering failed: {str(e)}")
+
+    st.markdown("#### Reverse Geocoding (Offline)")
+    st.markdown("Assign the nearest place, admin region and country from a local gazetteer file - no online service is used.")
+
+    if lat_candidates and lon_candidates:
+        col1, col2 = st.columns(2)
+
+        with col1:
+            geocode_lat = st.selectbox("Latitude column:", lat_candidates, key="geocode_lat")
+            geocode_lon = st.selectbox("Longitude column:", lon_candidates, key="geocode_lon")
+            geocode_max_km = st.number_input(
+                "Max distance to nearest place (km, 0 = no limit):", min_value=0.0, value=50.0, step=10.0
+            )
+
+        with col2:
+            gazetteer_file = st.file_uploader(
+                "Gazetteer file (GeoNames dump or CSV with name, latitude, longitude):",
+                type=['txt', 'csv', 'tsv'], key="gazetteer_file"
+            )
+            gazetteer_path = st.text_input("...or path to a local gazetteer file:", key="gazetteer_path",
+                                           help="Large GeoNames dumps (e.g. allCountries.txt) can be read from disk directly")
+            admin_names_file = st.file_uploader(
+                "Admin region names (optional, GeoNames admin1CodesASCII.txt):", type=['txt'], key="admin_names_file"
+            )
+
+        if st.button("🧭 Reverse Geocode"):
+            try:
+                if gazetteer_file is None and not gazetteer_path:
+                    st.error("Please provide a gazetteer file.")
+                    st.stop()
+
+                with st.spinner("Indexing gazetteer and assigning places..."):
+                    gazetteer = load_gazetteer(
+                        gazetteer_file.getvalue() if gazetteer_file is not None else gazetteer_path,
+                        admin_names=admin_names_file.getvalue() if admin_names_file is not None else None
+                    )
+                    places, geocode_stats = reverse_geocode(df[geocode_lat], df[geocode_lon], gazetteer,
+                                                            max_distance_km=geocode_max_km or None)
+
+                df['place'] = places['place']
+                df['admin_region'] = places['admin_region']
+                df['country'] = places['country']
+                df['place_distance_km'] = places['distance_km']
+                st.session_state.current_dataset = df
+
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("Gazetteer Places", f"{geocode_stats['gazetteer_places']:,}")
+                col2.metric("Matched Rows", f"{geocode_stats['matched']:,}")
+                col3.metric("Unmatched Rows", f"{geocode_stats['unmatched']:,}")
+                col4.metric("Time", f"{geocode_stats['elapsed_seconds']:.1f}s")
+
+                st.dataframe(places['country'].value_counts().head(10).rename_axis('Country').reset_index(name='Rows'),
+                             use_container_width=True, hide_index=True)
+
+                st.success("✅ Added 'place', 'admin_region', 'country' and 'place_distance_km' columns!")
+
+                # Log action
+                if 'processing_log' not in st.session_state:
+                    st.session_state.processing_log = []
+
+                st.session_state.processing_log.append({
+                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    'action': 'Reverse Geocoding',
+                    'details': f"Matched {geocode_stats['matched']} of {geocode_stats['rows']} rows against "
+                               f"{geocode_stats['gazetteer_places']} gazetteer places"
+                })
+
+            except Exception as e:
+                st.error(f"❌ Reverse geocoding failed: {str(e)}")
+
 with geo_tabs[3]:
     st.markdown("### 🗺️ Geospatial Visualization")
     
@@ -516,19 +636,6 @@ with geo_tabs[3]:
                 ["Scatter plot", "Density heatmap", "Simple map"],
                 help="Choose the type of visualization"
             )
-            max_points = st.slider(
-                "Maximum points to display:",
-                min_value=1,
-                max_value=max(len(df), 2),  # ensures max > min
-                value=min(1000, len(df)),  # safe default
-                help="Limit points for performance"
-            )
-
-            #max_points = st.slider(
-                #"Maximum points to display:",
-                #100, min(5000, len(df)), min(1000, len(df)),
-                #help="Limit points for performance"
-            #)
         
         if st.button("🗺️ Create Visualization", type="primary"):
             try:
@@ -545,19 +652,22 @@ with geo_tabs[3]:
                 if extra_cols:
                     viz_data = df[[viz_lat, viz_lon] + extra_cols].dropna()
                 
-                # Limit points for performance
-                if len(viz_data) > max_points:
-                    viz_data = viz_data.sample(n=max_points)
-                    st.info(f"Displaying {max_points:,} randomly sampled points out of {len(df):,} total points.")
-                
                 if len(viz_data) == 0:
                     st.error("No valid coordinate data found for visualization.")
                     st.stop()
                 
+                # Density is computed from every point; point maps keep one point per occupied cell
+                pyramid = get_density_pyramid(viz_data[viz_lat], viz_data[viz_lon])
+                plot_data = viz_data
+                if map_style != "Density heatmap" and len(viz_data) > SCATTER_POINT_LIMIT:
+                    keep = pyramid.representatives(viz_data[viz_lat].to_numpy(), viz_data[viz_lon].to_numpy())
+                    plot_data = viz_data.iloc[keep]
+                    st.info(f"Drawing {len(plot_data):,} points (one per occupied map cell) to represent all {len(viz_data):,} points.")
+                
                 # Create visualization based on selected type
                 if map_style == "Scatter plot":
                     fig = px.scatter(
-                        viz_data, 
+                        plot_data, 
                         x=viz_lon, 
                         y=viz_lat,
                         color=color_col if color_col != 'None' else None,
@@ -573,15 +683,16 @@ with geo_tabs[3]:
                     )
                 
                 elif map_style == "Density heatmap":
-                    fig = px.density_heatmap(
-                        viz_data,
-                        x=viz_lon,
-                        y=viz_lat,
+                    grid = pyramid.grid(pyramid.zoom_for_cells(SCATTER_POINT_LIMIT))
+                    fig = go.Figure(go.Heatmap(
+                        z=grid.where(grid > 0).to_numpy(), x=grid.columns, y=grid.index, colorscale='Viridis'
+                    ))
+                    fig.update_layout(
                         title=f"Geographic Density Heatmap ({len(viz_data):,} points)",
-                        labels={viz_lat: "Latitude", viz_lon: "Longitude"}
+                        xaxis_title="Longitude",
+                        yaxis_title="Latitude",
+                        height=600
                     )
-                    
-                    fig.update_layout(height=600)
                 
                 else:  # Simple map
                     # For simple map, we'll create a scatter plot with map-like styling
@@ -589,11 +700,11 @@ with geo_tabs[3]:
                     
                     if color_col != 'None':
                         # Color-coded points
-                        unique_values = viz_data[color_col].unique()
+                        unique_values = plot_data[color_col].unique()
                         colors = px.colors.qualitative.Set3[:len(unique_values)]
                         
                         for i, value in enumerate(unique_values):
-                            subset = viz_data[viz_data[color_col] == value]
+                            subset = plot_data[plot_data[color_col] == value]
                             fig.add_trace(go.Scatter(
                                 x=subset[viz_lon],
                                 y=subset[viz_lat],
@@ -608,13 +719,13 @@ with geo_tabs[3]:
                     else:
                         # Single color points
                         fig.add_trace(go.Scatter(
-                            x=viz_data[viz_lon],
-                            y=viz_data[viz_lat],
+                            x=plot_data[viz_lon],
+                            y=plot_data[viz_lat],
                             mode='markers',
                             name='Data Points',
                             marker=dict(
                                 color='blue',
-                                size=8 if size_col == 'None' else viz_data[size_col] * 2,
+                                size=8 if size_col == 'None' else plot_data[size_col] * 2,
                                 opacity=0.7
                             )
                         ))
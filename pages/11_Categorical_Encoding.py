@@ -4,9 +4,11 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from sklearn.preprocessing import LabelEncoder, OrdinalEncoder
-from sklearn.preprocessing import TargetEncoder
-from category_encoders import BinaryEncoder, HashingEncoder, OneHotEncoder as CatOneHotEncoder
+from category_encoders import BinaryEncoder, OneHotEncoder as CatOneHotEncoder
 from datetime import datetime
+from utils.categorical_encoding import (one_hot_encode, estimate_one_hot_memory, hash_encode, target_encode,
+                                        ONE_HOT_MEMORY_BUDGET, HASH_COMPONENTS, TARGET_ENCODING_FOLDS)
+from utils.transform_panel import get_session_registry, show_transform_registry_panel
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -22,6 +24,8 @@ if 'current_dataset' not in st.session_state or st.session_state.current_dataset
     st.stop()
 
 df = st.session_state.current_dataset.copy()
+# Fitted encoders are recorded here so they can be saved and re-applied transform-only
+transform_registry = get_session_registry()
 
 # Identify categorical columns
 categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
@@ -31,6 +35,9 @@ if len(categorical_cols) == 0:
     st.warning("⚠️ No categorical columns found for encoding.")
     st.stop()
 
+ONE_HOT_LAYOUTS = {"Auto (sparse when over budget)": 'auto', "Dense": False, "Sparse": True}
+TARGET_TYPES = {"Auto-detect": 'auto', "Continuous": 'continuous', "Binary": 'binary', "Multiclass": 'multiclass'}
+
 # Encoding utility functions
 def get_encoding_recommendation(series, max_categories_onehot=10):
     """Recommend encoding strategy based on column characteristics"""
@@ -82,7 +89,7 @@ with col4:
     st.metric("High Cardinality Cols", high_cardinality_cols)
 
 # Encoding tabs
-encoding_tabs = st.tabs(["📊 Analysis", "🎯 Strategy Selection", "🔧 Encoding Methods", "⚙️ Advanced Encoding"])
+encoding_tabs = st.tabs(["📊 Analysis", "🎯 Strategy Selection", "🔧 Encoding Methods", "⚙️ Advanced Encoding", "💾 Saved Transforms"])
 
 with encoding_tabs[0]:
     st.markdown("### 📊 Categorical Column Analysis")
@@ -188,11 +195,26 @@ with encoding_tabs[1]:
             help="Choose a strategy to apply to multiple columns at once"
         )
         
-        if bulk_strategy == "Target Encoding (with target)" and numeric_cols:
-            target_column = st.selectbox("Select target column:", numeric_cols, help="Numeric column for target encoding")
+        if bulk_strategy == "Target Encoding (with target)":
+            target_column = st.selectbox("Select target column:", numeric_cols + categorical_cols,
+                                         help="Numeric, binary or multiclass target for target encoding")
+            bulk_target_type = st.selectbox("Target type:", list(TARGET_TYPES.keys()), key="bulk_target_type",
+                                            help="Multiclass targets get one encoded column per class")
+            bulk_target_folds = st.number_input("Out-of-fold folds:", min_value=2, max_value=20, value=TARGET_ENCODING_FOLDS,
+                                                key="bulk_target_folds",
+                                                help="Each row is encoded with statistics from the other folds")
+        
+        if bulk_strategy in ["Smart Auto-Selection", "One-Hot Encoding (Low Cardinality)"]:
+            bulk_one_hot_layout = st.selectbox("One-hot output:", list(ONE_HOT_LAYOUTS.keys()), key="bulk_one_hot_layout")
+            bulk_memory_budget = st.number_input("One-hot memory budget (MB):", min_value=1, value=ONE_HOT_MEMORY_BUDGET // 1024 ** 2,
+                                                 key="bulk_memory_budget",
+                                                 help="Dense output above this size switches to sparse (Auto) or is refused")
         
         if st.button("🚀 Apply Bulk Strategy", type="primary"):
             encoded_columns = []
+            one_hot_columns = []
+            hash_columns = []
+            target_columns = []
             
             try:
                 for col in categorical_cols:
@@ -203,48 +225,65 @@ with encoding_tabs[1]:
                             # Binary encoding for 2 categories
                             le = LabelEncoder()
                             df[f"{col}_encoded"] = le.fit_transform(df[col].astype(str).fillna('missing'))
+                            transform_registry.record(col, f"{col}_encoded", le, as_text=True, na_value='missing')
                             encoded_columns.append(f"{col}_encoded")
                         
                         elif unique_count <= 10:
-                            # One-hot encoding for low cardinality
-                            encoded_df = pd.get_dummies(df[col], prefix=col, dummy_na=True)
-                            df = pd.concat([df, encoded_df], axis=1)
-                            encoded_columns.extend(encoded_df.columns.tolist())
+                            # One-hot encoding for low cardinality (built together after the loop)
+                            one_hot_columns.append(col)
                         
                         elif unique_count <= 50:
                             # Label encoding for medium cardinality
                             le = LabelEncoder()
                             df[f"{col}_label_encoded"] = le.fit_transform(df[col].astype(str).fillna('missing'))
+                            transform_registry.record(col, f"{col}_label_encoded", le, as_text=True, na_value='missing')
                             encoded_columns.append(f"{col}_label_encoded")
                         
                         else:
-                            # Hashing encoding for high cardinality
-                            he = HashingEncoder(n_components=8, cols=[col])
-                            encoded_df = he.fit_transform(df[[col]])
-                            encoded_df.columns = [f"{col}_hash_{i}" for i in range(len(encoded_df.columns))]
-                            df = pd.concat([df, encoded_df], axis=1)
-                            encoded_columns.extend(encoded_df.columns.tolist())
+                            # Hashing encoding for high cardinality (all such columns hashed together after the loop)
+                            hash_columns.append(col)
                     
                     elif bulk_strategy == "One-Hot Encoding (Low Cardinality)" and unique_count <= 20:
-                        encoded_df = pd.get_dummies(df[col], prefix=col, dummy_na=True)
-                        df = pd.concat([df, encoded_df], axis=1)
-                        encoded_columns.extend(encoded_df.columns.tolist())
+                        one_hot_columns.append(col)
                     
                     elif bulk_strategy == "Label Encoding (All)":
                         le = LabelEncoder()
                         df[f"{col}_label_encoded"] = le.fit_transform(df[col].astype(str).fillna('missing'))
+                        transform_registry.record(col, f"{col}_label_encoded", le, as_text=True, na_value='missing')
                         encoded_columns.append(f"{col}_label_encoded")
                     
-                    elif bulk_strategy == "Target Encoding (with target)" and 'target_column' in locals():
-                        try:
-                            te = TargetEncoder()
-                            df[f"{col}_target_encoded"] = te.fit_transform(df[col].astype(str).fillna('missing'), df[target_column])
-                            encoded_columns.append(f"{col}_target_encoded")
-                        except:
-                            # Fallback to label encoding
-                            le = LabelEncoder()
-                            df[f"{col}_label_encoded"] = le.fit_transform(df[col].astype(str).fillna('missing'))
-                            encoded_columns.append(f"{col}_label_encoded")
+                    elif bulk_strategy == "Target Encoding (with target)" and col != target_column:
+                        # Target encoded together after the loop (the target itself is never encoded)
+                        target_columns.append(col)
+                
+                if one_hot_columns:
+                    # All one-hot columns in one uint8 block, checked against the memory budget first
+                    encoded_df, one_hot_info = one_hot_encode(
+                        df, one_hot_columns, dummy_na=True, sparse=ONE_HOT_LAYOUTS[bulk_one_hot_layout],
+                        memory_budget=bulk_memory_budget * 1024 ** 2
+                    )
+                    transform_registry.record_one_hot(df, one_hot_columns, encoded_df.columns.tolist(), dummy_na=True)
+                    df = pd.concat([df, encoded_df], axis=1)
+                    encoded_columns.extend(encoded_df.columns.tolist())
+                
+                if hash_columns:
+                    encoded_df = hash_encode(df, hash_columns, n_components=HASH_COMPONENTS)
+                    transform_registry.record_hash(hash_columns, encoded_df.columns.tolist(), HASH_COMPONENTS)
+                    df = pd.concat([df, encoded_df], axis=1)
+                    encoded_columns.extend(encoded_df.columns.tolist())
+                
+                if target_columns:
+                    # Out-of-fold encodings for all columns at once; the saved mappings use the full data
+                    encoded_df, target_encodings = target_encode(
+                        df, target_columns, df[target_column], target_type=TARGET_TYPES[bulk_target_type],
+                        cv=bulk_target_folds
+                    )
+                    for encoding in target_encodings:
+                        transform_registry.record_mapping(encoding['source'], encoding['output'], encoding['mapping'],
+                                                          default=encoding['default'], as_text=True, na_value='missing')
+                    df = pd.concat([df.drop(columns=[col for col in encoded_df.columns if col in df.columns]), encoded_df],
+                                   axis=1)
+                    encoded_columns.extend(encoded_df.columns.tolist())
                 
                 # Update session state
                 st.session_state.current_dataset = df
@@ -358,18 +397,33 @@ with encoding_tabs[2]:
             )
         
         elif encoding_method == "Target Encoding":
-            if numeric_cols:
-                target_col = st.selectbox("Select target column:", numeric_cols, help="Numeric target for encoding")
+            target_options = [col for col in numeric_cols + categorical_cols if col != encoding_column]
+            if target_options:
+                target_col = st.selectbox("Select target column:", target_options,
+                                          help="Numeric, binary or multiclass target for encoding")
+                single_target_type = st.selectbox("Target type:", list(TARGET_TYPES.keys()), key="single_target_type",
+                                                  help="Multiclass targets get one encoded column per class")
+                single_target_folds = st.number_input("Out-of-fold folds:", min_value=2, max_value=20,
+                                                      value=TARGET_ENCODING_FOLDS, key="single_target_folds")
             else:
-                st.error("Target encoding requires a numeric target column")
+                st.error("Target encoding requires a target column")
                 st.stop()
         
         elif encoding_method == "Hashing Encoding":
-            n_components = st.slider("Number of hash components:", 2, 16, 8, help="Number of output columns")
+            n_components = st.slider("Number of hash components:", 2, 16, HASH_COMPONENTS, help="Number of output columns")
         
         elif encoding_method == "Binary Encoding":
             st.info("Binary encoding will create log₂(n) columns where n is the number of unique categories")
         
+        elif encoding_method == "One-Hot Encoding":
+            one_hot_layout = st.selectbox("One-hot output:", list(ONE_HOT_LAYOUTS.keys()), key="single_one_hot_layout")
+            single_memory_budget = st.number_input("One-hot memory budget (MB):", min_value=1,
+                                                   value=ONE_HOT_MEMORY_BUDGET // 1024 ** 2, key="single_memory_budget")
+            one_hot_estimate = estimate_one_hot_memory(df, [encoding_column])
+            st.info(f"One-hot will create {one_hot_estimate['indicator_columns']:,} columns: "
+                    f"~{one_hot_estimate['dense_bytes'] / 1024 ** 2:,.1f} MB dense, "
+                    f"~{one_hot_estimate['sparse_bytes'] / 1024 ** 2:,.1f} MB sparse")
+        
         # Preview of encoding
         if st.button("👁️ Preview Encoding", key="preview_encoding"):
             try:
@@ -408,15 +462,20 @@ with encoding_tabs[2]:
                 original_columns = len(df.columns)
                 
                 if encoding_method == "One-Hot Encoding":
-                    encoded_df = pd.get_dummies(df[encoding_column], prefix=encoding_column, dummy_na=True)
+                    encoded_df, one_hot_info = one_hot_encode(
+                        df, [encoding_column], dummy_na=True, sparse=ONE_HOT_LAYOUTS[one_hot_layout],
+                        memory_budget=single_memory_budget * 1024 ** 2
+                    )
+                    transform_registry.record_one_hot(df, [encoding_column], encoded_df.columns.tolist(), dummy_na=True)
                     df = pd.concat([df, encoded_df], axis=1)
                     new_columns = encoded_df.columns.tolist()
-                    result_msg = f"Created {len(new_columns)} one-hot encoded columns"
+                    result_msg = f"Created {len(new_columns)} one-hot encoded columns ({'sparse' if one_hot_info['sparse'] else 'dense'})"
                 
                 elif encoding_method == "Label Encoding":
                     le = LabelEncoder()
                     df[f"{encoding_column}_label_encoded"] = le.fit_transform(df[encoding_column].astype(str).fillna('missing'))
                     new_columns = [f"{encoding_column}_label_encoded"]
+                    transform_registry.record(encoding_column, new_columns[0], le, as_text=True, na_value='missing')
                     result_msg = f"Created label encoded column: {new_columns[0]}"
                 
                 elif encoding_method == "Ordinal Encoding":
@@ -426,6 +485,7 @@ with encoding_tabs[2]:
                         oe.set_params(categories=[category_order])
                     df[f"{encoding_column}_ordinal_encoded"] = oe.fit_transform(df[[encoding_column]].fillna('missing'))
                     new_columns = [f"{encoding_column}_ordinal_encoded"]
+                    transform_registry.record(encoding_column, new_columns[0], oe, na_value='missing')
                     result_msg = f"Created ordinal encoded column: {new_columns[0]}"
                 
                 elif encoding_method == "Binary Encoding":
@@ -437,28 +497,32 @@ with encoding_tabs[2]:
                     
                     df = pd.concat([df, encoded_df], axis=1)
                     new_columns = encoded_df.columns.tolist()
+                    transform_registry.record(encoding_column, new_columns, be)
                     result_msg = f"Created {len(new_columns)} binary encoded columns"
                 
                 elif encoding_method == "Target Encoding":
-                    te = TargetEncoder()
-                    df[f"{encoding_column}_target_encoded"] = te.fit_transform(
-                        df[encoding_column].astype(str).fillna('missing'), 
-                        df[target_col]
+                    encoded_df, target_encodings = target_encode(
+                        df, [encoding_column], df[target_col], target_type=TARGET_TYPES[single_target_type],
+                        cv=single_target_folds
                     )
-                    new_columns = [f"{encoding_column}_target_encoded"]
-                    result_msg = f"Created target encoded column: {new_columns[0]}"
+                    for encoding in target_encodings:
+                        transform_registry.record_mapping(encoding['source'], encoding['output'], encoding['mapping'],
+                                                          default=encoding['default'], as_text=True, na_value='missing')
+                    df = pd.concat([df.drop(columns=[col for col in encoded_df.columns if col in df.columns]), encoded_df],
+                                   axis=1)
+                    new_columns = encoded_df.columns.tolist()
+                    result_msg = f"Created {len(new_columns)} out-of-fold target encoded column(s): {', '.join(new_columns)}"
                 
                 elif encoding_method == "Frequency Encoding":
                     freq_map = df[encoding_column].value_counts().to_dict()
                     df[f"{encoding_column}_freq_encoded"] = df[encoding_column].map(freq_map)
                     new_columns = [f"{encoding_column}_freq_encoded"]
+                    transform_registry.record_mapping(encoding_column, new_columns[0], freq_map)
                     result_msg = f"Created frequency encoded column: {new_columns[0]}"
                 
                 elif encoding_method == "Hashing Encoding":
-                    he = HashingEncoder(n_components=n_components, cols=[encoding_column])
-                    encoded_df = he.fit_transform(df[[encoding_column]])
-                    encoded_df.columns = [f"{encoding_column}_hash_{i}" for i in range(len(encoded_df.columns))]
-                    
+                    encoded_df = hash_encode(df, [encoding_column], n_components=n_components)
+                    transform_registry.record_hash([encoding_column], encoded_df.columns.tolist(), n_components)
                     df = pd.concat([df, encoded_df], axis=1)
                     new_columns = encoded_df.columns.tolist()
                     result_msg = f"Created {len(new_columns)} hash encoded columns"
@@ -640,6 +704,12 @@ with encoding_tabs[3]:
         else:
             st.info("No encoded columns found. Apply encoding methods first.")
 
+with encoding_tabs[4]:
+    st.markdown("### 💾 Saved Transforms")
+    st.markdown("Save the encoders fitted on this page under a pipeline version and apply them to new data without refitting.")
+    
+    show_transform_registry_panel(df, key="encoding_registry")
+
 # Export and Navigation
 st.markdown("---")
 col1, col2, col3 = st.columns(3)
@@ -7,6 +7,9 @@ from sklearn.preprocessing import StandardScaler, MinMaxScaler, RobustScaler, Po
 from sklearn.preprocessing import Normalizer, MaxAbsScaler
 from scipy import stats
 from datetime import datetime
+from utils.transform_panel import get_session_registry, show_transform_registry_panel
+from utils.scaling_engine import scale_columns
+from utils.quantile_sketch import DEFAULT_CHUNK_SIZE
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -22,12 +25,27 @@ if 'current_dataset' not in st.session_state or st.session_state.current_dataset
     st.stop()
 
 df = st.session_state.current_dataset.copy()
+# Fitted scalers are recorded here so they can be saved and re-applied transform-only
+transform_registry = get_session_registry()
 numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
 
 if len(numeric_cols) == 0:
     st.warning("⚠️ No numeric columns found for scaling.")
     st.stop()
 
+# Page scaler names -> scaling engine methods
+SCALING_METHODS = {
+    "StandardScaler (Z-score)": 'standard',
+    "MinMaxScaler (0-1)": 'minmax',
+    "RobustScaler (Median-IQR)": 'robust',
+    "MaxAbsScaler (Max Absolute)": 'maxabs',
+    "PowerTransformer (Yeo-Johnson)": 'power',
+    "QuantileTransformer (Uniform)": 'quantile'
+}
+RECOMMENDED_METHODS = {"StandardScaler": 'standard', "RobustScaler": 'robust', "MinMaxScaler": 'minmax',
+                       "PowerTransformer": 'power'}
+OUTPUT_PRECISIONS = {"float64": np.float64, "float32 (half the memory)": np.float32}
+
 # Scaling utility functions
 def analyze_distribution(series):
     """Analyze the distribution of a numeric series"""
@@ -123,7 +141,7 @@ with col4:
     st.metric("Skewed Columns", skewed_cols)
 
 # Scaling tabs
-scaling_tabs = st.tabs(["📊 Analysis", "⚖️ Individual Scaling", "🚀 Bulk Scaling", "🔬 Advanced Methods"])
+scaling_tabs = st.tabs(["📊 Analysis", "⚖️ Individual Scaling", "🚀 Bulk Scaling", "🔬 Advanced Methods", "💾 Saved Transforms"])
 
 with scaling_tabs[0]:
     st.markdown("### 📊 Distribution Analysis")
@@ -234,6 +252,8 @@ with scaling_tabs[1]:
             n_quantiles = st.slider("Number of quantiles:", 100, 2000, 1000)
             output_distribution = st.selectbox("Output distribution:", ["uniform", "normal"])
         
+        individual_precision = st.selectbox("Output precision:", list(OUTPUT_PRECISIONS.keys()), key="individual_precision")
+        
         # Preview scaling
         if st.button("👁️ Preview Scaling", key="preview_scaling"):
             try:
@@ -304,48 +324,31 @@ with scaling_tabs[1]:
         
         if st.button("⚖️ Apply Scaling", type="primary", key="apply_individual_scaling"):
             try:
-                # Get the full column data
-                col_data = df[scaling_column].copy()
-                
-                # Handle missing values
-                mask = col_data.notna()
-                clean_data = col_data[mask].values.reshape(-1, 1)
-                
-                # Apply selected scaling method
-                if scaling_method == "StandardScaler (Z-score)":
-                    scaler = StandardScaler()
-                    scaled_data = scaler.fit_transform(clean_data)
-                
-                elif scaling_method == "MinMaxScaler (0-1)":
-                    scaler = MinMaxScaler(feature_range=feature_range)
-                    scaled_data = scaler.fit_transform(clean_data)
-                
-                elif scaling_method == "RobustScaler (Median-IQR)":
-                    scaler = RobustScaler()
-                    scaled_data = scaler.fit_transform(clean_data)
-                
-                elif scaling_method == "MaxAbsScaler (Max Absolute)":
-                    scaler = MaxAbsScaler()
-                    scaled_data = scaler.fit_transform(clean_data)
-                
-                elif scaling_method == "PowerTransformer (Yeo-Johnson)":
-                    scaler = PowerTransformer(method='yeo-johnson', standardize=standardize)
-                    scaled_data = scaler.fit_transform(clean_data)
-                
-                elif scaling_method == "QuantileTransformer (Uniform)":
-                    scaler = QuantileTransformer(n_quantiles=n_quantiles, output_distribution=output_distribution)
-                    scaled_data = scaler.fit_transform(clean_data)
+                new_col_name = f"{scaling_column}_scaled"
+                precision = OUTPUT_PRECISIONS[individual_precision]
                 
-                elif scaling_method == "Unit Vector Scaling":
+                if scaling_method == "Unit Vector Scaling":
                     # Unit vector scaling works differently - normalize across samples
-                    scaler = Normalizer(norm='l2')
-                    # For single column, we need to reshape appropriately
-                    scaled_data = clean_data / np.linalg.norm(clean_data)
-                
-                # Create new column with scaled data
-                new_col_name = f"{scaling_column}_scaled"
-                df[new_col_name] = np.nan
-                df.loc[mask, new_col_name] = scaled_data.flatten()
+                    mask = df[scaling_column].notna()
+                    clean_data = df.loc[mask, scaling_column].values.reshape(-1, 1)
+                    df[new_col_name] = np.nan
+                    df.loc[mask, new_col_name] = (clean_data / np.linalg.norm(clean_data)).flatten()
+                    df[new_col_name] = df[new_col_name].astype(precision)
+                
+                else:
+                    # Fitted chunk by chunk on large data; missing values stay missing
+                    params = {}
+                    if scaling_method == "MinMaxScaler (0-1)":
+                        params = {'feature_range': feature_range}
+                    elif scaling_method == "PowerTransformer (Yeo-Johnson)":
+                        params = {'standardize': standardize}
+                    elif scaling_method == "QuantileTransformer (Uniform)":
+                        params = {'n_quantiles': n_quantiles, 'output_distribution': output_distribution}
+                    scaled_df, scaler, scale_stats = scale_columns(
+                        df, [scaling_column], SCALING_METHODS[scaling_method], [new_col_name], dtype=precision, **params
+                    )
+                    df[new_col_name] = scaled_df[new_col_name]
+                    transform_registry.record(scaling_column, new_col_name, scaler, dtype=precision)
                 
                 # Update session state
                 st.session_state.current_dataset = df
@@ -418,55 +421,42 @@ with scaling_tabs[2]:
             help="Keep original columns and create new scaled versions"
         )
         
+        bulk_precision = st.selectbox("Output precision:", list(OUTPUT_PRECISIONS.keys()), key="bulk_precision")
+        bulk_chunk_size = st.number_input("Rows per chunk:", min_value=10_000, value=DEFAULT_CHUNK_SIZE, step=100_000,
+                                          key="bulk_chunk_size",
+                                          help="Larger data is fitted and transformed chunk by chunk")
+        
         if st.button("🚀 Apply Bulk Scaling", type="primary"):
             scaled_columns = []
             
             try:
+                # Group the columns by scaler so each group is fitted in one call
+                method_groups = {}
                 for col in selected_columns:
-                    # Get column data
-                    col_data = df[col].copy()
-                    mask = col_data.notna()
-                    clean_data = col_data[mask].values.reshape(-1, 1)
-                    
-                    if len(clean_data) == 0:
+                    if df[col].notna().sum() == 0:
                         continue
                     
                     # Choose scaler based on strategy
                     if bulk_strategy == "Smart Auto-Selection":
                         recommended_scaler, _ = recommend_scaler(df[col])
-                        
-                        if "Standard" in recommended_scaler:
-                            scaler = StandardScaler()
-                        elif "Robust" in recommended_scaler:
-                            scaler = RobustScaler()
-                        elif "MinMax" in recommended_scaler:
-                            scaler = MinMaxScaler()
-                        elif "Power" in recommended_scaler:
-                            scaler = PowerTransformer(method='yeo-johnson')
-                        else:
-                            scaler = StandardScaler()
-                    
-                    elif bulk_strategy == "StandardScaler for All":
-                        scaler = StandardScaler()
+                        method = RECOMMENDED_METHODS.get(recommended_scaler, 'standard')
                     elif bulk_strategy == "MinMaxScaler for All":
-                        scaler = MinMaxScaler()
+                        method = 'minmax'
                     elif bulk_strategy == "RobustScaler for All":
-                        scaler = RobustScaler()
-                    elif bulk_strategy == "Custom Selection":
-                        scaler = StandardScaler()  # Default for custom
-                    
-                    # Apply scaling
-                    scaled_data = scaler.fit_transform(clean_data)
-                    
-                    # Create new column or replace
-                    if preserve_original:
-                        new_col_name = f"{col}_scaled"
-                        df[new_col_name] = np.nan
-                        df.loc[mask, new_col_name] = scaled_data.flatten()
-                        scaled_columns.append(new_col_name)
+                        method = 'robust'
                     else:
-                        df.loc[mask, col] = scaled_data.flatten()
-                        scaled_columns.append(col)
+                        method = 'standard'  # StandardScaler for All, and the default for custom
+                    method_groups.setdefault(method, []).append(col)
+                
+                precision = OUTPUT_PRECISIONS[bulk_precision]
+                for method, columns in method_groups.items():
+                    # Create new columns or replace
+                    output_columns = [f"{col}_scaled" for col in columns] if preserve_original else columns
+                    scaled_df, scaler, scale_stats = scale_columns(df, columns, method, output_columns, dtype=precision,
+                                                                   chunk_size=bulk_chunk_size)
+                    df[output_columns] = scaled_df
+                    transform_registry.record(columns, output_columns, scaler, dtype=precision)
+                    scaled_columns.extend(output_columns)
                 
                 # Update session state
                 st.session_state.current_dataset = df
@@ -701,6 +691,12 @@ with scaling_tabs[3]:
         else:
             st.info("No scaled columns found. Apply scaling methods first.")
 
+with scaling_tabs[4]:
+    st.markdown("### 💾 Saved Transforms")
+    st.markdown("Save the scalers fitted on this page under a pipeline version and apply them to new data without refitting.")
+    
+    show_transform_registry_panel(df, key="scaling_registry")
+
 # Export and Navigation
 st.markdown("---")
 col1, col2, col3 = st.columns(3)
@@ -4,8 +4,13 @@ import numpy as np
 import concurrent.futures
 import threading
 import time
+import itertools
 from datetime import datetime
 import warnings
+from utils.quantile_sketch import streaming_iqr_bounds, iter_chunks
+from utils.categorical_encoding import one_hot_encode, ONE_HOT_MEMORY_BUDGET
+from utils.transform_registry import TransformRegistry, list_versions
+from utils.scaling_engine import scale_columns
 warnings.filterwarnings('ignore')
 
 st.set_page_config(page_title="Batch Processing", page_icon="⚙️", layout="wide")
@@ -53,27 +58,74 @@ def run_batch_processing(datasets, operations, job_id):
                             operation_log.append(f"Filled {filled_count} missing values in {col} with median")
                 
                 elif operation['type'] == 'standardize_columns':
-                    numeric_cols = processed_df.select_dtypes(include=[np.number]).columns
-                    from sklearn.preprocessing import StandardScaler
-                    scaler = StandardScaler()
-                    processed_df[numeric_cols] = scaler.fit_transform(processed_df[numeric_cols])
+                    numeric_cols = processed_df.select_dtypes(include=[np.number]).columns.tolist()
+                    # One StandardScaler for all columns, fitted with partial_fit chunk by chunk on large data
+                    scaled_df, _, _ = scale_columns(processed_df, numeric_cols, 'standard')
+                    processed_df[numeric_cols] = scaled_df
                     operation_log.append(f"Standardized {len(numeric_cols)} numeric columns")
                 
                 elif operation['type'] == 'encode_categorical':
                     categorical_cols = processed_df.select_dtypes(include=['object', 'category']).columns
                     encoded_count = 0
+                    one_hot_cols = []
                     for col in categorical_cols:
                         if processed_df[col].nunique() <= 10:  # One-hot encode low cardinality
-                            encoded_df = pd.get_dummies(processed_df[col], prefix=col)
-                            processed_df = pd.concat([processed_df.drop(col, axis=1), encoded_df], axis=1)
-                            encoded_count += len(encoded_df.columns)
+                            one_hot_cols.append(col)
                         else:  # Label encode high cardinality
                             from sklearn.preprocessing import LabelEncoder
                             le = LabelEncoder()
                             processed_df[f'{col}_encoded'] = le.fit_transform(processed_df[col].astype(str))
                             encoded_count += 1
+                    if one_hot_cols:
+                        # One uint8 block for all low-cardinality columns, sparse past the memory budget
+                        encoded_df, one_hot_info = one_hot_encode(
+                            processed_df, one_hot_cols, dummy_na=False, sparse=operation.get('sparse', 'auto'),
+                            memory_budget=operation.get('memory_budget', ONE_HOT_MEMORY_BUDGET)
+                        )
+                        processed_df = pd.concat([processed_df.drop(columns=one_hot_cols), encoded_df], axis=1)
+                        encoded_count += len(encoded_df.columns)
+                        if one_hot_info['sparse']:
+                            operation_log.append(f"One-hot encoded {len(one_hot_cols)} columns as sparse ({len(encoded_df.columns)} indicators)")
                     operation_log.append(f"Encoded {len(categorical_cols)} categorical columns, created {encoded_count} new features")
                 
+                elif operation['type'] == 'apply_transforms':
+                    # Transform only: encoders / scalers fitted earlier, loaded from the saved pipeline version
+                    registry = TransformRegistry.load(operation['version'])
+                    processed_df, applied = registry.transform(processed_df)
+                    operation_log.append(f"Applied {len(applied)} of {len(registry)} saved transforms from version {operation['version']}")
+                
+                elif operation['type'] == 'detect_outliers':
+                    method = operation.get('method', 'iqr')
+                    action = operation.get('action', 'cap')
+                    # Global bounds come from a streaming sketch over every dataset in the job
+                    global_bounds = operation.get('bounds') or {}
+                    numeric_cols = processed_df.select_dtypes(include=[np.number]).columns
+                    outlier_mask = pd.Series(False, index=processed_df.index)
+                    
+                    for col in numeric_cols:
+                        if col in global_bounds:
+                            lower, upper = global_bounds[col]
+                        elif method == 'zscore':
+                            mean, std = processed_df[col].mean(), processed_df[col].std()
+                            lower, upper = mean - 3 * std, mean + 3 * std
+                        else:
+                            q1, q3 = processed_df[col].quantile([0.25, 0.75])
+                            lower, upper = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+                        
+                        col_mask = (processed_df[col] < lower) | (processed_df[col] > upper)
+                        outlier_mask |= col_mask
+                        
+                        if action == 'cap':
+                            processed_df[col] = processed_df[col].clip(lower=lower, upper=upper)
+                        elif action == 'mark':
+                            processed_df.loc[col_mask, col] = np.nan
+                    
+                    if action == 'remove':
+                        processed_df = processed_df[~outlier_mask]
+                    
+                    scope = 'global' if global_bounds else 'per-dataset'
+                    operation_log.append(f"Applied '{action}' to {int(outlier_mask.sum())} outlier rows ({method}, {scope} bounds)")
+                
                 # Add more operations as needed...
             
             results[dataset_name] = {
@@ -217,6 +269,7 @@ with batch_tabs[1]:
                 'handle_missing': 'Handle Missing Values',
                 'standardize_columns': 'Standardize Numeric Columns',
                 'encode_categorical': 'Encode Categorical Variables',
+                'apply_transforms': 'Apply Saved Fitted Transforms',
                 'detect_outliers': 'Detect and Handle Outliers',
                 'text_cleaning': 'Basic Text Cleaning'
             }
@@ -248,9 +301,53 @@ with batch_tabs[1]:
                 st.markdown("##### Outlier Detection")
                 outlier_method = st.selectbox("Outlier detection method:", ['iqr', 'zscore'])
                 outlier_action = st.selectbox("Outlier action:", ['remove', 'cap', 'mark'])
+                outlier_scope = 'per_dataset'
+                if outlier_method == 'iqr':
+                    outlier_scope = st.selectbox(
+                        "Outlier bounds scope:",
+                        ['per_dataset', 'global'],
+                        format_func=lambda x: {
+                            'per_dataset': 'Per dataset (exact quartiles)',
+                            'global': 'Global across batch (streaming quantile sketch)'
+                        }[x],
+                        help="Global bounds treat all datasets as partitions of one table"
+                    )
                 operation_config['detect_outliers'] = {
                     'method': outlier_method,
-                    'action': outlier_action
+                    'action': outlier_action,
+                    'scope': outlier_scope
+                }
+            
+            if 'apply_transforms' in selected_operations:
+                st.markdown("##### Saved Fitted Transforms")
+                saved_versions = [item['version'] for item in list_versions()]
+                if saved_versions:
+                    transform_version = st.selectbox(
+                        "Pipeline version:",
+                        saved_versions,
+                        help="Encoders and scalers saved from the Categorical Encoding / Scaling pages, applied without refitting"
+                    )
+                    operation_config['apply_transforms'] = {'version': transform_version}
+                else:
+                    st.warning("⚠️ No saved pipeline versions. Save fitted transforms on the Categorical Encoding or Scaling page first.")
+                    selected_operations = [op for op in selected_operations if op != 'apply_transforms']
+            
+            if 'encode_categorical' in selected_operations:
+                st.markdown("##### Categorical Encoding")
+                one_hot_layout = st.selectbox(
+                    "One-hot output:",
+                    ['auto', False, True],
+                    format_func=lambda x: {
+                        'auto': 'Auto (sparse when over budget)',
+                        False: 'Dense',
+                        True: 'Sparse'
+                    }[x]
+                )
+                one_hot_budget = st.number_input("One-hot memory budget per dataset (MB):", min_value=1,
+                                                 value=ONE_HOT_MEMORY_BUDGET // 1024 ** 2)
+                operation_config['encode_categorical'] = {
+                    'sparse': one_hot_layout,
+                    'memory_budget': one_hot_budget * 1024 ** 2
                 }
             
             # Processing options
@@ -379,6 +476,11 @@ with batch_tabs[2]:
                     op_config = {'type': op}
                     if op in operation_config:
                         op_config.update(operation_config[op])
+                    if op_config.get('scope') == 'global':
+                        # First streaming pass: sketch all partitions chunk by chunk
+                        op_config['bounds'] = streaming_iqr_bounds(itertools.chain.from_iterable(
+                            iter_chunks(datasets_to_process[name]) for name in selected_datasets
+                        ))
                     operations_list.append(op_config)
                 
                 # Create job entry
@@ -0,0 +1,12 @@
+import pandas as pd
+from utils.datetime_features import extract_datetime_features
+
+
+def test_is_holiday_before_calendar_features():
+    series = pd.Series(pd.to_datetime(['2024-07-04', '2024-07-05', None]))
+    features = extract_datetime_features(series, ['is_holiday', 'year', 'month', 'day'], prefix='d')
+
+    assert features['d_is_holiday'].tolist() == [1, 0, 0]
+    assert features['d_year'].tolist()[:2] == [2024, 2024]
+    assert features['d_month'].tolist()[:2] == [7, 7]
+    assert features['d_day'].tolist()[:2] == [4, 5]
@@ -0,0 +1,22 @@
+import pandas as pd
+from utils.datetime_parsing import parse_datetimes
+
+
+def test_cached_parse_sees_edits_outside_the_sample():
+    series = pd.Series(pd.date_range('2020-01-01', periods=20000, freq='h').strftime('%Y-%m-%d %H:%M:%S'), name='ts')
+    first, _ = parse_datetimes(series)
+    edited = series.copy()
+    edited.iloc[12345] = '1999-12-31 23:59:59'
+    second, info = parse_datetimes(edited)
+    assert second.iloc[12345] == pd.Timestamp('1999-12-31 23:59:59')
+    assert first.iloc[12345] != second.iloc[12345]
+    assert info['success_rate'] == 1.0
+
+
+def test_cached_parse_follows_row_order_and_index():
+    series = pd.Series(['2024-01-02', '2024-01-01', None], index=[7, 7, 3])
+    parse_datetimes(series)
+    reordered, _ = parse_datetimes(series.iloc[::-1])
+    assert reordered.index.tolist() == [3, 7, 7]
+    assert reordered.isna().tolist() == [True, False, False]
+    assert reordered.iloc[1] == pd.Timestamp('2024-01-01')
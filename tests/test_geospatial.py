@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+import utils.geospatial as geospatial
+from utils.geospatial import DISTANCE_FUNCTIONS, spatial_join
+
+
+def _brute_force(left, right, max_distance_km, method):
+    lat1, lat2 = np.meshgrid(left['lat'].to_numpy(), right['lat'].to_numpy(), indexing='ij')
+    lon1, lon2 = np.meshgrid(left['lon'].to_numpy(), right['lon'].to_numpy(), indexing='ij')
+    distances = DISTANCE_FUNCTIONS[method](lat1.ravel(), lon1.ravel(), lat2.ravel(), lon2.ravel())
+    return int((distances <= max_distance_km).sum())
+
+
+def test_vincenty_join_keeps_pairs_at_the_band_edge(monkeypatch):
+    rng = np.random.default_rng(0)
+    # Right points due north of the left points, spread around the radius in latitude
+    left = pd.DataFrame({'lat': rng.uniform(-1, 1, 200), 'lon': np.zeros(200)})
+    offsets = rng.uniform(0.985, 1.01, 200) * 10.0 / 111.195
+    right = pd.DataFrame({'lat': left['lat'].to_numpy() + offsets, 'lon': np.zeros(200)},
+                         index=np.repeat(np.arange(100), 2))
+
+    monkeypatch.setattr(geospatial, 'JOIN_BLOCK_PAIRS', 50)
+    for method in ('haversine', 'vincenty'):
+        joined = spatial_join(left, right, 'lat', 'lon', 'lat', 'lon', max_distance_km=10.0, method=method)
+        assert len(joined) == _brute_force(left, right, 10.0, method)
+        assert (joined['distance'] <= 10.0).all()
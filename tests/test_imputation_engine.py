@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import utils.imputation_engine as imputation_engine
+from utils.imputation_engine import knn_impute
+
+
+def _wide_sparse_frame(n_rows=8000, n_cols=60, missing_rate=0.02, seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=(n_rows, 3)) @ rng.normal(size=(3, n_cols)) + 0.1 * rng.normal(size=(n_rows, n_cols))
+    mask = rng.random(values.shape) < missing_rate
+    frame = pd.DataFrame(np.where(mask, np.nan, values), columns=[f'x{i}' for i in range(n_cols)])
+    return frame, values, mask
+
+
+def test_knn_impute_caps_trees_with_thousands_of_patterns():
+    frame, values, mask = _wide_sparse_frame(n_rows=20000, n_cols=40)
+    imputed, stats = knn_impute(frame, n_jobs=1)
+
+    assert stats['missing_patterns'] > 1500
+    # Only the most frequent patterns get a tree; every other incomplete row shares the masked search
+    assert stats['pattern_trees'] == imputation_engine.DEFAULT_MAX_TREES
+    tree_rows = stats['rows_imputed'] - stats['rows_masked_search']
+    assert tree_rows >= stats['pattern_trees'] * imputation_engine.MIN_TREE_ROWS
+    assert stats['rows_masked_search'] > 0
+    assert not imputed.isna().any().any()
+    error = np.abs(imputed.to_numpy()[mask] - values[mask]).mean()
+    assert error < 0.25 * np.abs(values[mask]).mean()
+
+
+def test_knn_impute_skips_all_missing_columns():
+    frame, _, _ = _wide_sparse_frame(n_rows=500, n_cols=5)
+    frame['empty'] = np.nan
+    imputed, stats = knn_impute(frame, n_jobs=1)
+    assert stats['empty_columns'] == ['empty']
+    assert imputed['empty'].isna().all()
+    assert not imputed.drop(columns='empty').isna().any().any()
+
+
+def test_masked_search_matches_pattern_trees(monkeypatch):
+    monkeypatch.setattr(imputation_engine, 'MIN_TREE_ROWS', 1)
+    frame, _, _ = _wide_sparse_frame(n_rows=3000, n_cols=12, missing_rate=0.05)
+    frame.iloc[:3] = np.nan
+    by_tree, tree_stats = knn_impute(frame, n_jobs=1, max_trees=1000)
+    by_search, search_stats = knn_impute(frame, n_jobs=1, max_trees=0)
+
+    assert tree_stats['rows_masked_search'] == 0 and tree_stats['pattern_trees'] == tree_stats['missing_patterns']
+    assert search_stats['pattern_trees'] == 0
+    np.testing.assert_allclose(by_search.to_numpy(), by_tree.to_numpy())
+    np.testing.assert_allclose(by_search.iloc[0].to_numpy(), frame.dropna().mean().to_numpy())
+
+
+def test_group_impute_time_order_with_duplicate_index():
+    from utils.imputation_engine import group_impute
+
+    df = pd.DataFrame({'g': ['a', 'a', 'b', 'b'], 't': [2, 1, 2, 1], 'v': [1, np.nan, np.nan, 5]}, index=[0, 0, 1, 1])
+    filled, _ = group_impute(df, ['v'], ['g'], 'ffill', time_column='t', fallback=False)
+    assert filled.index.equals(df.index)
+    # Group a: t=1 has no earlier value; group b: t=2 takes the t=1 value
+    np.testing.assert_array_equal(filled['v'].to_numpy(), [1.0, np.nan, 5.0, 5.0])
+
+    filled, _ = group_impute(df, ['v'], ['g'], 'bfill', time_column='t', fallback=False)
+    np.testing.assert_array_equal(filled['v'].to_numpy(), [1.0, 1.0, np.nan, 5.0])
+
+
+def test_group_interpolate_skips_rows_without_time():
+    from utils.imputation_engine import group_impute
+
+    df = pd.DataFrame({
+        'g': ['a'] * 5,
+        't': pd.to_datetime(['2024-01-01', '2024-01-02', None, '2024-01-04', None]),
+        'v': [0.0, np.nan, np.nan, 3.0, 7.0]
+    })
+    filled, _ = group_impute(df, ['v'], ['g'], 'interpolate', time_column='t', fallback=False)
+    # The NaT row with a gap is left missing and the NaT row's value is not an anchor
+    np.testing.assert_allclose(filled['v'].to_numpy(), [0.0, 1.0, np.nan, 3.0, 7.0])
+
+
+def test_iterative_impute_skips_all_missing_columns():
+    from utils.imputation_engine import iterative_impute
+
+    frame, _, _ = _wide_sparse_frame(n_rows=500, n_cols=4, missing_rate=0.1)
+    frame['empty'] = np.nan
+    imputed, stats = iterative_impute(frame, n_jobs=1)
+    assert stats['empty_columns'] == ['empty']
+    assert imputed['empty'].isna().all()
+    assert not imputed.drop(columns='empty').isna().any().any()
@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+from utils.missingness_engine import get_missingness_profile
+from utils.visualizations import create_missing_heatmap
+
+
+def test_patterns_do_not_collide_with_user_columns():
+    df = pd.DataFrame({
+        'Rows': [1.0, np.nan, 3.0, 4.0],
+        'Row %': [np.nan, np.nan, 1.0, np.nan],
+        'Missing Columns': ['a', None, 'c', 'd']
+    })
+    profile = get_missingness_profile(df, max_patterns=10)
+    patterns, pattern_rows = profile['patterns'], profile['pattern_rows']
+
+    assert list(patterns.columns) == list(df.columns)
+    assert patterns.dtypes.eq(bool).all()
+    assert pattern_rows.sum() == len(df)
+    assert pattern_rows.iloc[0] == 2
+    assert patterns.iloc[0].tolist() == [False, True, False]
+
+    fig = create_missing_heatmap(df, mode='patterns')
+    assert list(fig.data[0].y) == list(df.columns)
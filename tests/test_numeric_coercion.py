@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+from utils.numeric_coercion import coerce_numeric, convertible_fraction
+
+
+def test_formatted_numbers_parse():
+    values, _ = coerce_numeric(pd.Series(['$1,234.56', '(1,234)', '12%', '3.5k', '12 kg', '1.5e3', 'USD 20', '45-']))
+    np.testing.assert_allclose(values, [1234.56, -1234.0, 0.12, 3500.0, 12.0, 1500.0, 20.0, -45.0])
+
+
+def test_decimal_comma_numbers_parse():
+    values, stats = coerce_numeric(pd.Series(['1.234,56', '12,50 €', '3,5', '(1.000,00)']))
+    assert stats['decimal'] == ','
+    np.testing.assert_allclose(values, [1234.56, 12.5, 3.5, -1000.0])
+
+
+def test_text_with_digits_is_not_numeric():
+    identifiers = pd.Series(['123 Main St', 'SKU-1001', 'Q1 2024', '42 Elm Road', 'SKU-2002', 'Q3 2023'])
+    values, stats = coerce_numeric(identifiers)
+    assert values.isna().all()
+    assert stats['convertible_fraction'] == 0.0
+    assert convertible_fraction(identifiers) == 0.0
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+from utils.outlier_engine import detect_outliers_rolling
+
+
+def _readings(index):
+    times = pd.date_range('2024-01-01', periods=len(index) // 2, freq='h')
+    values = np.sin(np.arange(len(times)) / 5.0)
+    values[40] = 25.0
+    return pd.DataFrame({
+        'sensor': ['a'] * len(times) + ['b'] * len(times),
+        'time': np.concatenate([times, times]),
+        'value': np.concatenate([values, values * 2])
+    }, index=index)
+
+
+def test_rolling_scores_follow_row_positions_with_duplicate_index():
+    unique = _readings(pd.RangeIndex(200))
+    duplicated = _readings(pd.Index(np.repeat(np.arange(100), 2)))
+    # Unparseable times score zero and keep their place
+    unique.loc[5, 'time'] = duplicated.iloc[5, duplicated.columns.get_loc('time')] = pd.NaT
+
+    expected = detect_outliers_rolling(unique, 'value', 'time', 'sensor', window='12h', min_periods=3)
+    result = detect_outliers_rolling(duplicated, 'value', 'time', 'sensor', window='12h', min_periods=3)
+
+    np.testing.assert_allclose(result['scores'].to_numpy(), expected['scores'].to_numpy())
+    np.testing.assert_allclose(result['expected'].to_numpy(), expected['expected'].to_numpy())
+    assert result['scores'].iloc[5] == 0.0
+    assert result['count'] == expected['count'] >= 1
+    assert np.argmax(result['scores'].to_numpy()) == 40
+
+
+def test_seasonal_scores_with_duplicate_index():
+    unique = _readings(pd.RangeIndex(200))
+    duplicated = _readings(pd.Index(np.repeat(np.arange(100), 2)))
+    unique = unique.iloc[::-1]
+    duplicated = duplicated.iloc[::-1]
+
+    expected = detect_outliers_rolling(unique, 'value', 'time', 'sensor', method='seasonal')
+    result = detect_outliers_rolling(duplicated, 'value', 'time', 'sensor', method='seasonal')
+
+    np.testing.assert_allclose(result['scores'].to_numpy(), expected['scores'].to_numpy())
+    assert result['scores'].index.equals(duplicated.index)
+
+
+def _clustered_with_outliers(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=(n_rows, 2))
+    values[:5] += 8.0
+    return pd.DataFrame(values, columns=['x', 'y'])
+
+
+def test_lof_matches_full_fit_when_data_fits_reference():
+    from sklearn.neighbors import LocalOutlierFactor
+    from utils.outlier_engine import detect_outliers_lof
+
+    data = _clustered_with_outliers(500)
+    result = detect_outliers_lof(data, ['x', 'y'], n_neighbors=20, n_jobs=1)
+
+    values = data.to_numpy()
+    spread = np.subtract(*np.percentile(values, [75, 25], axis=0))
+    full = LocalOutlierFactor(n_neighbors=20, contamination=0.05).fit(
+        (values - np.median(values, axis=0)) / spread)
+    np.testing.assert_allclose(result['scores'].to_numpy(), -full.negative_outlier_factor_)
+    assert set(range(5)) <= set(result['outlier_indices'])
+
+
+def test_lof_reference_rows_are_not_biased_toward_inliers():
+    from utils.outlier_engine import detect_outliers_lof
+
+    data = _clustered_with_outliers(4000)
+    full = detect_outliers_lof(data, ['x', 'y'], n_neighbors=20, n_jobs=1)
+    sampled = detect_outliers_lof(data, ['x', 'y'], n_neighbors=20, reference_sample=2000, n_jobs=1)
+
+    # Rows inside and outside the reference sample are scored on the same scale
+    in_reference = np.zeros(len(data), dtype=bool)
+    in_reference[np.random.default_rng(42).choice(len(data), size=2000, replace=False)] = True
+    flagged = sampled['scores'].to_numpy() > sampled['threshold']
+    assert abs(flagged[in_reference].mean() - flagged[~in_reference].mean()) < 0.008
+    assert abs(sampled['percentage'] - full['percentage']) < 1.0
@@ -0,0 +1,62 @@
+import os
+import pandas as pd
+import pytest
+import utils.reverse_geocoding as reverse_geocoding
+
+PLACES = b"name,latitude,longitude,country_code\nParis,48.8566,2.3522,FR\nBerlin,52.52,13.405,DE\n"
+
+
+def test_path_sources_are_keyed_without_reading(tmp_path, monkeypatch):
+    source = tmp_path / 'places.csv'
+    source.write_bytes(PLACES)
+    cache_dir = tmp_path / 'cache'
+    monkeypatch.setattr(reverse_geocoding, '_loaded', {})
+
+    first = reverse_geocoding.load_gazetteer(str(source), cache_dir=str(cache_dir))
+    assert len(first) == 2
+    assert not [name for name in os.listdir(cache_dir) if name.startswith('.building-')]
+
+    # A fresh process finds the stored entry from the path metadata alone
+    monkeypatch.setattr(reverse_geocoding, '_loaded', {})
+    def fail(source):
+        raise AssertionError('cached gazetteer was read again')
+    monkeypatch.setattr(reverse_geocoding, 'read_gazetteer', fail)
+    assert reverse_geocoding.load_gazetteer(str(source), cache_dir=str(cache_dir)).directory == first.directory
+
+    # Changing the file changes its size / mtime and builds a new entry
+    monkeypatch.undo()
+    monkeypatch.setattr(reverse_geocoding, '_loaded', {})
+    source.write_bytes(PLACES + b"Rome,41.9028,12.4964,IT\n")
+    updated = reverse_geocoding.load_gazetteer(str(source), cache_dir=str(cache_dir))
+    assert len(updated) == 3 and updated.directory != first.directory
+
+
+def test_path_sources_go_straight_to_read_csv(tmp_path, monkeypatch):
+    source = tmp_path / 'places.csv'
+    source.write_bytes(PLACES)
+    read_csv = pd.read_csv
+    seen = []
+    def recording(filepath_or_buffer, *args, **kwargs):
+        seen.append(filepath_or_buffer)
+        return read_csv(filepath_or_buffer, *args, **kwargs)
+    monkeypatch.setattr(reverse_geocoding.pd, 'read_csv', recording)
+    from_path = reverse_geocoding.read_gazetteer(str(source))
+    assert seen == [str(source)]
+    pd.testing.assert_frame_equal(from_path, reverse_geocoding.read_gazetteer(PLACES))
+
+
+def test_build_replaces_atomically_and_keeps_a_finished_entry(tmp_path):
+    places = reverse_geocoding.read_gazetteer(PLACES)
+    directory = str(tmp_path / 'entry')
+    reverse_geocoding.Gazetteer.build(places, directory)
+    # A second build of the same entry (a concurrent loser) leaves the finished copy in place
+    reverse_geocoding.Gazetteer.build(places, directory)
+    assert sorted(os.listdir(tmp_path)) == ['entry']
+    lookup = reverse_geocoding.Gazetteer(directory).lookup(pd.Series([48.85]), pd.Series([2.35]))
+    assert lookup['place'].iloc[0] == 'Paris'
+
+    failing = places.assign(lat=places['lat'].astype(object))
+    failing.loc[0, 'lat'] = 'bad'
+    with pytest.raises(Exception):
+        reverse_geocoding.Gazetteer.build(failing, str(tmp_path / 'broken'))
+    assert sorted(os.listdir(tmp_path)) == ['entry']
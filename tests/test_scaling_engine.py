@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import StandardScaler, MinMaxScaler, MaxAbsScaler
+from utils.scaling_engine import scale_columns, fit_scaler
+
+REFERENCE = {'standard': StandardScaler, 'minmax': MinMaxScaler, 'maxabs': MaxAbsScaler}
+
+
+def _frame(n_rows=300_000, leading_missing=20_000):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'a': rng.normal(5, 2, n_rows), 'b': rng.exponential(3, n_rows), 'c': np.full(n_rows, 7.0)})
+    df.loc[:leading_missing - 1, 'a'] = np.nan
+    df.loc[rng.random(n_rows) < 0.1, 'b'] = np.nan
+    return df
+
+
+@pytest.mark.parametrize('method', list(REFERENCE))
+def test_streamed_fit_with_leading_missing_chunk(method):
+    df = _frame()
+    expected = REFERENCE[method]().fit_transform(df)
+
+    scaled, _, stats = scale_columns(df, df.columns, method, chunk_size=20_000)
+
+    assert stats['streamed']
+    np.testing.assert_allclose(scaled.to_numpy(), expected, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize('method', list(REFERENCE))
+def test_partitioned_fit_with_all_missing_partition(method):
+    df = _frame(n_rows=30_000, leading_missing=0)
+    df.loc[10_000:19_999, 'a'] = np.nan
+    partitions = [df.iloc[start:start + 10_000] for start in range(0, len(df), 10_000)]
+    reference = REFERENCE[method]().fit(df)
+
+    scaler = fit_scaler(partitions, df.columns, method)
+
+    np.testing.assert_allclose(scaler.transform(df.to_numpy()), reference.transform(df), rtol=1e-9, atol=1e-9)
@@ -0,0 +1,20 @@
+import pandas as pd
+import utils.sentiment_engine as sentiment_engine
+
+
+def test_memory_cache_is_bounded_lru(monkeypatch):
+    monkeypatch.setattr(sentiment_engine, 'MEMORY_CACHE_SIZE', 3)
+    monkeypatch.setitem(sentiment_engine._memory_cache, 'textblob', sentiment_engine.OrderedDict())
+
+    first, _ = sentiment_engine.analyze_sentiment(pd.Series(['good', 'bad', 'great']), use_disk_cache=False)
+    # 'good' is used again, so 'bad' is the least recently used entry when 'awful' arrives
+    sentiment_engine.analyze_sentiment(pd.Series(['good']), use_disk_cache=False)
+    scored, stats = sentiment_engine.analyze_sentiment(pd.Series(['awful', 'good']), use_disk_cache=False)
+
+    memory = sentiment_engine._memory_cache['textblob']
+    assert len(memory) == 3
+    assert stats['memory_hits'] == 1
+    hashes = pd.util.hash_array(pd.Series(['good', 'bad', 'great', 'awful']).to_numpy(dtype=object)).view('int64')
+    assert hashes[1] not in memory
+    assert list(memory) == [hashes[2], hashes[0], hashes[3]]
+    assert scored['polarity'].iloc[1] == first['polarity'].iloc[0]
@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+import pytest
+import utils.spatial_clustering as spatial_clustering
+
+
+def _pings(seed=0):
+    rng = np.random.default_rng(seed)
+    lat = np.r_[rng.normal(40.0, 0.002, 200), rng.normal(40.5, 0.002, 200), rng.uniform(39.0, 41.0, 100)]
+    lon = np.r_[rng.normal(-74.0, 0.002, 200), rng.normal(-74.5, 0.002, 200), rng.uniform(-75.0, -73.0, 100)]
+    return pd.Series(lat), pd.Series(lon)
+
+
+def test_hdbscan_never_clusters_unweighted_cells(monkeypatch):
+    monkeypatch.setattr(spatial_clustering, 'AGGREGATION_THRESHOLD', 10)
+    lat, lon = _pings()
+
+    _, _, dbscan_stats = spatial_clustering.cluster_points(lat, lon, method='dbscan', eps_km=0.5)
+    assert dbscan_stats['aggregated'] and dbscan_stats['clustered_units'] < len(lat)
+
+    _, _, hdbscan_stats = spatial_clustering.cluster_points(lat, lon, method='hdbscan', min_cluster_size=50)
+    assert not hdbscan_stats['aggregated'] and hdbscan_stats['clustered_units'] == len(lat)
+    assert hdbscan_stats['clusters'] == 2
+
+    with pytest.raises(ValueError):
+        spatial_clustering.cluster_points(lat, lon, method='hdbscan', aggregate=True)
@@ -0,0 +1,51 @@
+import itertools
+import re
+import numpy as np
+import pandas as pd
+from utils.text_cleaning import TEXT_OPERATIONS, compile_text_pipeline, clean_text_series
+
+SAMPLES = [
+    'xa1by', 'contact bob@www.example.com now', 'Call 555-123-4567 or visit http://a.b/c?d=1!',
+    '<b>Price:</b> $1,299.99 (50% off) email sales@shop.co', "It's John's 2nd visit -- won't last"
+]
+
+
+def _sequential(operations, custom_pattern=None, replacement=''):
+    def run(text):
+        for op in operations:
+            kind, *args = TEXT_OPERATIONS[op]
+            text = re.sub(args[0], args[1], text) if kind == 'sub' else args[0](text)
+        return re.sub(custom_pattern, replacement, text) if custom_pattern else text
+    return run
+
+
+def test_pipeline_matches_sequential_substitutions():
+    deletions = ['remove_numbers', 'remove_punctuation', 'remove_special_chars', 'remove_urls',
+                 'remove_emails', 'remove_phones', 'remove_html']
+    for operations in itertools.permutations(deletions, 3):
+        for custom in (None, 'ab', r'\s+'):
+            pipeline = compile_text_pipeline(operations, custom, '')
+            expected = _sequential(operations, custom)
+            for text in SAMPLES:
+                assert pipeline(text) == expected(text), (operations, custom, text)
+
+
+def test_custom_pattern_runs_after_the_operations():
+    assert compile_text_pipeline(('remove_numbers',), 'ab', '')('xa1by') == 'xy'
+    assert compile_text_pipeline(('remove_urls', 'remove_emails'))('contact bob@www.example.com now') == 'contact bob@ now'
+
+
+def test_expand_contractions_keeps_possessives_and_case():
+    expand = compile_text_pipeline(('expand_contractions',))
+    assert expand("John's car won't start") == "John's car will not start"
+    assert expand("It's the summit's peak, that's all") == "It is the summit's peak, that is all"
+    assert expand("She's sure they're here and I'm not") == "She is sure they are here and I am not"
+    assert compile_text_pipeline(('expand_contractions', 'lowercase'))("It's") == 'it is'
+
+
+def test_clean_text_series_keeps_missing_and_non_string_values_missing():
+    series = pd.Series(['A1 ', None, 42, 'b2', np.nan, 'A1 '], dtype=object)
+    cleaned, stats = clean_text_series(series, ['remove_numbers', 'strip'])
+    assert cleaned.tolist()[0] == 'A' and cleaned.tolist()[3] == 'b' and cleaned.tolist()[5] == 'A'
+    assert cleaned.isna().tolist() == [False, True, True, False, True, False]
+    assert stats['distinct_values'] == 2
@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+from utils.text_profiling import profile_text_series
+
+
+def test_length_median_matches_numpy():
+    for values in (['a', 'bb', 'ccc', 'dddd'], ['a', 'a', 'bbb', 'cccccc', 'cccccc'], ['xx', 'xx'], ['', 'abcd']):
+        series = pd.Series(values)
+        assert profile_text_series(series)['length_median'] == np.median(series.str.len())
+    assert profile_text_series(pd.Series([], dtype=object))['length_median'] == 0.0
+
+
+def test_char_histogram_counts_every_row():
+    profile = profile_text_series(pd.Series(['Ab 1', 'Ab 1', 'é!']))
+    assert profile['char_histogram'].to_dict() == {
+        'upper': 2, 'lower': 3, 'digit': 2, 'space': 2, 'other_letter': 0, 'special': 1}
+
+
+def test_char_counts_are_chunk_independent_and_accept_lone_surrogates():
+    from utils.text_profiling import _char_class_counts
+
+    texts = ['Ab 1', '', 'x' * 50, 'é!\ud800', 'ZZ 99']
+    lengths = np.array([len(text) for text in texts])
+    whole = _char_class_counts(texts, lengths)
+    for chunk_chars in (1, 3, 7, 60):
+        np.testing.assert_array_equal(_char_class_counts(texts, lengths, chunk_chars), whole)
+    assert whole[3].sum() == 3 and whole[2][1] == 50
+    assert profile_text_series(pd.Series(texts, dtype=object))['rows'] == len(texts)
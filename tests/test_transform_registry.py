@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+from utils.data_processor import DataProcessor
+from utils.transform_registry import TransformRegistry
+
+
+def _frame():
+    return pd.DataFrame({'city': ['a', 'b', 'c', 'a', 'b'], 'value': [1.0, 2.0, 3.0, 4.0, 5.0]})
+
+
+def test_encode_then_scale_round_trip(tmp_path):
+    train = _frame()
+    processor = DataProcessor()
+    encoded = processor.encode_categorical(train, method='label', columns=['city'])
+    scaled = processor.scale_features(encoded)
+
+    processor.registry.version = 'chain'
+    processor.registry.save(str(tmp_path))
+    saved = TransformRegistry.load('chain', str(tmp_path))
+    result, applied = saved.transform(train)
+
+    assert len(applied) == 2
+    pd.testing.assert_frame_equal(result[scaled.columns], scaled, check_dtype=False)
+
+
+def test_scaler_on_encoded_output_is_applied():
+    train = _frame()
+    registry = TransformRegistry()
+    encoder = LabelEncoder()
+    train['city_label_encoded'] = encoder.fit_transform(train['city'].astype(str).fillna('missing'))
+    registry.record('city', 'city_label_encoded', encoder, as_text=True, na_value='missing')
+    scaler = StandardScaler()
+    expected = scaler.fit_transform(train[['city_label_encoded']]).ravel()
+    registry.record('city_label_encoded', 'city_label_encoded_scaled', scaler)
+
+    result, applied = registry.transform(_frame())
+
+    assert len(applied) == 2
+    np.testing.assert_allclose(result['city_label_encoded_scaled'], expected)
+
+
+def test_standard_scaler_without_centering_or_scaling():
+    values = np.array([[1.0, 10.0], [3.0, 20.0], [8.0, 60.0]])
+    for options in ({'with_mean': False}, {'with_std': False}, {'with_mean': False, 'with_std': False}):
+        scaler = StandardScaler(**options).fit(values)
+        registry = TransformRegistry()
+        registry.record(['a', 'b'], ['a', 'b'], scaler)
+        result, _ = registry.transform(pd.DataFrame(values, columns=['a', 'b']))
+        np.testing.assert_allclose(result[['a', 'b']].to_numpy(), scaler.transform(values))
+
+
+def test_binary_encoder_missing_rows_get_their_fitted_encoding():
+    from category_encoders import BinaryEncoder
+
+    train = pd.DataFrame({'c': ['a', 'b', None, 'c', 'a']})
+    encoder = BinaryEncoder(cols=['c']).fit(train)
+    expected = encoder.transform(train)
+    registry = TransformRegistry()
+    registry.record('c', expected.columns.tolist(), encoder)
+
+    result, _ = registry.transform(train)
+    np.testing.assert_array_equal(result[expected.columns].to_numpy(), expected.to_numpy())
@@ -0,0 +1,57 @@
+import re
+import numpy as np
+import pandas as pd
+from utils.type_inference import infer_column_type
+
+
+def test_formatted_amounts_are_numeric():
+    rng = np.random.default_rng(0)
+    amounts = pd.Series(['{:,.2f}'.format(value) for value in rng.uniform(0, 1500, 500)], name='amount')
+    assert (amounts.str.contains(',')).mean() > 0.2
+    assert infer_column_type(amounts)['semantic_type'] == 'float'
+
+
+def test_latlon_pairs_are_geo():
+    rng = np.random.default_rng(1)
+    pairs = pd.Series([f"{lat:.4f}, {lon:.4f}" for lat, lon in zip(rng.uniform(-90, 90, 200), rng.uniform(-180, 180, 200))],
+                      name='position')
+    assert infer_column_type(pairs)['semantic_type'] == 'geo'
+
+
+def test_decimal_comma_and_out_of_range_pairs_are_not_geo():
+    decimal_comma = pd.Series([f"{value:,.2f}".replace(',', ' ').replace('.', ',').replace(' ', '.')
+                               for value in np.linspace(1000, 9000, 200)], name='amount')
+    assert infer_column_type(decimal_comma)['semantic_type'] != 'geo'
+    out_of_range = pd.Series([f"{95 + i % 4}.5, {190 + i % 7}.25" for i in range(200)], name='reading')
+    assert infer_column_type(out_of_range)['semantic_type'] != 'geo'
+
+
+def test_numeric_location_id_is_not_geo():
+    location_id = pd.Series(np.arange(1, 201), name='location_id')
+    assert infer_column_type(location_id)['semantic_type'] != 'geo'
+    # Integer location codes read as float because of a missing value
+    location = pd.Series(np.r_[np.arange(10, 60), np.nan], name='location')
+    assert infer_column_type(location)['semantic_type'] != 'geo'
+    latitude = pd.Series(np.linspace(-45.5, 45.5, 200), name='latitude')
+    assert infer_column_type(latitude)['semantic_type'] == 'geo'
+
+
+def test_datetime_signatures_parse_their_own_matches():
+    from utils.type_inference import DATETIME_SIGNATURES, detect_datetime_format
+
+    candidates = [
+        '2024-03-07', '2024-03-07 09:05:01', '2024-03-07T09:05:01', '2024-03-07 09:05', '2024-03-07T09:05',
+        '2024-03-07T09:05:01.250Z', '2024-03-07T09:05:01+02:00', '2024/03/07', '3/7/2024', '03/07/2024',
+        '3/7/2024 9:05', '3/7/2024 9:05:01', '12/31/2024 23:59:59', '3-7-2024', '7.3.2024', '7 Mar 2024',
+        '07-Mar-2024', 'Mar 7, 2024', 'March 7, 2024', 'September 30, 2024'
+    ]
+    for pattern, fmt in DATETIME_SIGNATURES:
+        matches = pd.Series([text for text in candidates if re.fullmatch(pattern, text)])
+        assert len(matches), pattern
+        parsed = pd.to_datetime(matches, format=fmt, errors='coerce', utc=True)
+        assert parsed.notna().all(), (pattern, fmt, matches[parsed.isna()].tolist())
+
+    for values in (['2024-01-01T10:00:00', '2024-01-02T11:30:00'], ['1/2/2024 10:00', '12/3/2024 9:15']):
+        fmt, rate = detect_datetime_format(pd.Series(values))
+        assert rate == 1.0
+        assert pd.to_datetime(pd.Series(values), format=fmt, errors='coerce').notna().all()
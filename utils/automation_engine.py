@@ -5,6 +5,8 @@ from sklearn.impute import SimpleImputer, KNNImputer
 from sklearn.ensemble import IsolationForest
 from scipy import stats
 import streamlit as st
+from utils.type_inference import infer_column_types, is_text_column, NUMERIC_SEMANTIC_TYPES
+from utils.numeric_coercion import coerce_numeric, convertible_fraction
 
 class AutomationEngine:
     def __init__(self):
@@ -143,23 +145,12 @@ class AutomationEngine:
         """Analyze data types and recommend conversions"""
         recommendations = []
         
+        inferred = infer_column_types(df)
+        
         for col in df.columns:
-            if df[col].dtype == 'object':
+            if is_text_column(df[col]):
                 # Check if numeric values are stored as strings
-                sample_values = df[col].dropna().head(100)
-                numeric_count = 0
-                
-                for val in sample_values:
-                    if isinstance(val, str):
-                        # Remove common numeric formatting
-                        clean_val = str(val).replace(',', '').replace('$', '').replace('%', '').strip()
-                        try:
-                            float(clean_val)
-                            numeric_count += 1
-                        except:
-                            pass
-                
-                if numeric_count > len(sample_values) * 0.8:
+                if inferred[col]['semantic_type'] in NUMERIC_SEMANTIC_TYPES:
                     recommendations.append({
                         'type': 'data_types',
                         'column': col,
@@ -284,8 +275,8 @@ class AutomationEngine:
                 success_msg = f"Removed {removed} duplicate records"
             
             elif action == 'convert_to_numeric':
-                df[column] = pd.to_numeric(df[column].astype(str).str.replace(r'[,$%]', '', regex=True), errors='coerce')
-                success_msg = f"Converted '{column}' to numeric type"
+                df[column], coercion = coerce_numeric(df[column])
+                success_msg = f"Converted '{column}' to numeric type ({coercion['convertible_fraction']:.1%} of values parsed)"
             
             elif action == 'auto_scale':
                 data_processor.scale_features(method='auto')
@@ -400,19 +391,10 @@ class AutomationEngine:
             })
         
         # Data type insights
-        object_cols = df.select_dtypes(include=['object']).columns
-        for col in object_cols:
-            # Check if it might be numeric
-            sample_vals = df[col].dropna().head(50)
-            numeric_count = 0
-            for val in sample_vals:
-                try:
-                    float(str(val).replace(',', '').replace('$', '').strip())
-                    numeric_count += 1
-                except:
-                    pass
-            
-            if numeric_count > len(sample_vals) * 0.8:
+        text_cols = [col for col in df.columns if is_text_column(df[col])]
+        for col in text_cols:
+            # Check if it might be numeric (currency, percent, separators and units included)
+            if convertible_fraction(df[col]) > 0.8:
                 insights.append({
                     'severity': 'medium',
                     'message': f"Column '{col}' appears to contain numeric data stored as text"
@@ -464,18 +446,11 @@ class AutomationEngine:
             issue_id += 1
         
         # Data type issues
-        for col in df.select_dtypes(include=['object']).columns:
+        for col in df.columns:
+            if not is_text_column(df[col]):
+                continue
             # Check for potential numeric columns
-            sample_vals = df[col].dropna().head(50)
-            numeric_count = 0
-            for val in sample_vals:
-                try:
-                    float(str(val).replace(',', '').replace('$', '').strip())
-                    numeric_count += 1
-                except:
-                    pass
-            
-            if numeric_count > len(sample_vals) * 0.8:
+            if convertible_fraction(df[col]) > 0.8:
                 issues.append({
                     'id': issue_id,
                     'category': 'Data Types',
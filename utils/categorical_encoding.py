@@ -0,0 +1,348 @@
+import pandas as pd
+import numpy as np
+import concurrent.futures
+import os
+from scipy import sparse as sp
+from sklearn.utils import murmurhash3_32
+
+# Dense one-hot output above this many bytes switches to sparse (sparse='auto') or is refused
+ONE_HOT_MEMORY_BUDGET = 512 * 1024 ** 2
+# Bytes per stored value in a sparse uint8 column: the value plus an int32 row index
+SPARSE_BYTES_PER_VALUE = 5
+# Hash buckets per column for feature hashing
+HASH_COMPONENTS = 8
+# Out-of-fold folds for target encoding
+TARGET_ENCODING_FOLDS = 5
+# Integer-valued numeric targets with at most this many distinct values are encoded per class
+TARGET_MAX_CLASSES = 20
+# Row x column codes aggregated per grouped pass; bounds the temporary index / output arrays
+TARGET_ENCODING_CHUNK = 20_000_000
+
+
+def _category_codes(series, dummy_na):
+    """
+    Integer codes and category labels of a column, in pd.get_dummies order.
+
+    Categoricals keep all their categories; other columns use their sorted distinct values.
+    With dummy_na, missing values get their own trailing code.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes, categories = series.cat.codes.to_numpy(), series.cat.categories
+    else:
+        codes, categories = pd.factorize(series, sort=True)
+    labels = [str(value) for value in categories]
+    if dummy_na:
+        codes = np.where(codes < 0, len(labels), codes)
+        labels.append('nan')
+    return codes, labels
+
+
+def estimate_one_hot_memory(df, columns, dummy_na=True):
+    """
+    Size of a one-hot encoding before building it.
+
+    Returns a dict with the number of indicator columns, the dense uint8 size in bytes and
+    the sparse size (one stored value per non-missing cell).
+    """
+    n_indicators = 0
+    stored_values = 0
+    for col in columns:
+        series = df[col]
+        categories = len(series.cat.categories) if isinstance(series.dtype, pd.CategoricalDtype) else series.nunique()
+        n_indicators += categories + (1 if dummy_na else 0)
+        stored_values += len(series) if dummy_na else int(series.notna().sum())
+    return {
+        'indicator_columns': n_indicators,
+        'dense_bytes': len(df) * n_indicators,
+        'sparse_bytes': stored_values * SPARSE_BYTES_PER_VALUE
+    }
+
+
+def _indicator_matrix(column_codes, widths, n_rows):
+    """
+    One CSR matrix of uint8 indicators from per-column integer codes.
+
+    Column i's codes (-1 = no indicator) are offset by the widths of the columns before it,
+    so every column lands in its own block of a shared column space.
+    """
+    rows, cols = [], []
+    offset = 0
+    for codes, width in zip(column_codes, widths):
+        present = np.flatnonzero(codes >= 0)
+        rows.append(present)
+        cols.append(codes[present] + offset)
+        offset += width
+    rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+    cols = np.concatenate(cols) if cols else np.empty(0, dtype=np.int64)
+    return sp.csr_matrix((np.ones(len(rows), dtype=np.uint8), (rows, cols)), shape=(n_rows, offset))
+
+
+def _indicator_frame(matrix, names, index, sparse, dtype=np.uint8):
+    if sparse:
+        return pd.DataFrame.sparse.from_spmatrix(matrix.astype(dtype), index=index, columns=names)
+    return pd.DataFrame(matrix.toarray().astype(dtype, copy=False), index=index, columns=names)
+
+
+def one_hot_matrix(df, columns, dummy_na=True):
+    """
+    One-hot encode several columns into one scipy CSR matrix of uint8.
+
+    Each column is factorized once and its codes are offset into a shared column space, so
+    the whole block is assembled in a single construction. Returns (matrix, column names)
+    with names as pd.get_dummies would produce them ('{col}_{value}', '{col}_nan').
+    """
+    column_codes, widths, names = [], [], []
+    for col in columns:
+        codes, labels = _category_codes(df[col], dummy_na)
+        column_codes.append(codes)
+        widths.append(len(labels))
+        names.extend(f"{col}_{label}" for label in labels)
+    return _indicator_matrix(column_codes, widths, len(df)), names
+
+
+def one_hot_encode(df, columns, dummy_na=True, sparse='auto', memory_budget=ONE_HOT_MEMORY_BUDGET):
+    """
+    One-hot encode columns into a single uint8 DataFrame, with a memory guardrail.
+
+    The output size is estimated first. sparse='auto' builds SparseDtype columns when the
+    dense estimate exceeds memory_budget; sparse=False refuses (MemoryError) instead of
+    allocating past the budget, and any output whose chosen layout still exceeds the
+    budget is refused. Returns the encoded DataFrame (aligned with df) and the estimate
+    dict extended with the chosen layout.
+    """
+    estimate = estimate_one_hot_memory(df, columns, dummy_na)
+    use_sparse = estimate['dense_bytes'] > memory_budget if sparse == 'auto' else bool(sparse)
+    size = estimate['sparse_bytes'] if use_sparse else estimate['dense_bytes']
+    if size > memory_budget:
+        raise MemoryError(
+            f"One-hot encoding would need {size / 1024 ** 2:,.0f} MB "
+            f"({estimate['indicator_columns']:,} columns, {'sparse' if use_sparse else 'dense'}), "
+            f"over the {memory_budget / 1024 ** 2:,.0f} MB budget"
+        )
+
+    matrix, names = one_hot_matrix(df, columns, dummy_na)
+    return _indicator_frame(matrix, names, df.index, use_sparse), {**estimate, 'sparse': use_sparse, 'columns': names}
+
+
+def hash_buckets(series, n_components=HASH_COMPONENTS, seed=0):
+    """
+    Hash bucket (0 .. n_components - 1) of every value, -1 where missing.
+
+    Each distinct value is hashed once with MurmurHash3 (the hash scikit-learn's
+    FeatureHasher uses) on its string form, and the buckets are broadcast back to the rows
+    through the factorized codes.
+    """
+    codes, uniques = pd.factorize(series)
+    hashes = np.fromiter((murmurhash3_32(str(value), seed=seed, positive=True) for value in uniques),
+                         dtype=np.int64, count=len(uniques))
+    return np.append(hashes % n_components, -1)[codes]
+
+
+def hash_matrix(df, columns, n_components=HASH_COMPONENTS, seed=0):
+    """Feature-hash several columns into one CSR block of n_components indicators per column"""
+    column_codes = [hash_buckets(df[col], n_components, seed) for col in columns]
+    names = [f"{col}_hash_{i}" for col in columns for i in range(n_components)]
+    return _indicator_matrix(column_codes, [n_components] * len(columns), len(df)), names
+
+
+def hash_encode(df, columns, n_components=HASH_COMPONENTS, sparse=False, seed=0):
+    """
+    Feature-hash high-cardinality columns into a compact int8 block.
+
+    Every column gets n_components indicator columns ('{col}_hash_{i}') with a 1 in its
+    value's bucket (all zeros for missing values). All columns are encoded in one pass
+    into a single DataFrame, as SparseDtype(int8) columns when sparse is true.
+    """
+    matrix, names = hash_matrix(df, columns, n_components, seed)
+    return _indicator_frame(matrix, names, df.index, sparse, dtype=np.int8)
+
+
+def _target_type(target):
+    """'binary', 'multiclass' or 'continuous', following scikit-learn's TargetEncoder(target_type='auto')"""
+    if pd.api.types.is_numeric_dtype(target) and not pd.api.types.is_bool_dtype(target):
+        numbers = target.dropna().to_numpy(dtype=np.float64)
+        # Fractional values settle it without counting distinct values
+        if not np.array_equal(numbers, np.round(numbers)):
+            return 'continuous'
+        distinct = target.nunique()
+        return 'binary' if distinct <= 2 else 'multiclass' if distinct <= TARGET_MAX_CLASSES else 'continuous'
+    return 'binary' if target.nunique() <= 2 else 'multiclass'
+
+
+def target_matrix(target, target_type='auto'):
+    """
+    Target as a float matrix with one column per encoded output.
+
+    Continuous targets give one column, binary targets one 0/1 column for the second sorted
+    class and multiclass targets one indicator column per class. Missing targets are NaN
+    rows. Returns (matrix, target_type, classes) with classes None for continuous targets.
+    """
+    if target_type == 'auto':
+        target_type = _target_type(target)
+    if target_type == 'continuous':
+        return target.to_numpy(dtype=np.float64, na_value=np.nan).reshape(-1, 1), target_type, None
+
+    codes, classes = pd.factorize(target, sort=True)
+    if target_type == 'binary':
+        if len(classes) > 2:
+            raise ValueError(f"Binary target encoding needs at most 2 classes, found {len(classes)}")
+        matrix = (codes == 1).astype(np.float64).reshape(-1, 1)
+        classes = list(classes[-1:])
+    else:
+        matrix = (codes[:, None] == np.arange(len(classes))).astype(np.float64)
+        classes = list(classes)
+    matrix[codes < 0] = np.nan
+    return matrix, target_type, classes
+
+
+def _fold_ids(n_rows, strata, cv, shuffle, random_state):
+    """
+    Fold (0 .. cv - 1) of every row.
+
+    Rows are shuffled, stably sorted by stratum (the target class, or a single stratum for
+    continuous targets) and dealt round-robin, so every fold gets the same class mix.
+    """
+    order = np.random.default_rng(random_state).permutation(n_rows) if shuffle else np.arange(n_rows)
+    if strata is not None:
+        # Small integer strata sort with a radix sort
+        order = order[np.argsort(strata[order].astype(np.int16), kind='stable')]
+    folds = np.empty(n_rows, dtype=np.int64)
+    folds[order] = np.arange(n_rows) % cv
+    return folds
+
+
+def _smoothed_means(counts, sums, squares, prior, prior_variance, smooth):
+    """
+    Category means shrunk towards the prior.
+
+    smooth='auto' is scikit-learn's empirical Bayes blend: the weight on the category mean is
+    n * var(y) / (n * var(y) + within-category variance). A number m is the m-estimate
+    (sum + m * prior) / (n + m). Empty categories get the prior.
+    """
+    counts = counts[..., None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = sums / counts
+        if smooth == 'auto':
+            within = np.maximum(squares / counts - means ** 2, 0)
+            weight = prior_variance * counts / (prior_variance * counts + within)
+            encoded = weight * means + (1 - weight) * prior
+        else:
+            encoded = (sums + smooth * prior) / (counts + smooth)
+    return np.where(np.isfinite(encoded), encoded, prior)
+
+
+def _target_encode_group(df, columns, y, valid, folds, cv, smooth, na_label):
+    """
+    Out-of-fold and full-data encodings for a group of columns from one grouped aggregation.
+
+    Each column is factorized (missing values get their own trailing code) and its codes are
+    offset into a shared space, as in _indicator_matrix, with every fold in its own copy of
+    that space. A single bincount per target column then gives per-fold, per-category counts
+    and sums; a fold's out-of-fold statistics are the totals minus its own.
+    """
+    n_rows, n_targets = y.shape
+    column_codes, column_uniques = [], []
+    for col in columns:
+        codes, uniques = pd.factorize(df[col])
+        column_codes.append(np.where(codes < 0, len(uniques), codes))
+        column_uniques.append(uniques)
+    widths = np.array([len(uniques) + 1 for uniques in column_uniques])
+    offsets = np.concatenate([[0], np.cumsum(widths)[:-1]])
+    width = int(widths.sum())
+
+    # (column, row) -> fold * width + column offset + category code
+    index = (np.vstack(column_codes) + offsets[:, None] + folds * width).ravel()
+    size = cv * width
+    counts = np.bincount(index, weights=np.tile(valid.astype(np.float64), len(columns)), minlength=size)
+    sums = np.empty((size, n_targets))
+    squares = np.empty((size, n_targets))
+    for target in range(n_targets):
+        values = np.tile(y[:, target], len(columns))
+        sums[:, target] = np.bincount(index, weights=values, minlength=size)
+        # Squared sums are only needed for the within-category variance of smooth='auto'
+        squares[:, target] = np.bincount(index, weights=values ** 2, minlength=size) if smooth == 'auto' else 0
+
+    counts = counts.reshape(cv, width)
+    sums = sums.reshape(cv, width, n_targets)
+    squares = squares.reshape(cv, width, n_targets)
+    total_counts, total_sums, total_squares = counts.sum(axis=0), sums.sum(axis=0), squares.sum(axis=0)
+
+    # Prior (target mean / variance) over the valid rows outside each fold, and over all of them
+    fold_rows = np.bincount(folds, weights=valid, minlength=cv)
+    fold_sums = np.vstack([np.bincount(folds, weights=y[:, target], minlength=cv) for target in range(n_targets)]).T
+    fold_squares = np.vstack([np.bincount(folds, weights=y[:, target] ** 2, minlength=cv)
+                              for target in range(n_targets)]).T
+    rows, row_sums, row_squares = valid.sum(), y.sum(axis=0), (y ** 2).sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        oof_prior = (row_sums - fold_sums) / (rows - fold_rows)[:, None]
+        oof_variance = (row_squares - fold_squares) / (rows - fold_rows)[:, None] - oof_prior ** 2
+        prior = row_sums / rows
+        variance = row_squares / rows - prior ** 2
+
+    out_of_fold = _smoothed_means(total_counts - counts, total_sums - sums, total_squares - squares,
+                                  oof_prior[:, None, :], oof_variance[:, None, :], smooth)
+    encoded = out_of_fold.reshape(size, n_targets)[index].reshape(len(columns), n_rows, n_targets)
+    full = _smoothed_means(total_counts, total_sums, total_squares, prior, variance, smooth)
+
+    mappings = []
+    for position, uniques in enumerate(column_uniques):
+        labels = [str(value) for value in uniques] + [na_label]
+        block = full[offsets[position]:offsets[position] + widths[position]]
+        mappings.append([dict(zip(labels, block[:, target].tolist())) for target in range(n_targets)])
+    return encoded, mappings, prior
+
+
+def target_encode(df, columns, target, target_type='auto', smooth='auto', cv=TARGET_ENCODING_FOLDS,
+                  shuffle=True, random_state=42, n_jobs=-1, na_label='missing', chunk_size=TARGET_ENCODING_CHUNK):
+    """
+    Out-of-fold target encoding of several columns with grouped aggregations.
+
+    Every row is encoded with smoothed category means computed on the other cv - 1 folds
+    (stratified by class for binary / multiclass targets), as scikit-learn's
+    TargetEncoder.fit_transform does, so a row's own target never leaks into its encoding.
+    Columns are encoded in groups of about chunk_size row x column cells, each group in one
+    pass over its integer codes, and groups run on worker threads. Missing values are a
+    category of their own; rows with a missing target are encoded but not counted.
+
+    Output columns are '{col}_target_encoded', or '{col}_target_encoded_{class}' per class
+    for multiclass targets. Returns the encoded DataFrame (aligned with df) and a list of
+    {'source', 'output', 'mapping', 'default'} dicts holding the full-data encoding of each
+    output, keyed by the string form of each category (na_label for missing), for encoding
+    new data.
+    """
+    y, target_type, classes = target_matrix(target, target_type)
+    valid = ~np.isnan(y).any(axis=1)
+    y = np.where(valid[:, None], y, 0.0)
+    if target_type == 'continuous':
+        strata = None
+    else:
+        strata = np.where(valid, y.argmax(axis=1) if target_type == 'multiclass' else y[:, 0], -1)
+    folds = _fold_ids(len(y), strata, cv, shuffle, random_state)
+
+    columns = list(columns)
+    per_group = max(1, chunk_size // max(1, len(df) * y.shape[1]))
+    groups = [columns[start:start + per_group] for start in range(0, len(columns), per_group)]
+    n_jobs = (os.cpu_count() or 1) if n_jobs in (None, -1) else n_jobs
+
+    def encode(group):
+        return _target_encode_group(df, group, y, valid, folds, cv, smooth, na_label)
+
+    if n_jobs == 1 or len(groups) == 1:
+        results = [encode(group) for group in groups]
+    else:
+        # factorize and bincount work on whole arrays, so threads share df without copying it
+        with concurrent.futures.ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            results = list(executor.map(encode, groups))
+
+    suffixes = [''] if target_type != 'multiclass' else [f"_{value}" for value in classes]
+    # Column-major, so each output column is filled in place and the frame wraps it as one block
+    data = np.empty((len(df), len(columns) * len(suffixes)), order='F')
+    outputs, encodings = [], []
+    for group, (encoded, mappings, prior) in zip(groups, results):
+        for position, col in enumerate(group):
+            for target_position, suffix in enumerate(suffixes):
+                data[:, len(outputs)] = encoded[position, :, target_position]
+                outputs.append(f"{col}_target_encoded{suffix}")
+                encodings.append({'source': col, 'output': outputs[-1], 'mapping': mappings[position][target_position],
+                                  'default': float(prior[target_position])})
+    return pd.DataFrame(data, index=df.index, columns=outputs, copy=False), encodings
@@ -1,9 +1,15 @@
 import pandas as pd
 import numpy as np
 from sklearn.impute import SimpleImputer, KNNImputer
-from sklearn.preprocessing import StandardScaler, LabelEncoder, OneHotEncoder
+from sklearn.preprocessing import LabelEncoder, OneHotEncoder
 from sklearn.ensemble import IsolationForest
 from sklearn.decomposition import PCA
+from utils.imputation_engine import group_impute
+from utils.categorical_encoding import one_hot_encode, ONE_HOT_MEMORY_BUDGET
+from utils.transform_registry import TransformRegistry
+from utils.scaling_engine import scale_columns, SCALING_METHODS
+from utils.quantile_sketch import DEFAULT_CHUNK_SIZE
+from utils.type_inference import infer_column_types, is_text_column, NUMERIC_SEMANTIC_TYPES
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -17,6 +23,8 @@ class DataProcessor:
         self.encoders = {}
         self.imputers = {}
         self.processing_history = []
+        # Fitted encoders / scalers in persistable form, for transform-only reuse on new data
+        self.registry = TransformRegistry()
     
     def add_to_history(self, operation, details):
         """Add operation to processing history"""
@@ -29,36 +37,38 @@ class DataProcessor:
     def detect_data_types(self, df):
         """Automatically detect and suggest data types"""
         suggestions = {}
+        inferred = infer_column_types(df)
         
         for col in df.columns:
-            # Check for numeric conversion possibilities
-            if df[col].dtype == 'object':
-                # Try to convert to numeric
-                try:
-                    pd.to_numeric(df[col], errors='raise')
-                    suggestions[col] = 'numeric'
-                except:
-                    # Check for datetime
-                    try:
-                        pd.to_datetime(df[col], errors='raise')
-                        suggestions[col] = 'datetime'
-                    except:
-                        # Check if it's categorical
-                        unique_ratio = df[col].nunique() / len(df)
-                        if unique_ratio < 0.1:
-                            suggestions[col] = 'categorical'
-                        else:
-                            suggestions[col] = 'text'
-            else:
+            if not is_text_column(df[col]):
                 suggestions[col] = 'keep_current'
+                continue
+            
+            semantic_type = inferred[col]['semantic_type']
+            if semantic_type in NUMERIC_SEMANTIC_TYPES:
+                suggestions[col] = 'numeric'
+            elif semantic_type == 'datetime':
+                suggestions[col] = 'datetime'
+            elif semantic_type in ('categorical', 'boolean'):
+                suggestions[col] = 'categorical'
+            else:
+                suggestions[col] = 'text'
         
         return suggestions
     
-    def handle_missing_values(self, df, strategy='auto', columns=None):
+    def handle_missing_values(self, df, strategy='auto', columns=None, group_by=None, time_column=None):
         """Handle missing values with various strategies"""
         if columns is None:
             columns = df.columns
         
+        if group_by:
+            # Group-wise fill covers all columns in one grouped pass
+            group_columns = [group_by] if isinstance(group_by, str) else list(group_by)
+            group_strategy = 'median' if strategy == 'auto' else strategy
+            result_df, stats = group_impute(df, columns, group_columns, group_strategy, time_column=time_column)
+            self.add_to_history('missing_values', f"Applied {group_strategy} within {', '.join(group_columns)} groups to {len(stats['columns'])} columns")
+            return result_df
+        
         result_df = df.copy()
         
         for col in columns:
@@ -123,12 +133,19 @@ class DataProcessor:
         
         return outliers
     
-    def encode_categorical(self, df, method='auto', columns=None):
-        """Encode categorical variables"""
+    def encode_categorical(self, df, method='auto', columns=None, sparse='auto', memory_budget=ONE_HOT_MEMORY_BUDGET):
+        """
+        Encode categorical variables.
+
+        One-hot columns are encoded together in one uint8 block and attached with a single
+        concat; the block is sparse when sparse=True, or with sparse='auto' when its dense
+        size would exceed memory_budget (see utils.categorical_encoding.one_hot_encode).
+        """
         if columns is None:
             columns = df.select_dtypes(include=['object', 'category']).columns
         
         result_df = df.copy()
+        one_hot_columns = []
         
         for col in columns:
             if method == 'auto':
@@ -136,42 +153,65 @@ class DataProcessor:
                 cardinality = df[col].nunique()
                 if cardinality <= 10:
                     # Low cardinality - use one-hot encoding
-                    dummies = pd.get_dummies(df[col], prefix=col)
-                    result_df = pd.concat([result_df.drop(col, axis=1), dummies], axis=1)
-                    self.add_to_history('encoding', f"One-hot encoded {col}")
+                    one_hot_columns.append(col)
                 else:
                     # High cardinality - use label encoding
                     le = LabelEncoder()
                     result_df[col] = le.fit_transform(df[col].astype(str))
                     self.encoders[col] = le
+                    self.registry.record(col, col, le, as_text=True)
                     self.add_to_history('encoding', f"Label encoded {col}")
             
             elif method == 'onehot':
-                dummies = pd.get_dummies(df[col], prefix=col)
-                result_df = pd.concat([result_df.drop(col, axis=1), dummies], axis=1)
+                one_hot_columns.append(col)
             
             elif method == 'label':
                 le = LabelEncoder()
                 result_df[col] = le.fit_transform(df[col].astype(str))
                 self.encoders[col] = le
+                self.registry.record(col, col, le, as_text=True)
+        
+        if one_hot_columns:
+            dummies, info = one_hot_encode(df, one_hot_columns, dummy_na=False, sparse=sparse, memory_budget=memory_budget)
+            result_df = pd.concat([result_df.drop(columns=one_hot_columns), dummies], axis=1)
+            self.registry.record_one_hot(df, one_hot_columns, info['columns'], dummy_na=False, drop_source=True)
+            layout = 'sparse' if info['sparse'] else 'dense'
+            for col in one_hot_columns:
+                self.add_to_history('encoding', f"One-hot encoded {col} ({layout})")
         
         return result_df
     
-    def scale_features(self, df, method='standard', columns=None):
-        """Scale numerical features"""
+    def scale_features(self, df, method='standard', columns=None, dtype=np.float64, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Scale numerical features with one scaler fitted on all columns (chunk by chunk on large data)"""
         if columns is None:
             columns = df.select_dtypes(include=[np.number]).columns
+        columns = list(columns)
         
         result_df = df.copy()
         
-        if method == 'standard':
-            scaler = StandardScaler()
-            result_df[columns] = scaler.fit_transform(df[columns])
-            self.scalers['standard'] = scaler
+        if method in SCALING_METHODS:
+            scaled_df, scaler, _ = scale_columns(df, columns, method, dtype=dtype, chunk_size=chunk_size)
+            result_df[columns] = scaled_df
+            self.scalers[method] = scaler
+            self.registry.record(columns, columns, scaler, dtype=dtype)
         
         self.add_to_history('scaling', f"Applied {method} scaling to {len(columns)} columns")
         return result_df
     
+    def save_transforms(self, version):
+        """Persist the fitted encoders / scalers under a pipeline version"""
+        self.registry.version = version
+        path = self.registry.save()
+        self.add_to_history('transforms', f"Saved {len(self.registry)} fitted transforms as version {version}")
+        return path
+    
+    def apply_transforms(self, df, version=None):
+        """Transform new data with saved (or, without a version, the current) fitted transforms - no refitting"""
+        registry = TransformRegistry.load(version) if version else self.registry
+        result_df, applied = registry.transform(df)
+        self.add_to_history('transforms', f"Applied {len(applied)} fitted transforms ({registry.version})")
+        return result_df
+    
     def create_features(self, df):
         """Automated feature engineering"""
         result_df = df.copy()
@@ -0,0 +1,188 @@
+import pandas as pd
+import numpy as np
+from pandas.tseries.holiday import USFederalHolidayCalendar
+
+NS_PER_SECOND = 1_000_000_000
+SECONDS_PER_DAY = 86400
+
+SEASONS = ['Winter', 'Spring', 'Summer', 'Fall']
+TIME_PERIODS = ['Night', 'Morning', 'Afternoon', 'Evening']
+
+# Feature key -> column suffix
+FEATURE_SUFFIXES = {
+    'year': 'year', 'month': 'month', 'day': 'day', 'weekday': 'weekday', 'week': 'week',
+    'quarter': 'quarter', 'hour': 'hour', 'minute': 'minute', 'dayofyear': 'dayofyear',
+    'is_weekend': 'is_weekend', 'is_month_end': 'is_month_end', 'is_month_start': 'is_month_start',
+    'is_holiday': 'is_holiday', 'season': 'season', 'time_period': 'time_period',
+    'days_since_start': 'days_since_start', 'days_until_end': 'days_until_end',
+    'bdays_since_start': 'bdays_since_start', 'age_years': 'age_years',
+    'seconds_since_midnight': 'seconds_since_midnight', 'cyclical': None
+}
+
+
+def holiday_calendar(start, end):
+    """Observed US federal holidays between two dates, from pandas' built-in rule table"""
+    return USFederalHolidayCalendar().holidays(start=start, end=end).to_numpy(dtype='datetime64[D]')
+
+
+def _civil_from_days(day_number):
+    """Year, month, day for days since 1970-01-01 (proleptic Gregorian, integer arithmetic only)"""
+    shifted = day_number + 719468
+    era = shifted // 146097
+    day_of_era = shifted - era * 146097
+    year_of_era = (day_of_era - day_of_era // 1460 + day_of_era // 36524 - day_of_era // 146096) // 365
+    day_of_year = day_of_era - (365 * year_of_era + year_of_era // 4 - year_of_era // 100)
+    month_index = (5 * day_of_year + 2) // 153  # months counted from March
+    day = day_of_year - (153 * month_index + 2) // 5 + 1
+    month = np.where(month_index < 10, month_index + 3, month_index - 9)
+    year = year_of_era + era * 400 + (month <= 2)
+    return year, month, day
+
+
+def _days_from_civil(year, month, day):
+    """Days since 1970-01-01 for a proleptic Gregorian date (inverse of _civil_from_days)"""
+    year = year - (month <= 2)
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * np.where(month > 2, month - 3, month + 9) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+def _day_calendar(day_number):
+    """Calendar components for an array of day numbers"""
+    year, month, day = _civil_from_days(day_number)
+    weekday = (day_number + 3) % 7  # 1970-01-01 was a Thursday; Monday = 0
+    thursday = day_number + (3 - weekday)  # ISO week: the week's Thursday decides its year
+    next_month_start = _days_from_civil(year + (month == 12), month % 12 + 1, 1)
+    return {
+        'year': year, 'month': month, 'day': day, 'weekday': weekday,
+        'dayofyear': day_number - _days_from_civil(year, 1, 1) + 1,
+        'week': (thursday - _days_from_civil(_civil_from_days(thursday)[0], 1, 1)) // 7 + 1,
+        'is_month_end': day_number == next_month_start - 1
+    }
+
+
+def _small_int(values, valid, dtype):
+    """Small integer column; nullable when some timestamps are missing"""
+    if valid.all():
+        return np.asarray(values).astype(dtype)
+    return pd.arrays.IntegerArray(np.where(valid, values, 0).astype(dtype), ~valid)
+
+
+def _category(codes, valid, labels):
+    return pd.Categorical.from_codes(np.where(valid, codes, -1), categories=labels)
+
+
+def extract_datetime_features(series, features, prefix=None, holidays=None, reference_date=None):
+    """
+    Compute calendar features for a datetime column in one vectorized pass.
+
+    All components are derived with NumPy from a single datetime64[ns] view of the column
+    (no per-row Python). Integer features use int8/int16/int32 (nullable when values are
+    missing), flags use int8 and season / time period are categoricals. Holiday flags and
+    business days use `holidays` (array of dates); the holiday flag defaults to observed
+    US federal holidays over the column's range. Returns a DataFrame aligned with series.
+    """
+    prefix = prefix or series.name
+    if getattr(series.dtype, 'tz', None) is not None:
+        series = series.dt.tz_localize(None)
+    stamps = series.to_numpy(dtype='datetime64[ns]')
+    valid = ~np.isnat(stamps)
+    safe = np.where(valid, stamps, np.datetime64(0, 'ns'))
+
+    ns_per_day = NS_PER_SECOND * SECONDS_PER_DAY
+    elapsed = safe.astype(np.int64)
+    day_number = elapsed // ns_per_day
+    days = day_number.astype('datetime64[D]')
+    if valid.any() and np.ptp(day_number[valid]) < len(day_number):
+        # Calendar computed once per day in the column's range, then gathered per row
+        low = day_number[valid].min()
+        table = _day_calendar(np.arange(low, day_number[valid].max() + 1))
+        position = np.clip(day_number - low, 0, len(table['year']) - 1)
+        calendar = {key: values[position] for key, values in table.items()}
+    else:
+        calendar = _day_calendar(day_number)
+    month, weekday = calendar['month'], calendar['weekday']
+    seconds = (elapsed // NS_PER_SECOND) % SECONDS_PER_DAY
+    hour = seconds // 3600
+    first_valid, last_valid = (days[valid].min(), days[valid].max()) if valid.any() else (None, None)
+    if valid.any():
+        elapsed_from_start = elapsed - elapsed[valid].min()
+        elapsed_to_end = elapsed[valid].max() - elapsed
+    else:
+        elapsed_from_start = elapsed_to_end = elapsed
+
+    columns = {}
+
+    def add(key, values):
+        columns[f"{prefix}_{FEATURE_SUFFIXES[key]}"] = values
+
+    for feature in features:
+        if feature == 'year':
+            add('year', _small_int(calendar['year'], valid, 'int16'))
+        elif feature == 'month':
+            add('month', _small_int(month, valid, 'int8'))
+        elif feature == 'day':
+            add('day', _small_int(calendar['day'], valid, 'int8'))
+        elif feature == 'weekday':
+            add('weekday', _small_int(weekday, valid, 'int8'))
+        elif feature == 'week':
+            add('week', _small_int(calendar['week'], valid, 'int8'))
+        elif feature == 'quarter':
+            add('quarter', _small_int((month - 1) // 3 + 1, valid, 'int8'))
+        elif feature == 'hour':
+            add('hour', _small_int(hour, valid, 'int8'))
+        elif feature == 'minute':
+            add('minute', _small_int(seconds // 60 % 60, valid, 'int8'))
+        elif feature == 'dayofyear':
+            add('dayofyear', _small_int(calendar['dayofyear'], valid, 'int16'))
+        elif feature == 'is_weekend':
+            add('is_weekend', ((weekday >= 5) & valid).astype(np.int8))
+        elif feature == 'is_month_end':
+            add('is_month_end', (calendar['is_month_end'] & valid).astype(np.int8))
+        elif feature == 'is_month_start':
+            add('is_month_start', ((calendar['day'] == 1) & valid).astype(np.int8))
+        elif feature == 'is_holiday':
+            holiday_dates = holidays if holidays is not None else (
+                holiday_calendar(first_valid, last_valid) if first_valid is not None else [])
+            add('is_holiday', (np.isin(days, np.asarray(holiday_dates, dtype='datetime64[D]')) & valid).astype(np.int8))
+        elif feature == 'season':
+            add('season', _category(month % 12 // 3, valid, SEASONS))
+        elif feature == 'time_period':
+            add('time_period', _category(hour // 6, valid, TIME_PERIODS))
+        elif feature == 'days_since_start':
+            add('days_since_start', _small_int(elapsed_from_start // ns_per_day, valid, 'int32'))
+        elif feature == 'days_until_end':
+            add('days_until_end', _small_int(elapsed_to_end // ns_per_day, valid, 'int32'))
+        elif feature == 'bdays_since_start':
+            # Business days from the earliest date up to and including each date
+            counts = np.busday_count(first_valid, days + 1, holidays=holidays if holidays is not None else []) \
+                if valid.any() else day_number
+            add('bdays_since_start', _small_int(counts, valid, 'int32'))
+        elif feature == 'age_years':
+            reference = np.datetime64(reference_date or pd.Timestamp.now(), 'D')
+            add('age_years', np.where(valid, (reference - days).astype(np.int64) / 365.25, np.nan))
+        elif feature == 'seconds_since_midnight':
+            add('seconds_since_midnight', _small_int(seconds, valid, 'int32'))
+        elif feature == 'cyclical':
+            for name, values, period in (('month', month, 12), ('weekday', weekday, 7)):
+                angle = 2 * np.pi * values / period
+                columns[f"{prefix}_{name}_sin"] = np.where(valid, np.sin(angle), np.nan).astype(np.float32)
+                columns[f"{prefix}_{name}_cos"] = np.where(valid, np.cos(angle), np.nan).astype(np.float32)
+        else:
+            raise ValueError(f"Unknown datetime feature: {feature}")
+
+    return pd.DataFrame(columns, index=series.index)
+
+
+def add_datetime_features(df, column, features, **options):
+    """
+    Extract features from df[column] and attach them with a single concat.
+
+    Existing columns with the same names are replaced. Returns the new DataFrame and the
+    list of created column names.
+    """
+    extracted = extract_datetime_features(df[column], features, **options)
+    remaining = df.drop(columns=[col for col in extracted.columns if col in df.columns])
+    return pd.concat([remaining, extracted], axis=1), list(extracted.columns)
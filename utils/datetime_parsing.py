@@ -0,0 +1,119 @@
+import pandas as pd
+import numpy as np
+import hashlib
+from collections import OrderedDict
+from utils.type_inference import DATETIME_SIGNATURES, detect_datetime_format, stratified_sample
+
+_CACHE_SIZE = 8
+FORMAT_SAMPLE_SIZE = 500
+
+# (digest of the distinct strings, fmt, formats, fallback) -> (parsed distinct values, inferred format, formats used)
+_parse_cache = OrderedDict()
+
+
+def _content_digest(text):
+    """Digest of every distinct string in order; any edited value changes it"""
+    return hashlib.sha1(pd.util.hash_pandas_object(text, index=False).to_numpy().tobytes()).hexdigest()
+
+
+def _parse_values(values, fmt):
+    """Parse distinct strings with one format (None = per-value inference) to naive datetime64"""
+    options = {'errors': 'coerce', 'format': fmt if fmt is not None else 'mixed'}
+    try:
+        parsed = pd.to_datetime(values, **options)
+    except ValueError:
+        # Mixed UTC offsets can only be represented after normalising to UTC
+        parsed = pd.to_datetime(values, utc=True, **options)
+    if getattr(parsed.dtype, 'tz', None) is not None:
+        parsed = parsed.dt.tz_convert('UTC').dt.tz_localize(None)
+    return parsed.astype('datetime64[ns]')
+
+
+def infer_datetime_format(series, sample_size=FORMAT_SAMPLE_SIZE):
+    """Explicit datetime format matching a stratified sample of the column, with its match rate"""
+    sample = stratified_sample(series, sample_size)
+    if len(sample) == 0:
+        return None, 0.0
+    return detect_datetime_format(sample.astype(str).str.strip())
+
+
+def datetime_parse_rate(series, sample_size=FORMAT_SAMPLE_SIZE):
+    """Share of sampled distinct values that parse as datetimes (used for candidate detection)"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return 1.0
+    fmt, rate = infer_datetime_format(series, sample_size)
+    if rate > 0:
+        return rate
+    uniques = pd.Series(stratified_sample(series, sample_size).astype(str).str.strip().unique())
+    if len(uniques) == 0:
+        return 0.0
+    return float(_parse_values(uniques, None).notna().mean())
+
+
+def _parse_distinct(text, fmt, formats, fallback):
+    """Parse distinct strings trying fmt, then the candidate formats; returns values, fmt and formats used"""
+    if fmt is None:
+        fmt, _ = infer_datetime_format(text)
+    candidates = list(formats) if formats else ([f for _, f in DATETIME_SIGNATURES] if fallback else [])
+    if fallback:
+        candidates.append(None)
+
+    parsed = pd.Series(pd.NaT, index=text.index, dtype='datetime64[ns]')
+    formats_used = []
+    order = ([fmt] if fmt is not None else []) + [f for f in candidates if f is None or f != fmt]
+    for candidate in order:
+        remaining = parsed.isna()
+        if not remaining.any():
+            break
+        try:
+            attempt = _parse_values(text[remaining], candidate)
+        except (ValueError, TypeError):
+            continue
+        if attempt.notna().any():
+            parsed[remaining] = attempt
+            formats_used.append(candidate if candidate is not None else 'inferred per value')
+
+    return parsed.to_numpy(), fmt, formats_used
+
+
+def parse_datetimes(series, fmt=None, formats=None, fallback=True, use_cache=True):
+    """
+    Parse a column to datetime64 by parsing each distinct string once and mapping back.
+
+    The format is given explicitly or inferred from a sample; distinct values it does not
+    match are retried with each of `formats` (default: the known signatures) and finally
+    with per-value inference; fallback=False restricts parsing to fmt and `formats` only.
+    The parsed distinct values are memoized by a digest of all distinct strings, so repeated
+    conversions of the same content only factorize and map back. Returns the parsed Series
+    and an info dict (format, formats_used, unique_values, success_rate).
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series, {'format': None, 'formats_used': [], 'unique_values': None, 'success_rate': 1.0}
+
+    codes, uniques = pd.factorize(series)
+    text = pd.Series(uniques).astype(str).str.strip()
+
+    key = (_content_digest(text), fmt, tuple(formats) if formats else None, fallback) if use_cache else None
+    if key is not None and key in _parse_cache:
+        _parse_cache.move_to_end(key)
+        parsed, fmt, formats_used = _parse_cache[key]
+    else:
+        parsed, fmt, formats_used = _parse_distinct(text, fmt, formats, fallback)
+        if key is not None:
+            _parse_cache[key] = (parsed, fmt, formats_used)
+            if len(_parse_cache) > _CACHE_SIZE:
+                _parse_cache.popitem(last=False)
+
+    # Map distinct results back to rows; missing rows (code -1) stay NaT
+    values = np.append(parsed, np.datetime64('NaT', 'ns'))
+    result = pd.Series(values[codes], index=series.index, name=series.name)
+
+    non_null = int((codes >= 0).sum())
+    info = {
+        'format': formats_used[0] if formats_used else fmt,
+        'formats_used': list(formats_used),
+        'unique_values': len(uniques),
+        'success_rate': float(result.notna().sum() / non_null) if non_null else 0.0
+    }
+    return result, info
+
@@ -0,0 +1,206 @@
+import pandas as pd
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = np.pi * EARTH_RADIUS_KM / 180
+
+
+def unit_vectors(lat, lon):
+    """Points on the unit sphere as an (n, 3) array of x, y, z"""
+    lat_r, lon_r = np.radians(lat), np.radians(lon)
+    return np.column_stack([np.cos(lat_r) * np.cos(lon_r), np.cos(lat_r) * np.sin(lon_r), np.sin(lat_r)])
+
+# WGS-84 ellipsoid
+WGS84_A = 6378.137
+WGS84_F = 1 / 298.257223563
+WGS84_B = WGS84_A * (1 - WGS84_F)
+# Shortest degree of latitude on the ellipsoid (at the equator), about 0.56% below KM_PER_DEGREE_LAT
+MIN_KM_PER_DEGREE_LAT = np.pi * WGS84_A * (1 - (2 * WGS84_F - WGS84_F ** 2)) / 180
+
+VINCENTY_ITERATIONS = 200
+VINCENTY_TOLERANCE = 1e-12
+
+# Candidate pairs evaluated per block in spatial joins
+JOIN_BLOCK_PAIRS = 2_000_000
+
+# Degrees with optional minutes / seconds and a hemisphere letter before or after,
+# e.g. 40°26'46"N, N 40 26 46, 40:26:46.3 S, -73.9857
+DMS_PATTERN = (
+    r'^\s*(?P<pre>[NSEWnsew])?\s*(?P<deg>[+-]?\d+(?:\.\d+)?)\s*(?:°|º|d|:|\s)?\s*'
+    r'(?:(?P<min>\d+(?:\.\d+)?)\s*(?:\'|′|m|:|\s)?\s*)?'
+    r'(?:(?P<sec>\d+(?:\.\d+)?)\s*(?:"|″|\'\'|s)?\s*)?(?P<post>[NSEWnsew])?\s*$'
+)
+
+
+def parse_dms(series):
+    """
+    Parse coordinate strings (decimal or degrees-minutes-seconds) to decimal degrees.
+
+    Each distinct string is matched once with one regex; S and W hemispheres make the value
+    negative. Unparseable strings become NaN. Returns a float64 Series aligned with series.
+    """
+    codes, uniques = pd.factorize(series)
+    parts = pd.Series(uniques, dtype=object).astype(str).str.extract(DMS_PATTERN)
+    degrees = parts['deg'].astype(float)
+    minutes = parts['min'].astype(float).fillna(0)
+    seconds = parts['sec'].astype(float).fillna(0)
+    values = degrees.abs() + minutes / 60 + seconds / 3600
+    hemisphere = parts['pre'].fillna(parts['post']).str.upper()
+    negative = degrees.lt(0) | hemisphere.isin(['S', 'W'])
+    values = values.where(~negative, -values).where((minutes < 60) & (seconds < 60))
+    mapped = np.append(values.to_numpy(dtype=np.float64), np.nan)[codes]
+    return pd.Series(mapped, index=series.index, name=series.name)
+
+
+def coordinate_values(series):
+    """Coordinates as float64: numeric columns as-is, text columns parsed (decimal or DMS)"""
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.astype(np.float64)
+    return parse_dms(series)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km on a sphere; arguments broadcast like NumPy arrays"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(value, dtype=np.float64)) for value in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def vincenty_km(lat1, lon1, lat2, lon2):
+    """
+    Geodesic distance in km on the WGS-84 ellipsoid (Vincenty's inverse formula).
+
+    Pairs are iterated as arrays, and each iteration only touches the pairs that have not
+    converged yet. Nearly antipodal pairs that never converge fall back to haversine.
+    """
+    lat1, lon1, lat2, lon2 = np.broadcast_arrays(*(np.asarray(value, dtype=np.float64)
+                                                   for value in (lat1, lon1, lat2, lon2)))
+    u1 = np.arctan((1 - WGS84_F) * np.tan(np.radians(lat1)))
+    u2 = np.arctan((1 - WGS84_F) * np.tan(np.radians(lat2)))
+    delta_lon = np.radians(lon2 - lon1)
+    sin_u1, cos_u1, sin_u2, cos_u2 = np.sin(u1), np.cos(u1), np.sin(u2), np.cos(u2)
+
+    def terms(lam, rows):
+        """Series terms of the inverse formula at the given lambda for a subset of pairs"""
+        sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+        sin_sigma = np.hypot(cos_u2[rows] * sin_lam, cos_u1[rows] * sin_u2[rows] - sin_u1[rows] * cos_u2[rows] * cos_lam)
+        cos_sigma = sin_u1[rows] * sin_u2[rows] + cos_u1[rows] * cos_u2[rows] * cos_lam
+        sigma = np.arctan2(sin_sigma, cos_sigma)
+        sin_alpha = np.where(sin_sigma == 0, 0, cos_u1[rows] * cos_u2[rows] * sin_lam / sin_sigma)
+        cos2_alpha = 1 - sin_alpha ** 2
+        cos_2sigma_m = np.where(cos2_alpha == 0, 0, cos_sigma - 2 * sin_u1[rows] * sin_u2[rows] / cos2_alpha)
+        return sin_sigma, cos_sigma, sigma, sin_alpha, cos2_alpha, cos_2sigma_m
+
+    # Iterate lambda only for the pairs that have not converged yet
+    lam = delta_lon.ravel().copy()
+    delta_lon, sin_u1, cos_u1, sin_u2, cos_u2 = (values.ravel() for values in (delta_lon, sin_u1, cos_u1, sin_u2, cos_u2))
+    active = np.arange(lam.size)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for _ in range(VINCENTY_ITERATIONS):
+            sin_sigma, cos_sigma, sigma, sin_alpha, cos2_alpha, cos_2sigma_m = terms(lam[active], active)
+            c = WGS84_F / 16 * cos2_alpha * (4 + WGS84_F * (4 - 3 * cos2_alpha))
+            updated = delta_lon[active] + (1 - c) * WGS84_F * sin_alpha * (
+                sigma + c * sin_sigma * (cos_2sigma_m + c * cos_sigma * (-1 + 2 * cos_2sigma_m ** 2)))
+            converged = np.abs(updated - lam[active]) < VINCENTY_TOLERANCE
+            lam[active] = updated
+            active = active[~converged]
+            if active.size == 0:
+                break
+
+        sin_sigma, cos_sigma, sigma, sin_alpha, cos2_alpha, cos_2sigma_m = terms(lam, slice(None))
+        u_sq = cos2_alpha * (WGS84_A ** 2 - WGS84_B ** 2) / WGS84_B ** 2
+        big_a = 1 + u_sq / 16384 * (4096 + u_sq * (-768 + u_sq * (320 - 175 * u_sq)))
+        big_b = u_sq / 1024 * (256 + u_sq * (-128 + u_sq * (74 - 47 * u_sq)))
+        delta_sigma = big_b * sin_sigma * (cos_2sigma_m + big_b / 4 * (
+            cos_sigma * (-1 + 2 * cos_2sigma_m ** 2)
+            - big_b / 6 * cos_2sigma_m * (-3 + 4 * sin_sigma ** 2) * (-3 + 4 * cos_2sigma_m ** 2)))
+        distance = (WGS84_B * big_a * (sigma - delta_sigma)).reshape(lat1.shape)
+
+    not_converged = np.zeros(lam.size, dtype=bool)
+    not_converged[active] = True
+    fallback = not_converged.reshape(lat1.shape) | ~np.isfinite(distance)
+    if fallback.any():
+        distance = np.where(fallback, haversine_km(lat1, lon1, lat2, lon2), distance)
+    return distance
+
+
+DISTANCE_FUNCTIONS = {'haversine': haversine_km, 'vincenty': vincenty_km}
+
+
+def validate_coordinates(lat, lon):
+    """
+    Classify coordinate pairs with array comparisons.
+
+    Returns a DataFrame of boolean masks aligned with the inputs: missing (either value
+    absent), unparseable (present but not a coordinate), valid (within [-90, 90] /
+    [-180, 180]), out_of_range and likely_swapped (out of range as given but valid with
+    latitude and longitude exchanged).
+    """
+    lat_values = coordinate_values(lat).to_numpy()
+    lon_values = coordinate_values(lon).to_numpy()
+    missing = (lat.isna() | lon.isna()).to_numpy()
+    unparseable = ~missing & (np.isnan(lat_values) | np.isnan(lon_values))
+    valid = (np.abs(lat_values) <= 90) & (np.abs(lon_values) <= 180)
+    out_of_range = ~missing & ~unparseable & ~valid
+    likely_swapped = out_of_range & (np.abs(lon_values) <= 90) & (np.abs(lat_values) <= 180)
+    return pd.DataFrame({'missing': missing, 'unparseable': unparseable, 'valid': valid,
+                         'out_of_range': out_of_range, 'likely_swapped': likely_swapped}, index=lat.index)
+
+
+def columns_look_swapped(lat, lon, threshold=0.5):
+    """True when most out-of-range pairs in two columns would be valid with the columns exchanged"""
+    checks = validate_coordinates(lat, lon)
+    out_of_range = int(checks['out_of_range'].sum())
+    return out_of_range > 0 and checks['likely_swapped'].sum() / out_of_range >= threshold
+
+
+def spatial_join(left, right, left_lat, left_lon, right_lat, right_lon, max_distance_km=1.0, method='haversine'):
+    """
+    All pairs of rows from two frames within max_distance_km of each other.
+
+    The right points are sorted by latitude; each left point only compares against the
+    right points inside its latitude band, found with searchsorted. The band uses the
+    shortest degree of latitude on the WGS-84 ellipsoid, so Vincenty pairs near the radius
+    are not cut off. Candidate pairs are expanded and measured in blocks so memory stays
+    bounded. Returns a DataFrame of df1_idx, df2_idx and distance (km).
+    """
+    distance_function = DISTANCE_FUNCTIONS[method]
+    lat1 = coordinate_values(left[left_lat]).to_numpy()
+    lon1 = coordinate_values(left[left_lon]).to_numpy()
+    lat2 = coordinate_values(right[right_lat]).to_numpy()
+    lon2 = coordinate_values(right[right_lon]).to_numpy()
+
+    left_rows = np.flatnonzero(~(np.isnan(lat1) | np.isnan(lon1)))
+    right_rows = np.flatnonzero(~(np.isnan(lat2) | np.isnan(lon2)))
+    right_rows = right_rows[np.argsort(lat2[right_rows], kind='stable')]
+    sorted_lat2 = lat2[right_rows]
+
+    band = max_distance_km / MIN_KM_PER_DEGREE_LAT
+    starts = np.searchsorted(sorted_lat2, lat1[left_rows] - band, side='left')
+    stops = np.searchsorted(sorted_lat2, lat1[left_rows] + band, side='right')
+    candidates = stops - starts
+    cumulative = np.cumsum(candidates)
+
+    matches = []
+    position = 0
+    while position < len(left_rows):
+        # Take as many left points as fit in one block of candidate pairs
+        done = cumulative[position - 1] if position else 0
+        end = max(position + 1, int(np.searchsorted(cumulative, done + JOIN_BLOCK_PAIRS, side='right')))
+        counts = candidates[position:end]
+        if counts.sum() > 0:
+            pair_left = np.repeat(left_rows[position:end], counts)
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            pair_right = right_rows[np.repeat(starts[position:end], counts) + offsets]
+            distances = distance_function(lat1[pair_left], lon1[pair_left], lat2[pair_right], lon2[pair_right])
+            keep = distances <= max_distance_km
+            matches.append(pd.DataFrame({
+                'df1_idx': left.index[pair_left[keep]],
+                'df2_idx': right.index[pair_right[keep]],
+                'distance': distances[keep]
+            }))
+        position = end
+
+    if not matches:
+        return pd.DataFrame({'df1_idx': left.index[:0], 'df2_idx': right.index[:0], 'distance': np.empty(0)})
+    return pd.concat(matches, ignore_index=True)
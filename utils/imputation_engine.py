@@ -0,0 +1,321 @@
+import pandas as pd
+import numpy as np
+import concurrent.futures
+import os
+import time
+from sklearn.neighbors import KDTree, BallTree
+from sklearn.linear_model import BayesianRidge
+
+DEFAULT_CHUNK_SIZE = 20000
+DEFAULT_REFERENCE_SAMPLE = 200000
+DEFAULT_TRAINING_SAMPLE = 100000
+# Missing patterns that get their own neighbour tree (the most frequent ones, with enough rows);
+# rows with rarer patterns share one masked-distance search against a smaller reference sample
+DEFAULT_MAX_TREES = 32
+MIN_TREE_ROWS = 100
+MASKED_REFERENCE_SAMPLE = 10000
+# Distance-matrix entries per chunk of the masked search (32 MB of float64)
+MASKED_BLOCK = 2 ** 22
+
+
+def _query_in_chunks(tree, X, n_neighbors, chunk_size, n_jobs):
+    """Query a neighbour tree for many rows, splitting the rows across worker threads"""
+    chunks = [X[start:start + chunk_size] for start in range(0, len(X), chunk_size)]
+    if n_jobs == 1 or len(chunks) == 1:
+        return np.vstack([tree.query(chunk, k=n_neighbors, return_distance=False) for chunk in chunks])
+
+    # Tree queries release the GIL, so threads scale without copying the index
+    with concurrent.futures.ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        results = executor.map(lambda chunk: tree.query(chunk, k=n_neighbors, return_distance=False), chunks)
+        return np.vstack(list(results))
+
+
+def _split_empty_columns(df, columns):
+    """Columns with at least one value, and the all-missing columns (left untouched by model imputation)"""
+    empty = df[columns].isna().all(axis=0).to_numpy() if len(df) else np.ones(len(columns), dtype=bool)
+    return ([col for col, is_empty in zip(columns, empty) if not is_empty],
+            [col for col, is_empty in zip(columns, empty) if is_empty])
+
+
+def _masked_neighbours(query, observed, reference, n_neighbors):
+    """
+    Nearest reference rows for query rows with different missing columns, by brute force.
+
+    Squared distances are summed over each row's observed columns only; the query's own
+    squared norm is the same for every reference row and is left out of the ranking.
+    """
+    filled = np.where(observed, query, 0.0)
+    squares = reference ** 2
+    neighbours = np.empty((len(query), n_neighbors), dtype=np.int64)
+    step = max(1, MASKED_BLOCK // len(reference))
+    for start in range(0, len(query), step):
+        block = slice(start, start + step)
+        distances = observed[block].astype(np.float64) @ squares.T - 2 * filled[block] @ reference.T
+        neighbours[block] = np.argpartition(distances, n_neighbors - 1, axis=1)[:, :n_neighbors]
+    return neighbours
+
+
+def knn_impute(df, columns=None, n_neighbors=5, reference_sample=DEFAULT_REFERENCE_SAMPLE,
+               chunk_size=DEFAULT_CHUNK_SIZE, n_jobs=-1, random_state=42, max_trees=DEFAULT_MAX_TREES):
+    """
+    KNN imputation using a KD/Ball tree over complete rows instead of dense pairwise distances.
+
+    Incomplete rows are grouped by missing pattern. The max_trees most frequent patterns
+    (with at least MIN_TREE_ROWS rows) each query a tree built on their observed columns;
+    all other rows share one chunked masked-distance search against a reference subsample,
+    so the cost does not grow with the number of distinct patterns. Gaps are filled with the
+    mean of the nearest complete neighbours. All-missing columns are skipped (they would leave
+    no complete rows) and listed in stats['empty_columns']. Returns the imputed DataFrame and
+    a stats dict.
+    """
+    start_time = time.time()
+    if columns is None:
+        columns = df.select_dtypes(include=[np.number]).columns
+    columns, empty_columns = _split_empty_columns(df, list(columns))
+    n_jobs = (os.cpu_count() or 1) if n_jobs in (None, -1) else n_jobs
+
+    result_df = df.copy()
+    X = df[columns].to_numpy(dtype=np.float64, copy=True)
+    missing = np.isnan(X)
+    incomplete_rows = np.flatnonzero(missing.any(axis=1))
+
+    # Reference set: complete rows, sampled for very large frames
+    reference = X[~missing.any(axis=1)]
+    if len(reference) > reference_sample:
+        rng = np.random.default_rng(random_state)
+        reference = reference[rng.choice(len(reference), size=reference_sample, replace=False)]
+    if len(reference) < n_neighbors:
+        raise ValueError(f"KNN imputation needs at least {n_neighbors} complete rows, found {len(reference)}")
+
+    # Standardize with reference statistics so every column contributes to distance
+    ref_mean = reference.mean(axis=0)
+    ref_std = reference.std(axis=0)
+    ref_std[ref_std == 0] = 1.0
+    ref_scaled = (reference - ref_mean) / ref_std
+
+    patterns, pattern_ids, pattern_rows = np.unique(missing[incomplete_rows], axis=0, return_inverse=True,
+                                                    return_counts=True)
+    pattern_ids = pattern_ids.ravel()
+    frequent = np.argsort(-pattern_rows, kind='stable')[:max_trees]
+    tree_patterns = frequent[pattern_rows[frequent] >= MIN_TREE_ROWS]
+    for pattern_id in tree_patterns:
+        pattern = patterns[pattern_id]
+        rows = incomplete_rows[pattern_ids == pattern_id]
+        observed = ~pattern
+
+        if not observed.any():
+            # Nothing to measure distance on: fall back to reference means
+            X[np.ix_(rows, pattern)] = ref_mean[pattern]
+            continue
+
+        tree_cls = KDTree if observed.sum() <= 15 else BallTree
+        tree = tree_cls(ref_scaled[:, observed])
+        query = (X[np.ix_(rows, observed)] - ref_mean[observed]) / ref_std[observed]
+        neighbours = _query_in_chunks(tree, query, n_neighbors, chunk_size, n_jobs)
+        X[np.ix_(rows, pattern)] = reference[:, pattern][neighbours].mean(axis=1)
+
+    # Rows with rare patterns: one masked search over a bounded reference sample
+    rare_rows = incomplete_rows[~np.isin(pattern_ids, tree_patterns)]
+    rare_missing = missing[rare_rows]
+    blank = rare_missing.all(axis=1)
+    X[rare_rows[blank]] = ref_mean
+    rare_rows, rare_missing = rare_rows[~blank], rare_missing[~blank]
+    if len(rare_rows):
+        masked_reference = np.arange(len(reference))
+        if len(reference) > MASKED_REFERENCE_SAMPLE:
+            rng = np.random.default_rng(random_state)
+            masked_reference = rng.choice(len(reference), size=MASKED_REFERENCE_SAMPLE, replace=False)
+        for start in range(0, len(rare_rows), chunk_size):
+            rows, gaps = rare_rows[start:start + chunk_size], rare_missing[start:start + chunk_size]
+            neighbours = _masked_neighbours((X[rows] - ref_mean) / ref_std, ~gaps, ref_scaled[masked_reference],
+                                            n_neighbors)
+            filled = reference[masked_reference[neighbours]].mean(axis=1)
+            X[rows] = np.where(gaps, filled, X[rows])
+
+    result_df[columns] = X
+    stats = {
+        'rows_imputed': len(incomplete_rows),
+        'values_imputed': int(missing.sum()),
+        'reference_size': len(reference),
+        'missing_patterns': len(patterns),
+        'pattern_trees': len(tree_patterns),
+        'rows_masked_search': len(rare_rows),
+        'empty_columns': empty_columns,
+        'elapsed_seconds': time.time() - start_time
+    }
+    return result_df, stats
+
+
+def _fit_and_predict_column(X, missing, target, training_sample, random_state):
+    """Fit one column on the others using a row subsample and predict its missing rows"""
+    features = np.delete(np.arange(X.shape[1]), target)
+    observed_rows = np.flatnonzero(~missing[:, target])
+    if len(observed_rows) > training_sample:
+        rng = np.random.default_rng(random_state + target)
+        observed_rows = rng.choice(observed_rows, size=training_sample, replace=False)
+
+    estimator = BayesianRidge()
+    estimator.fit(X[np.ix_(observed_rows, features)], X[observed_rows, target])
+    return estimator.predict(X[np.ix_(missing[:, target], features)])
+
+
+def iterative_impute(df, columns=None, max_iter=10, tol=1e-2, damping=0.3, training_sample=DEFAULT_TRAINING_SAMPLE,
+                     n_jobs=-1, random_state=42):
+    """
+    MICE-style iterative imputation with per-column models fitted in parallel each round.
+
+    Every round refits all incomplete columns against the previous round's values, so the
+    fits are independent and run concurrently. Updates are damped towards the previous round
+    to keep these simultaneous updates stable, and iteration stops early once the mean change
+    in imputed values falls below tol standard deviations. All-missing columns have nothing
+    to train on; they are skipped and listed in stats['empty_columns']. Returns the imputed
+    DataFrame and a stats dict with per-round timings.
+    """
+    start_time = time.time()
+    if columns is None:
+        columns = df.select_dtypes(include=[np.number]).columns
+    columns, empty_columns = _split_empty_columns(df, list(columns))
+    n_jobs = (os.cpu_count() or 1) if n_jobs in (None, -1) else n_jobs
+
+    result_df = df.copy()
+    X = df[columns].to_numpy(dtype=np.float64, copy=True)
+    missing = np.isnan(X)
+    targets = [j for j in np.argsort(missing.sum(axis=0)) if missing[:, j].any()]
+
+    # Initial fill with column means; single-column frames have nothing to model
+    col_means = np.nanmean(X, axis=0)
+    X[missing] = np.take(np.nan_to_num(col_means), np.nonzero(missing)[1])
+    scale = np.nanmean(np.nanstd(df[columns].to_numpy(dtype=np.float64), axis=0)) if X.size else 0.0
+
+    rounds = []
+    converged = False
+    if len(columns) > 1:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            for round_number in range(1, max_iter + 1):
+                round_start = time.time()
+                previous = X.copy()
+                predictions = executor.map(
+                    lambda j: _fit_and_predict_column(previous, missing, j, training_sample, random_state),
+                    targets
+                )
+                for j, values in zip(targets, predictions):
+                    X[missing[:, j], j] = damping * previous[missing[:, j], j] + (1 - damping) * values
+
+                change = np.mean(np.abs(X[missing] - previous[missing])) / max(scale, 1e-12)
+                rounds.append({'round': round_number, 'seconds': time.time() - round_start, 'change': change})
+                if change < tol:
+                    converged = True
+                    break
+
+    result_df[columns] = X
+    stats = {
+        'rounds': rounds,
+        'converged': converged,
+        'columns_modelled': len(targets),
+        'empty_columns': empty_columns,
+        'values_imputed': int(missing.sum()),
+        'elapsed_seconds': time.time() - start_time
+    }
+    return result_df, stats
+
+
+def _group_mode(work, column, group_columns):
+    """Most frequent value of a column within each group, broadcast back to rows"""
+    counts = work.groupby(group_columns + [column], sort=False, dropna=False, observed=True).size()
+    counts = counts[counts.index.get_level_values(column).notna()]
+    modes = (counts.sort_values(ascending=False, kind='stable')
+             .reset_index()
+             .drop_duplicates(subset=group_columns)
+             .set_index(group_columns)[column])
+    keys = pd.MultiIndex.from_frame(work[group_columns]) if len(group_columns) > 1 else work[group_columns[0]]
+    return pd.Series(modes.reindex(keys).to_numpy(), index=work.index)
+
+
+def _group_interpolate(work, columns, group_columns, time_column):
+    """Linear interpolation inside each group using time (or row order) as the x-axis"""
+    if time_column:
+        times = pd.to_datetime(work[time_column], errors='coerce')
+        # Rows without a valid time are neither interpolated nor used as anchors
+        position = times.astype('int64').astype(np.float64).where(times.notna())
+    else:
+        position = pd.Series(np.arange(len(work), dtype=np.float64), index=work.index)
+
+    values = work[columns].astype(np.float64).where(position.notna(), axis=0)
+    positions = pd.DataFrame({col: position.where(values[col].notna()) for col in columns}, index=work.index)
+    keys = [work[col] for col in group_columns]
+
+    prev_val = values.groupby(keys, sort=False, dropna=False).ffill()
+    next_val = values.groupby(keys, sort=False, dropna=False).bfill()
+    prev_pos = positions.groupby(keys, sort=False, dropna=False).ffill()
+    next_pos = positions.groupby(keys, sort=False, dropna=False).bfill()
+
+    span = (next_pos - prev_pos).replace(0, np.nan)
+    weight = (-prev_pos).add(position, axis=0).div(span)
+    interpolated = prev_val + (next_val - prev_val) * weight
+    # Equal neighbours (or duplicate timestamps) need no weighting
+    interpolated = interpolated.fillna(prev_val.where(prev_val == next_val))
+    return interpolated.where(position.notna(), axis=0)
+
+
+def group_impute(df, columns, group_columns, strategy='median', time_column=None, fallback=True):
+    """
+    Fill missing values within groups (e.g. per store or region) in one grouped pass.
+
+    Strategies: mean, median, mode, ffill, bfill, interpolate. Fill-based strategies follow
+    time_column order when given. With fallback, values still missing afterwards (groups
+    with no observed data) get the global statistic. Returns the DataFrame and a stats dict.
+    """
+    columns = [col for col in columns if col not in group_columns]
+    group_columns = list(group_columns)
+    result_df = df.copy()
+    missing_before = int(df[columns].isnull().sum().sum())
+
+    # Work on row positions so duplicate index labels cannot misplace the fills
+    work = df.reset_index(drop=True)
+    order = None
+    if time_column and strategy in ('ffill', 'bfill', 'interpolate'):
+        work = work.sort_values(group_columns + [time_column], kind='stable')
+        order = work.index.to_numpy()
+    grouped = work.groupby(group_columns, sort=False, dropna=False, observed=True)[columns]
+
+    if strategy in ('mean', 'median'):
+        numeric = [col for col in columns if pd.api.types.is_numeric_dtype(work[col])]
+        fills = work.groupby(group_columns, sort=False, dropna=False, observed=True)[numeric].transform(strategy)
+    elif strategy == 'mode':
+        fills = pd.DataFrame({col: _group_mode(work, col, group_columns) for col in columns}, index=work.index)
+    elif strategy == 'ffill':
+        fills = grouped.ffill()
+    elif strategy == 'bfill':
+        fills = grouped.bfill()
+    elif strategy == 'interpolate':
+        numeric = [col for col in columns if pd.api.types.is_numeric_dtype(work[col])]
+        fills = _group_interpolate(work, numeric, group_columns, time_column)
+    else:
+        raise ValueError(f"Unknown group imputation strategy: {strategy}")
+
+    filled = work[fills.columns].fillna(fills)
+    if order is not None:
+        # Invert the time sort to get back to the original row order
+        filled = filled.iloc[np.argsort(order, kind='stable')]
+    for col in fills.columns:
+        result_df[col] = filled[col].array
+
+    if fallback:
+        for col in fills.columns:
+            if not result_df[col].isnull().any():
+                continue
+            if pd.api.types.is_numeric_dtype(result_df[col]):
+                result_df[col] = result_df[col].fillna(df[col].mean() if strategy == 'mean' else df[col].median())
+            else:
+                mode_values = df[col].mode()
+                if not mode_values.empty:
+                    result_df[col] = result_df[col].fillna(mode_values.iloc[0])
+
+    missing_after = int(result_df[columns].isnull().sum().sum())
+    stats = {
+        'values_filled': missing_before - missing_after,
+        'values_remaining': missing_after,
+        'groups': int(work.groupby(group_columns, dropna=False, observed=True).ngroups),
+        'columns': list(fills.columns)
+    }
+    return result_df, stats
@@ -0,0 +1,92 @@
+import pandas as pd
+import numpy as np
+import streamlit as st
+
+# Popcount lookup for numpy versions without np.bitwise_count
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def _popcount(packed):
+    """Number of set bits along the last axis of a uint8 array"""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(packed).sum(axis=-1, dtype=np.int64)
+    return _POPCOUNT_TABLE[packed].sum(axis=-1, dtype=np.int64)
+
+
+def pack_null_matrix(mask):
+    """Bit-pack a boolean null mask column-wise: one row of ceil(n_rows / 8) bytes per column"""
+    return np.packbits(mask.T, axis=1)
+
+
+def co_missing_counts(packed):
+    """Matrix of rows where column i and column j are both missing (diagonal = null counts)"""
+    n_cols = packed.shape[0]
+    counts = np.zeros((n_cols, n_cols), dtype=np.int64)
+    for i in range(n_cols):
+        counts[i, i:] = _popcount(packed[i] & packed[i:])
+        counts[i:, i] = counts[i, i:]
+    return counts
+
+
+def missing_patterns(mask, columns, max_patterns=None):
+    """
+    Distinct missing-row patterns, most frequent first.
+
+    Returns the boolean pattern matrix (one column per data column, nothing else, so user
+    column names cannot collide with helper columns) and the row count of each pattern.
+    """
+    row_bits = np.ascontiguousarray(np.packbits(mask, axis=1))
+    row_keys = row_bits.view(np.dtype((np.void, row_bits.shape[1]))).ravel()
+    _, first_rows, counts = np.unique(row_keys, return_index=True, return_counts=True)
+
+    order = np.argsort(-counts, kind='stable')
+    if max_patterns is not None:
+        order = order[:max_patterns]
+
+    patterns = pd.DataFrame(mask[first_rows[order]], columns=columns)
+    return patterns, pd.Series(counts[order], index=patterns.index, name='Rows')
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def get_missingness_profile(df, max_patterns=50):
+    """
+    Missingness summary for a dataset version, computed once from the bit-packed null matrix.
+
+    Returns null counts, the co-missingness count matrix, the missing-indicator correlation
+    matrix (same values as df.isnull().corr()), the most frequent missing-row patterns with
+    their row counts ('pattern_rows') and the distribution of missing values per row.
+    """
+    mask = df.isnull().to_numpy()
+    n_rows = len(df)
+    counts = co_missing_counts(pack_null_matrix(mask))
+    null_counts = np.diag(counts)
+
+    # Phi coefficient of the boolean indicators, derived from the joint counts
+    p = null_counts / max(n_rows, 1)
+    covariance = counts / max(n_rows, 1) - np.outer(p, p)
+    std_product = np.outer(np.sqrt(p * (1 - p)), np.sqrt(p * (1 - p)))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlation = np.where(std_product > 0, covariance / std_product, np.nan)
+
+    per_row = np.bincount(mask.sum(axis=1), minlength=1)
+    patterns, pattern_rows = missing_patterns(mask, df.columns, max_patterns=max_patterns)
+
+    return {
+        'n_rows': n_rows,
+        'null_counts': pd.Series(null_counts, index=df.columns),
+        'co_missing': pd.DataFrame(counts, index=df.columns, columns=df.columns),
+        'correlation': pd.DataFrame(correlation, index=df.columns, columns=df.columns),
+        'patterns': patterns,
+        'pattern_rows': pattern_rows,
+        'missing_per_row': pd.Series(per_row, index=pd.RangeIndex(len(per_row), name='Missing Values per Row'), name='Rows')
+    }
+
+
+def co_missing_columns(profile, column, min_overlap=0.5):
+    """Columns whose nulls coincide with more than min_overlap of the column's nulls"""
+    co_missing = profile['co_missing']
+    null_count = co_missing.loc[column, column]
+    if null_count == 0:
+        return []
+    overlap = co_missing.loc[column].drop(column) / null_count
+    return overlap[overlap > min_overlap].index.tolist()
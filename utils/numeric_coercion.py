@@ -0,0 +1,162 @@
+import pandas as pd
+import numpy as np
+import re
+
+DETECTION_SAMPLE_SIZE = 1000
+
+CURRENCY_SYMBOLS = '$€£¥₹'
+CURRENCY_CODES = ['USD', 'EUR', 'GBP', 'JPY', 'INR', 'CAD', 'AUD', 'CHF', 'CNY']
+MAGNITUDE_SUFFIXES = {'k': 1e3, 'K': 1e3, 'M': 1e6, 'mn': 1e6, 'MM': 1e6, 'B': 1e9, 'bn': 1e9}
+
+# Unit suffixes accepted after a number ("12 kg", "3.5h"); anything else makes the value non-numeric
+UNIT_SUFFIXES = ['kg', 'g', 'mg', 'lb', 'lbs', 'oz', 't', 'km', 'm', 'cm', 'mm', 'mi', 'ft', 'in', 'yd',
+                 'l', 'L', 'ml', 'mL', 'gal', 's', 'sec', 'ms', 'min', 'h', 'hr', 'hrs', 'd', 'days', 'yrs',
+                 '°', '°C', '°F', 'W', 'kW', 'kWh', 'MW', 'V', 'A', 'Hz', 'kHz', 'MHz', 'GHz',
+                 'KB', 'kB', 'MB', 'GB', 'TB', 'px', 'pt', 'pts', 'x', 'mph', 'km/h', 'kph', 'm²', 'm2',
+                 'sqft', 'ha', 'cal', 'kcal', 'bps', 'ppm']
+
+# Thousands-group separators besides '.' and ',': space, apostrophe, no-break and narrow no-break space
+_GROUP_SEPARATORS = " '\u00a0\u202f"
+_CURRENCY = '[' + CURRENCY_SYMBOLS + ']|' + '|'.join(CURRENCY_CODES)
+_SUFFIXES = sorted({'%', *MAGNITUDE_SUFFIXES, *UNIT_SUFFIXES}, key=len, reverse=True)
+# One formatted number, anchored: optional "(", sign and currency, the digits (thousands groups may be
+# separated by spaces or apostrophes), then an optional %, magnitude or unit suffix, currency, ")" and
+# trailing minus
+_FORMATTED_NUMBER = (
+    r'^(?P<open>\()?\s*(?P<lead_sign>[+-])?\s*(?:' + _CURRENCY + r')?\s*(?P<sign>[+-])?\s*'
+    r'(?P<number>(?:\d{1,3}(?:[' + _GROUP_SEPARATORS + r']\d{3})+(?:[.,]\d+)?|\d[\d.,]*|[.,]\d+)(?:[eE][+-]?\d+)?)'
+    r'\s*(?P<suffix>' + '|'.join(re.escape(suffix) for suffix in _SUFFIXES) + r')?'
+    r'\s*(?:' + _CURRENCY + r')?\s*(?P<close>\))?\s*(?P<trail_sign>-)?$'
+)
+_CURRENCY_PATTERN = r'[' + CURRENCY_SYMBOLS + r']|\b(?:' + '|'.join(CURRENCY_CODES) + r')\b'
+_PLAIN_NUMBER = r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?'
+
+
+def _to_float(text):
+    """
+    Cast strings to float64, NaN where they are not plain numbers.
+
+    Validating with one regex pass and casting only the valid values avoids the per-value
+    exception path pd.to_numeric(errors='coerce') takes on unparseable strings.
+    """
+    values = pd.Series(np.nan, index=text.index)
+    valid = text.str.fullmatch(_PLAIN_NUMBER).fillna(False).astype(bool)
+    if valid.any():
+        values[valid] = text[valid].astype(np.float64)
+    return values
+
+
+def detect_decimal_separator(text):
+    """
+    Guess the decimal separator ('.' or ',') from a sample of numeric strings.
+
+    The last separator in a value is the decimal one when both appear ("1.234,56") or when it
+    is not followed by exactly three digits ("3,5"); "1,234" alone is ambiguous and skipped.
+    """
+    last = text.str.extract(r'([.,])(\d+)\D*$')
+    if last.empty:
+        return '.'
+    has_both = text.str.contains('.', regex=False) & text.str.contains(',', regex=False)
+    decisive = last[0].notna() & ((last[1].str.len() != 3) | has_both)
+    votes = last.loc[decisive, 0].value_counts()
+    return ',' if votes.get(',', 0) > votes.get('.', 0) else '.'
+
+
+def _coerce_text(text, decimal, scale_percent):
+    """
+    Vectorized coercion of formatted strings; returns the values and per-string format flags.
+
+    The whole string must match _FORMATTED_NUMBER, so text that merely contains digits
+    ("123 Main St", "SKU-1001", "Q1 2024") is NaN rather than a number.
+    """
+    parts = text.str.extract(_FORMATTED_NUMBER)
+    # Parentheses only count as an accounting negative when balanced
+    matched = parts['number'].notna() & (parts['open'].isna() == parts['close'].isna())
+
+    body = parts['number'].where(matched).str.replace(f'[{_GROUP_SEPARATORS}]', '', regex=True)
+    mantissa = body.str.extract(r'^([^eE]*)(.*)$')
+    if decimal == ',':
+        digits = mantissa[0].str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+    else:
+        digits = mantissa[0].str.replace(',', '', regex=False)
+    values = _to_float(digits + mantissa[1])
+
+    negative = matched & (parts['open'].notna() | (parts['lead_sign'] == '-') | (parts['sign'] == '-')
+                          | (parts['trail_sign'] == '-'))
+    suffix = parts['suffix'].where(matched)
+    percent = suffix == '%'
+    values = values.where(~negative, -values.abs())
+    if scale_percent:
+        values = values.where(~percent, values / 100)
+    multiplier = suffix.map(MAGNITUDE_SUFFIXES)
+    values = values.where(multiplier.isna(), values * multiplier)
+
+    flags = pd.DataFrame({
+        'negative': negative,
+        'percent': percent,
+        'currency': matched & text.str.contains(_CURRENCY_PATTERN, regex=True),
+        'unit': suffix.where(multiplier.isna() & ~percent & values.notna())
+    })
+    return values, flags
+
+
+def coerce_numeric(series, decimal='auto', scale_percent=True):
+    """
+    Convert a text column holding formatted numbers to float64.
+
+    Handles currency symbols and codes, thousands separators in either locale, decimal
+    commas, percent signs (scaled to fractions), accounting-style "(123)" and trailing-minus
+    negatives, magnitude suffixes (k/M/bn) and unit suffixes ("12 kg"). Each distinct string
+    is processed once and the results are mapped back to rows; values that already parse are
+    never touched by the regex passes. Returns the numeric Series and a stats dict including
+    the convertible fraction of non-null values.
+    """
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.astype(np.float64), {'convertible_fraction': 1.0, 'decimal': '.', 'negatives': 0,
+                                           'percent': 0, 'currency': 0, 'unit': None}
+
+    codes, uniques = pd.factorize(series)
+    text = pd.Series(uniques).astype(str).str.strip()
+
+    if decimal == 'auto':
+        sample = text.iloc[np.linspace(0, len(text) - 1, min(len(text), DETECTION_SAMPLE_SIZE)).astype(np.int64)] \
+            if len(text) else text
+        decimal = detect_decimal_separator(sample)
+
+    # Plain numbers parse directly; only the rest goes through the string passes
+    values = _to_float(text) if decimal == '.' else pd.Series(np.nan, index=text.index)
+    remaining = values.isna()
+    stats = {'negatives': 0, 'percent': 0, 'currency': 0, 'unit': None}
+    if remaining.any():
+        coerced, flags = _coerce_text(text[remaining], decimal, scale_percent)
+        values[remaining] = coerced
+
+        # Flags are per distinct string; weight them by how many rows hold each string
+        rows_per_value = pd.Series(np.bincount(codes[codes >= 0], minlength=len(text)))[flags.index]
+        units = rows_per_value[flags['unit'].notna()].groupby(flags['unit'].dropna()).sum()
+        stats = {
+            'negatives': int(rows_per_value[flags['negative']].sum()),
+            'percent': int(rows_per_value[flags['percent']].sum()),
+            'currency': int(rows_per_value[flags['currency']].sum()),
+            'unit': units.idxmax() if len(units) else None
+        }
+
+    mapped = np.append(values.to_numpy(dtype=np.float64), np.nan)[codes]
+    result = pd.Series(mapped, index=series.index, name=series.name)
+
+    non_null = int((codes >= 0).sum())
+    stats.update({
+        'convertible_fraction': float(result.notna().sum() / non_null) if non_null else 0.0,
+        'decimal': decimal
+    })
+    return result, stats
+
+
+def convertible_fraction(series, sample_size=DETECTION_SAMPLE_SIZE, decimal='auto'):
+    """Share of an evenly spaced sample of non-null values that coerce to numbers"""
+    non_null = series.dropna()
+    if len(non_null) == 0:
+        return 0.0
+    if len(non_null) > sample_size:
+        non_null = non_null.iloc[np.linspace(0, len(non_null) - 1, sample_size).astype(np.int64)]
+    return coerce_numeric(non_null, decimal=decimal)[1]['convertible_fraction']
@@ -0,0 +1,185 @@
+import pandas as pd
+import numpy as np
+from scipy import stats
+from sklearn.covariance import MinCovDet
+from sklearn.neighbors import LocalOutlierFactor
+import warnings
+warnings.filterwarnings('ignore')
+
+# Rows used to fit the robust models; scoring always covers every row
+DEFAULT_SUPPORT_SAMPLE = 20000
+DEFAULT_CHUNK_SIZE = 200000
+
+
+def _prepare_matrix(data, columns):
+    """Return a float64 matrix of the selected columns with medians filled in"""
+    frame = data[columns]
+    return frame.fillna(frame.median()).to_numpy(dtype=np.float64)
+
+
+def _sample_positions(n_rows, sample_size, random_state=42):
+    """Positions of a bounded random subsample of rows, or None when every row fits"""
+    if n_rows <= sample_size:
+        return None
+    rng = np.random.default_rng(random_state)
+    return rng.choice(n_rows, size=sample_size, replace=False)
+
+
+def _sample_rows(X, sample_size, random_state=42):
+    """Draw a bounded random subsample of rows for model fitting"""
+    positions = _sample_positions(len(X), sample_size, random_state)
+    return X if positions is None else X[positions]
+
+
+def _build_result(data, outlier_mask, scores, threshold, columns, method):
+    """Package detection output in the format the Outlier Detection page expects"""
+    outlier_index = data.index[outlier_mask]
+    return {
+        'outliers': data.loc[outlier_index],
+        'outlier_indices': outlier_index.tolist(),
+        'scores': pd.Series(scores, index=data.index, name=f"{method}_score"),
+        'threshold': threshold,
+        'columns': list(columns),
+        'method': method,
+        'count': int(outlier_mask.sum()),
+        'percentage': (outlier_mask.sum() / len(data)) * 100 if len(data) else 0.0
+    }
+
+
+def mahalanobis_distances(X, location, precision, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Squared Mahalanobis distance of every row, computed in vectorized chunks"""
+    distances = np.empty(len(X), dtype=np.float64)
+    for start in range(0, len(X), chunk_size):
+        centered = X[start:start + chunk_size] - location
+        distances[start:start + chunk_size] = np.einsum('ij,jk,ik->i', centered, precision, centered)
+    return distances
+
+
+def detect_outliers_mahalanobis(data, columns, quantile=0.975, support_sample=DEFAULT_SUPPORT_SAMPLE,
+                                chunk_size=DEFAULT_CHUNK_SIZE, random_state=42):
+    """Detect multivariate outliers using robust (MinCovDet) Mahalanobis distance"""
+    X = _prepare_matrix(data, columns)
+
+    # Fit the robust covariance on a bounded subsample, then score all rows
+    mcd = MinCovDet(random_state=random_state).fit(_sample_rows(X, support_sample, random_state))
+    distances = mahalanobis_distances(X, mcd.location_, mcd.get_precision(), chunk_size)
+
+    # Squared distances follow a chi-square distribution with p degrees of freedom
+    threshold = stats.chi2.ppf(quantile, df=len(columns))
+    outlier_mask = distances > threshold
+
+    result = _build_result(data, outlier_mask, distances, threshold, columns, 'mahalanobis')
+    result['quantile'] = quantile
+    result['support_size'] = min(len(X), support_sample)
+    return result
+
+
+def detect_outliers_lof(data, columns, n_neighbors=20, contamination=0.05,
+                        reference_sample=DEFAULT_SUPPORT_SAMPLE, chunk_size=DEFAULT_CHUNK_SIZE,
+                        random_state=42, n_jobs=-1):
+    """Detect outliers with Local Outlier Factor scored against a sampled tree index"""
+    X = _prepare_matrix(data, columns)
+
+    # Robust scaling so no single feature dominates the neighbour distances
+    center = np.median(X, axis=0)
+    spread = np.subtract(*np.percentile(X, [75, 25], axis=0))
+    spread[spread == 0] = 1.0
+    X = (X - center) / spread
+
+    # Neighbours are searched in a KD/Ball tree built over a bounded reference set,
+    # which approximates full LOF while keeping each query O(log n)
+    positions = _sample_positions(len(X), reference_sample, random_state)
+    reference = X if positions is None else X[positions]
+    lof = LocalOutlierFactor(
+        n_neighbors=min(n_neighbors, len(reference) - 1),
+        contamination=contamination,
+        novelty=positions is not None,
+        n_jobs=n_jobs
+    ).fit(reference)
+
+    # Reference rows keep their fitted LOF, which excludes each row from its own neighbours;
+    # scoring them again with score_samples would count every row as its own neighbour
+    scores = np.empty(len(X), dtype=np.float64)
+    if positions is None:
+        scores[:] = -lof.negative_outlier_factor_
+    else:
+        scores[positions] = -lof.negative_outlier_factor_
+        in_reference = np.zeros(len(X), dtype=bool)
+        in_reference[positions] = True
+        queries = np.flatnonzero(~in_reference)
+        for start in range(0, len(queries), chunk_size):
+            batch = queries[start:start + chunk_size]
+            scores[batch] = -lof.score_samples(X[batch])
+
+    threshold = -lof.offset_
+    outlier_mask = scores > threshold
+
+    result = _build_result(data, outlier_mask, scores, threshold, columns, 'lof')
+    result['n_neighbors'] = n_neighbors
+    result['contamination'] = contamination
+    result['support_size'] = len(reference)
+    return result
+
+
+def _robust_zscore(deviation, mad, mean_abs_dev):
+    """Modified z-score; falls back to mean absolute deviation where MAD is zero"""
+    scale = np.where(mad > 0, mad / 0.6745, mean_abs_dev * 1.2533)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(scale > 0, np.abs(deviation) / scale, 0.0)
+
+
+def detect_outliers_rolling(data, value_column, time_column, entity_column=None, method='rolling_mad',
+                            window='7D', min_periods=5, threshold=3.5, seasonality='hour'):
+    """
+    Detect time-series outliers per entity with a rolling median/MAD or a seasonal-residual model.
+
+    All entities are processed in one grouped, vectorized pass sorted by entity and time.
+    Rows are tracked by position, so duplicate index labels in data are handled.
+    """
+    frame = pd.DataFrame({
+        'entity': data[entity_column].to_numpy() if entity_column else np.zeros(len(data), dtype=np.int8),
+        'time': pd.to_datetime(data[time_column], errors='coerce').array,
+        'value': pd.to_numeric(data[value_column], errors='coerce').to_numpy()
+    })
+    frame = frame.dropna(subset=['time']).sort_values(['entity', 'time'], kind='stable')
+    positions = frame.index.to_numpy()
+
+    if method == 'seasonal':
+        # Expected value is the entity's median for the same seasonal slot
+        season_key = {
+            'hour': frame['time'].dt.hour,
+            'dayofweek': frame['time'].dt.dayofweek,
+            'hour_of_week': frame['time'].dt.dayofweek * 24 + frame['time'].dt.hour,
+            'month': frame['time'].dt.month
+        }[seasonality]
+        expected = frame.groupby(['entity', season_key], dropna=False)['value'].transform('median').to_numpy()
+        deviation = frame['value'].to_numpy() - expected
+        abs_dev = pd.Series(np.abs(deviation), index=frame.index)
+        grouped_dev = abs_dev.groupby(frame['entity'], sort=False, dropna=False)
+        mad = grouped_dev.transform('median').to_numpy()
+        mean_abs_dev = grouped_dev.transform('mean').to_numpy()
+    else:
+        # groupby().rolling keeps group order, which matches the entity/time sort above
+        indexed = frame.set_index('time')
+        rolling = indexed.groupby('entity', sort=False, dropna=False)['value'].rolling(window, min_periods=min_periods, center=True)
+        expected = rolling.median().to_numpy()
+        deviation = frame['value'].to_numpy() - expected
+
+        indexed['abs_dev'] = np.abs(deviation)
+        dev_rolling = indexed.groupby('entity', sort=False, dropna=False)['abs_dev'].rolling(window, min_periods=min_periods, center=True)
+        mad = dev_rolling.median().to_numpy()
+        mean_abs_dev = dev_rolling.mean().to_numpy()
+
+    # Scatter back into the original row order; rows without a valid time score 0
+    scores = np.zeros(len(data))
+    scores[positions] = np.nan_to_num(_robust_zscore(deviation, mad, mean_abs_dev), nan=0.0)
+    outlier_mask = scores > threshold
+
+    result = _build_result(data, outlier_mask, scores, threshold, [value_column], method)
+    expected_values = np.full(len(data), np.nan)
+    expected_values[positions] = expected
+    result['expected'] = pd.Series(expected_values, index=data.index)
+    result['time_column'] = time_column
+    result['entity_column'] = entity_column
+    result['entities'] = int(frame['entity'].nunique())
+    return result
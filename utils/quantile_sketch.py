@@ -0,0 +1,143 @@
+import pandas as pd
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 500000
+
+
+class KLLSketch:
+    """
+    Mergeable KLL quantile sketch for data streamed chunk by chunk.
+
+    Memory stays at roughly 3*k values regardless of how many rows are added,
+    and rank error is about 1.7/k of the stream length.
+    """
+
+    def __init__(self, k=400, seed=42):
+        self.k = k
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.compactors = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        """Capacity of a level; lower levels shrink geometrically"""
+        depth = len(self.compactors) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values):
+        """Add a chunk of values (NaNs are ignored)"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+
+        self.count += len(values)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self.compactors[0] = np.concatenate([self.compactors[0], values])
+        self._compress()
+        return self
+
+    def _compress(self):
+        """Compact every over-full level, promoting half of its items upward"""
+        compacted = True
+        while compacted:
+            compacted = False
+            for level in range(len(self.compactors)):
+                items = self.compactors[level]
+                if len(items) <= self._capacity(level):
+                    continue
+
+                if level + 1 == len(self.compactors):
+                    self.compactors.append(np.empty(0, dtype=np.float64))
+
+                items = np.sort(items)
+                # An odd item stays behind so no weight is lost
+                keep = items[-1:] if len(items) % 2 else items[:0]
+                pairs = items[:len(items) - len(keep)]
+                promoted = pairs[self._rng.integers(2)::2]
+
+                self.compactors[level] = keep
+                self.compactors[level + 1] = np.concatenate([self.compactors[level + 1], promoted])
+                compacted = True
+
+    def merge(self, other):
+        """Merge another sketch into this one"""
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append(np.empty(0, dtype=np.float64))
+        for level, items in enumerate(other.compactors):
+            self.compactors[level] = np.concatenate([self.compactors[level], items])
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        """Approximate quantile(s) for q in [0, 1]"""
+        if self.count == 0:
+            return np.nan if np.isscalar(q) else np.full(len(q), np.nan)
+
+        items = np.concatenate(self.compactors)
+        weights = np.concatenate([
+            np.full(len(level_items), 2 ** level, dtype=np.float64)
+            for level, level_items in enumerate(self.compactors)
+        ])
+        order = np.argsort(items, kind='stable')
+        items = items[order]
+        cumulative = np.cumsum(weights[order])
+
+        ranks = np.asarray(q, dtype=np.float64) * cumulative[-1]
+        positions = np.clip(np.searchsorted(cumulative, ranks, side='left'), 0, len(items) - 1)
+        result = items[positions]
+
+        # Exact extremes are tracked separately
+        result = np.where(np.asarray(q) <= 0, self.min, result)
+        result = np.where(np.asarray(q) >= 1, self.max, result)
+        return float(result) if np.isscalar(q) else result
+
+
+def iter_chunks(data, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield row chunks from a DataFrame, or pass through an iterable of DataFrames"""
+    if isinstance(data, pd.DataFrame):
+        for start in range(0, len(data), chunk_size):
+            yield data.iloc[start:start + chunk_size]
+    else:
+        yield from data
+
+
+def sketch_columns(chunks, columns=None, k=400):
+    """Build one KLL sketch per numeric column in a single pass over the chunks"""
+    sketches = {}
+    for chunk in chunks:
+        cols = columns if columns is not None else chunk.select_dtypes(include=[np.number]).columns
+        for col in cols:
+            if col in chunk.columns:
+                sketches.setdefault(col, KLLSketch(k=k)).update(chunk[col].to_numpy(dtype=np.float64, na_value=np.nan))
+    return sketches
+
+
+def iqr_bounds_from_sketches(sketches, multiplier=1.5):
+    """Derive IQR outlier bounds for every sketched column"""
+    bounds = {}
+    for col, sketch in sketches.items():
+        q1, q3 = sketch.quantile([0.25, 0.75])
+        iqr = q3 - q1
+        bounds[col] = (q1 - multiplier * iqr, q3 + multiplier * iqr)
+    return bounds
+
+
+def streaming_iqr_bounds(chunks, columns=None, multiplier=1.5, k=400):
+    """First streaming pass: global IQR bounds without materializing the data"""
+    return iqr_bounds_from_sketches(sketch_columns(chunks, columns, k), multiplier)
+
+
+def cap_chunks(chunks, bounds):
+    """Second streaming pass: clip every chunk to precomputed bounds"""
+    for chunk in chunks:
+        chunk = chunk.copy()
+        for col, (lower, upper) in bounds.items():
+            if col in chunk.columns:
+                chunk[col] = chunk[col].clip(lower=lower, upper=upper)
+        yield chunk
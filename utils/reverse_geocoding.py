@@ -0,0 +1,239 @@
+import pandas as pd
+import numpy as np
+import os
+import io
+import csv
+import time
+import hashlib
+import shutil
+import tempfile
+from scipy.spatial import cKDTree
+from utils.geospatial import EARTH_RADIUS_KM, coordinate_values, unit_vectors
+
+GAZETTEER_CACHE_DIR = os.path.join(os.environ.get('KLINITALL_CACHE_DIR', os.path.expanduser('~/.cache/klinitall')),
+                                   'gazetteers')
+# Coordinates queried against the tree per batch; bounds the temporary unit-vector arrays
+QUERY_CHUNK = 1_000_000
+
+# Column positions in a headerless GeoNames dump (allCountries.txt, cities500.txt, ...)
+GEONAMES_COLUMNS = {'place': 1, 'lat': 4, 'lon': 5, 'country': 8, 'admin': 10}
+# Accepted header names for user CSVs, checked in order (case-insensitive)
+COLUMN_ALIASES = {
+    'place': ['name', 'place', 'city', 'asciiname', 'place_name'],
+    'lat': ['latitude', 'lat'],
+    'lon': ['longitude', 'lon', 'lng', 'long'],
+    'admin': ['admin1', 'admin1_code', 'admin', 'region', 'state', 'province', 'admin_region'],
+    'country': ['country_code', 'country', 'cc', 'countrycode']
+}
+LABEL_FIELDS = ['place', 'admin', 'country']
+
+# cache key -> loaded Gazetteer, so each file is indexed once per process
+_loaded = {}
+
+
+def _readable(source):
+    """What pd.read_csv reads for a source: the path itself, so large files are streamed, or a buffer over bytes"""
+    return io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+
+
+def _first_line(source):
+    if isinstance(source, (bytes, bytearray)):
+        line = source[:source.find(b'\n') if b'\n' in source else len(source)]
+    else:
+        with open(source, 'rb') as handle:
+            line = handle.readline().rstrip(b'\n')
+    return line.decode('utf-8', errors='replace')
+
+
+def _source_key(source):
+    """Cache key part for a source: uploads are hashed, paths keyed by (path, size, mtime) without reading them"""
+    if isinstance(source, (bytes, bytearray)):
+        return 'bytes:' + hashlib.sha1(source).hexdigest()
+    path = os.path.abspath(source)
+    stat = os.stat(path)
+    return f'path:{path}:{stat.st_size}:{stat.st_mtime_ns}'
+
+
+def _is_geonames(first_line):
+    fields = first_line.split('\t')
+    if len(fields) < 19:
+        return False
+    try:
+        float(fields[GEONAMES_COLUMNS['lat']])
+        float(fields[GEONAMES_COLUMNS['lon']])
+    except ValueError:
+        return False
+    return True
+
+
+def read_gazetteer(source):
+    """
+    Parse a gazetteer (file path or bytes) into a DataFrame of place, admin, country, lat, lon.
+
+    Headerless tab-separated GeoNames dumps are recognised by their layout; any other CSV /
+    TSV needs a header with a name and latitude / longitude column (admin region and
+    country are optional, see COLUMN_ALIASES). Rows without valid coordinates are dropped.
+    """
+    if _is_geonames(_first_line(source)):
+        positions = GEONAMES_COLUMNS
+        places = pd.read_csv(_readable(source), sep='\t', header=None, usecols=sorted(positions.values()),
+                             dtype=str, quoting=csv.QUOTE_NONE, keep_default_na=False, encoding='utf-8')
+        places = places.rename(columns={position: field for field, position in positions.items()})
+    else:
+        places = pd.read_csv(_readable(source), sep=None, engine='python', dtype=str, keep_default_na=False)
+        lowered = {column.strip().lower(): column for column in places.columns}
+        selected = {}
+        for field, aliases in COLUMN_ALIASES.items():
+            match = next((lowered[alias] for alias in aliases if alias in lowered), None)
+            if match is not None:
+                selected[field] = match
+        missing = [field for field in ('place', 'lat', 'lon') if field not in selected]
+        if missing:
+            raise ValueError(f"Gazetteer is missing columns for: {', '.join(missing)}")
+        places = places[list(selected.values())].rename(columns={column: field for field, column in selected.items()})
+    for field in LABEL_FIELDS:
+        places[field] = places[field].replace('', None) if field in places else None
+
+    lat = coordinate_values(places['lat']).to_numpy()
+    lon = coordinate_values(places['lon']).to_numpy()
+    keep = (np.abs(lat) <= 90) & (np.abs(lon) <= 180)
+    places = places.loc[keep, LABEL_FIELDS].reset_index(drop=True)
+    places['lat'], places['lon'] = lat[keep], lon[keep]
+    return places
+
+
+def read_admin_names(source):
+    """GeoNames admin1CodesASCII.txt ('US.CA<TAB>California...') as a {'US.CA': 'California'} dict"""
+    table = pd.read_csv(_readable(source), sep='\t', header=None, usecols=[0, 1], dtype=str,
+                        quoting=csv.QUOTE_NONE, keep_default_na=False)
+    return dict(zip(table[0], table[1]))
+
+
+class Gazetteer:
+    """
+    Nearest-place lookups against a gazetteer indexed on disk.
+
+    Places are stored once per file as unit vectors plus integer label codes in .npy files
+    under GAZETTEER_CACHE_DIR, loaded memory-mapped, and indexed with a KD-tree on the 3D
+    vectors. Euclidean (chord) distance on the unit sphere is monotonic in great-circle
+    distance, so the nearest vector is the nearest place.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.vectors = np.load(os.path.join(directory, 'vectors.npy'), mmap_mode='r')
+        self.codes = {field: np.load(os.path.join(directory, f'{field}_codes.npy'), mmap_mode='r')
+                      for field in LABEL_FIELDS}
+        self.labels = {field: pd.read_parquet(os.path.join(directory, f'{field}_labels.parquet'))['label'].to_numpy()
+                       for field in LABEL_FIELDS}
+        self.tree = cKDTree(self.vectors, copy_data=False)
+
+    def __len__(self):
+        return len(self.vectors)
+
+    @staticmethod
+    def build(places, directory):
+        """
+        Write a parsed gazetteer (see read_gazetteer) to directory in the on-disk layout.
+
+        Files are written to a temporary sibling directory that is renamed into place, so
+        readers never see a partial entry. If another process finished the same entry
+        first, its copy is kept.
+        """
+        parent = os.path.dirname(os.path.abspath(directory))
+        os.makedirs(parent, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix='.building-', dir=parent)
+        try:
+            for field in LABEL_FIELDS:
+                codes, labels = pd.factorize(places[field])
+                np.save(os.path.join(staging, f'{field}_codes.npy'), codes.astype(np.int32))
+                pd.DataFrame({'label': pd.Series(labels, dtype=object)}).to_parquet(
+                    os.path.join(staging, f'{field}_labels.parquet'))
+            np.save(os.path.join(staging, 'vectors.npy'),
+                    unit_vectors(places['lat'].to_numpy(), places['lon'].to_numpy()))
+            try:
+                os.replace(staging, directory)
+            except OSError:
+                # The target exists and is not empty: another build won the race
+                if not os.path.exists(os.path.join(directory, 'vectors.npy')):
+                    raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def lookup(self, lat, lon, max_distance_km=None, n_jobs=-1, chunk_size=QUERY_CHUNK):
+        """
+        Nearest place, admin region and country for each coordinate pair.
+
+        Returns a DataFrame aligned with lat: categorical place / admin_region / country and
+        distance_km. Rows with missing coordinates, or with no place within
+        max_distance_km, get missing labels.
+        """
+        lat_values = coordinate_values(lat).to_numpy()
+        lon_values = coordinate_values(lon).to_numpy()
+        rows = np.flatnonzero(~(np.isnan(lat_values) | np.isnan(lon_values)))
+        nearest = np.full(len(lat_values), -1, dtype=np.int64)
+        distance = np.full(len(lat_values), np.nan)
+        for start in range(0, len(rows), chunk_size):
+            batch = rows[start:start + chunk_size]
+            chord, index = self.tree.query(unit_vectors(lat_values[batch], lon_values[batch]), k=1, workers=n_jobs)
+            nearest[batch] = index
+            distance[batch] = 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2, 0, 1))
+        if max_distance_km is not None:
+            nearest[distance > max_distance_km] = -1
+
+        found = nearest >= 0
+        result = {}
+        for field, column in zip(LABEL_FIELDS, ['place', 'admin_region', 'country']):
+            codes = np.full(len(nearest), -1, dtype=np.int32)
+            codes[found] = self.codes[field][nearest[found]]
+            result[column] = pd.Categorical.from_codes(codes, categories=pd.Index(self.labels[field], dtype=object))
+        result['distance_km'] = distance
+        return pd.DataFrame(result, index=lat.index)
+
+
+def load_gazetteer(source, admin_names=None, cache_dir=GAZETTEER_CACHE_DIR):
+    """
+    Gazetteer for a file path or uploaded bytes, indexed on first use.
+
+    The cache entry is keyed by the file path, size and modification time (a hash of the
+    contents for uploaded bytes), together with the admin names file, so later loads of the
+    same data only memory-map the stored arrays and rebuild the tree without reading the file.
+    admin_names optionally maps GeoNames admin1 codes to region names.
+    """
+    digest = hashlib.sha1(_source_key(source).encode())
+    if admin_names is not None:
+        digest.update(_source_key(admin_names).encode())
+    key = digest.hexdigest()
+    if key in _loaded:
+        return _loaded[key]
+
+    directory = os.path.join(cache_dir, key)
+    if not os.path.exists(os.path.join(directory, 'vectors.npy')):
+        # An incomplete entry left by an older, non-atomic build is rebuilt
+        shutil.rmtree(directory, ignore_errors=True)
+        places = read_gazetteer(source)
+        if admin_names is not None:
+            region_names = read_admin_names(admin_names)
+            region_keys = places['country'] + '.' + places['admin']
+            places['admin'] = region_keys.map(region_names).fillna(places['admin'])
+        Gazetteer.build(places, directory)
+    _loaded[key] = Gazetteer(directory)
+    return _loaded[key]
+
+
+def reverse_geocode(lat, lon, gazetteer, max_distance_km=None, n_jobs=-1):
+    """Batch reverse geocoding with a loaded Gazetteer; returns the lookup DataFrame and a stats dict"""
+    start_time = time.time()
+    result = gazetteer.lookup(lat, lon, max_distance_km=max_distance_km, n_jobs=n_jobs)
+    matched = result['distance_km'].notna()
+    if max_distance_km is not None:
+        matched &= result['distance_km'] <= max_distance_km
+    stats = {
+        'rows': len(result),
+        'matched': int(matched.sum()),
+        'unmatched': int((~matched).sum()),
+        'gazetteer_places': len(gazetteer),
+        'median_distance_km': float(result['distance_km'][matched].median()) if matched.any() else None,
+        'elapsed_seconds': time.time() - start_time
+    }
+    return result, stats
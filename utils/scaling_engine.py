@@ -0,0 +1,176 @@
+import pandas as pd
+import numpy as np
+import time
+from sklearn.preprocessing import (StandardScaler, MinMaxScaler, MaxAbsScaler, RobustScaler, QuantileTransformer,
+                                   PowerTransformer)
+from utils.quantile_sketch import iter_chunks, sketch_columns, DEFAULT_CHUNK_SIZE
+
+# KLL sketch size for robust / quantile scaling: rank error about 1.7 / SKETCH_K, ~3 * SKETCH_K values per column
+SKETCH_K = 4000
+
+# Scalers fitted from streamed per-column moments; robust / quantile are fitted from quantile sketches,
+# power in one pass
+MOMENT_SCALERS = {'standard': StandardScaler, 'minmax': MinMaxScaler, 'maxabs': MaxAbsScaler}
+SCALING_METHODS = list(MOMENT_SCALERS) + ['robust', 'quantile', 'power']
+
+
+def iter_arrays(data, columns, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Float64 arrays of the selected columns for each chunk of a DataFrame or iterable of DataFrames"""
+    for chunk in iter_chunks(data, chunk_size):
+        yield chunk[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def make_scaler(method, feature_range=(0, 1), quantile_range=(25.0, 75.0), n_quantiles=1000,
+                output_distribution='uniform', standardize=True):
+    """Unfitted scikit-learn scaler for a SCALING_METHODS name"""
+    if method == 'standard':
+        return StandardScaler()
+    if method == 'minmax':
+        return MinMaxScaler(feature_range=feature_range)
+    if method == 'maxabs':
+        return MaxAbsScaler()
+    if method == 'robust':
+        return RobustScaler(quantile_range=quantile_range)
+    if method == 'quantile':
+        return QuantileTransformer(n_quantiles=n_quantiles, output_distribution=output_distribution)
+    if method == 'power':
+        return PowerTransformer(method='yeo-johnson', standardize=standardize)
+    raise ValueError(f"Unknown scaling method: {method}")
+
+
+def column_moments(chunks, n_features):
+    """
+    Per-column count, mean, sum of squared deviations, min and max over 2D chunks.
+
+    Missing values are skipped per column, so a chunk (or partition) where a column is
+    entirely missing leaves that column's statistics untouched. Chunk statistics are merged
+    with Chan's parallel update, which stays accurate over many chunks.
+    """
+    count = np.zeros(n_features)
+    mean = np.zeros(n_features)
+    squares = np.zeros(n_features)
+    minimum = np.full(n_features, np.inf)
+    maximum = np.full(n_features, -np.inf)
+    for values in chunks:
+        present = ~np.isnan(values)
+        chunk_count = present.sum(axis=0)
+        if not chunk_count.any():
+            continue
+        filled = np.where(present, values, 0.0)
+        chunk_mean = np.divide(filled.sum(axis=0), chunk_count, out=np.zeros(n_features), where=chunk_count > 0)
+        chunk_squares = (np.where(present, values - chunk_mean, 0.0) ** 2).sum(axis=0)
+        total = count + chunk_count
+        delta = chunk_mean - mean
+        weight = np.divide(chunk_count, total, out=np.zeros(n_features), where=total > 0)
+        squares = squares + chunk_squares + delta ** 2 * count * weight
+        mean = mean + delta * weight
+        count = total
+        minimum = np.minimum(minimum, np.where(present, values, np.inf).min(axis=0))
+        maximum = np.maximum(maximum, np.where(present, values, -np.inf).max(axis=0))
+    unseen = count == 0
+    mean[unseen] = squares[unseen] = minimum[unseen] = maximum[unseen] = np.nan
+    return {'count': count.astype(np.int64), 'mean': mean, 'squares': squares, 'min': minimum, 'max': maximum}
+
+
+def _from_moments(scaler, moments):
+    """Set the fitted attributes of a StandardScaler / MinMaxScaler / MaxAbsScaler from column_moments"""
+    scaler.n_samples_seen_ = moments['count']
+    scaler.n_features_in_ = len(moments['count'])
+    if isinstance(scaler, StandardScaler):
+        variance = np.divide(moments['squares'], moments['count'], out=np.full(scaler.n_features_in_, np.nan),
+                             where=moments['count'] > 0)
+        scaler.mean_ = moments['mean'] if scaler.with_mean else None
+        scaler.var_ = variance if scaler.with_std else None
+        # Constant columns keep a unit scale, as StandardScaler does
+        scaler.scale_ = np.where(variance == 0, 1.0, np.sqrt(variance)) if scaler.with_std else None
+    elif isinstance(scaler, MinMaxScaler):
+        low, high = scaler.feature_range
+        data_range = moments['max'] - moments['min']
+        scaler.data_min_, scaler.data_max_, scaler.data_range_ = moments['min'], moments['max'], data_range
+        scaler.scale_ = (high - low) / np.where(data_range == 0, 1.0, data_range)
+        scaler.min_ = low - moments['min'] * scaler.scale_
+    else:
+        max_abs = np.fmax(np.abs(moments['min']), np.abs(moments['max']))
+        scaler.max_abs_ = max_abs
+        scaler.scale_ = np.where(max_abs == 0, 1.0, max_abs)
+    return scaler
+
+
+def _from_sketches(scaler, sketches):
+    """Set the fitted attributes of a RobustScaler / QuantileTransformer from per-column KLL sketches"""
+    if isinstance(scaler, RobustScaler):
+        probabilities = np.array([scaler.quantile_range[0], 50, scaler.quantile_range[1]]) / 100
+        low, median, high = np.column_stack([sketch.quantile(probabilities) for sketch in sketches])
+        scale = high - low
+        scaler.center_ = median if scaler.with_centering else None
+        # Constant columns keep their scale, as RobustScaler does
+        scaler.scale_ = np.where(scale == 0, 1.0, scale) if scaler.with_scaling else None
+    else:
+        scaler.n_quantiles_ = max(1, min(scaler.n_quantiles, max(sketch.count for sketch in sketches)))
+        scaler.references_ = np.linspace(0, 1, scaler.n_quantiles_, endpoint=True)
+        quantiles = np.column_stack([sketch.quantile(scaler.references_) for sketch in sketches])
+        scaler.quantiles_ = np.maximum.accumulate(quantiles)
+    scaler.n_features_in_ = len(sketches)
+    return scaler
+
+
+def fit_scaler(data, columns, method='standard', chunk_size=DEFAULT_CHUNK_SIZE, **params):
+    """
+    Fit one scaler on all selected columns.
+
+    data is a DataFrame or an iterable of DataFrames (the partitions of a partitioned
+    dataset, pd.read_csv(..., chunksize=n)). A DataFrame that fits in one chunk is fitted
+    exactly with fit(). Larger or partitioned inputs are read chunk by chunk: standard /
+    minmax / maxabs are fitted from per-column moments (column_moments), robust / quantile
+    from one KLL sketch per column. Yeo-Johnson has no streaming fit and always fits
+    on the concatenated data. Missing values are ignored during fitting.
+    """
+    columns = list(columns)
+    scaler = make_scaler(method, **params)
+    if method == 'power' or (isinstance(data, pd.DataFrame) and len(data) <= chunk_size):
+        return scaler.fit(np.vstack(list(iter_arrays(data, columns, chunk_size))))
+
+    if method in MOMENT_SCALERS:
+        return _from_moments(scaler, column_moments(iter_arrays(data, columns, chunk_size), len(columns)))
+
+    sketches = sketch_columns(iter_chunks(data, chunk_size), columns, k=SKETCH_K)
+    return _from_sketches(scaler, [sketches[col] for col in columns])
+
+
+def iter_transform(data, columns, scaler, chunk_size=DEFAULT_CHUNK_SIZE, dtype=np.float64):
+    """Transformed chunks (arrays of dtype), one per chunk of data; missing values stay missing"""
+    for values in iter_arrays(data, columns, chunk_size):
+        yield scaler.transform(values).astype(dtype, copy=False)
+
+
+def scale_columns(df, columns, method='standard', output_columns=None, dtype=np.float64,
+                  chunk_size=DEFAULT_CHUNK_SIZE, **params):
+    """
+    Fit one scaler on several columns of df and transform them chunk by chunk.
+
+    The scaled values are written into a single preallocated block of dtype (float32 halves
+    the memory of the output), one chunk at a time, so no full float64 copy of the input is
+    held besides it. output_columns names the scaled columns (default: the input names).
+    Returns the scaled DataFrame (aligned with df), the fitted scaler and a stats dict.
+    """
+    start_time = time.time()
+    columns = list(columns)
+    output_columns = columns if output_columns is None else list(output_columns)
+    scaler = fit_scaler(df, columns, method, chunk_size, **params)
+
+    scaled = np.empty((len(df), len(columns)), dtype=dtype, order='F')
+    start = 0
+    for values in iter_transform(df, columns, scaler, chunk_size, dtype):
+        scaled[start:start + len(values)] = values
+        start += len(values)
+
+    stats = {
+        'method': method,
+        'columns': len(columns),
+        'rows': len(df),
+        'chunks': -(-len(df) // chunk_size),
+        'streamed': len(df) > chunk_size and method != 'power',
+        'output_mb': scaled.nbytes / 1024 ** 2,
+        'elapsed_seconds': time.time() - start_time
+    }
+    return pd.DataFrame(scaled, index=df.index, columns=output_columns, copy=False), scaler, stats
@@ -0,0 +1,180 @@
+import pandas as pd
+import numpy as np
+import os
+import time
+import sqlite3
+import concurrent.futures
+from collections import OrderedDict
+
+# Distinct uncached texts above which scoring is split across worker processes
+PARALLEL_THRESHOLD = 20000
+BATCH_SIZE = 5000
+SQLITE_BATCH = 900
+# Scores kept in memory per engine (least recently used evicted first); the SQLite cache keeps the rest
+MEMORY_CACHE_SIZE = 200000
+CACHE_PATH = os.path.join(os.environ.get('KLINITALL_CACHE_DIR', os.path.expanduser('~/.cache/klinitall')),
+                          'sentiment_cache.sqlite')
+
+ENGINE_COLUMNS = {
+    'textblob': ['polarity', 'subjectivity'],
+    'vader': ['neg', 'neu', 'pos', 'compound']
+}
+
+# engine -> OrderedDict {text hash: score tuple}, in least to most recently used order
+_memory_cache = {engine: OrderedDict() for engine in ENGINE_COLUMNS}
+_analyzers = {}
+
+
+def _remember(memory, scores):
+    """Add scores to an LRU memory cache and evict the oldest entries beyond MEMORY_CACHE_SIZE"""
+    memory.update(scores)
+    for _ in range(len(memory) - MEMORY_CACHE_SIZE):
+        memory.popitem(last=False)
+
+
+def _get_analyzer(engine):
+    """One analyzer per process; VADER loads its lexicon on construction"""
+    if engine not in _analyzers:
+        if engine == 'vader':
+            from nltk.sentiment.vader import SentimentIntensityAnalyzer
+            _analyzers[engine] = SentimentIntensityAnalyzer()
+        else:
+            from textblob import TextBlob
+            _analyzers[engine] = TextBlob
+    return _analyzers[engine]
+
+
+def score_text(text, engine='textblob'):
+    """Score a single text, returning a tuple in ENGINE_COLUMNS order"""
+    analyzer = _get_analyzer(engine)
+    if engine == 'vader':
+        scores = analyzer.polarity_scores(text)
+        return tuple(scores[col] for col in ENGINE_COLUMNS['vader'])
+    sentiment = analyzer(text).sentiment
+    return (sentiment.polarity, sentiment.subjectivity)
+
+
+def _score_batch(engine, texts):
+    return [score_text(text, engine) for text in texts]
+
+
+def _connect(cache_path):
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    connection = sqlite3.connect(cache_path)
+    connection.execute(
+        'CREATE TABLE IF NOT EXISTS sentiment (engine TEXT, hash INTEGER, scores TEXT, PRIMARY KEY (engine, hash))'
+    )
+    return connection
+
+
+def _read_disk_cache(connection, engine, hashes):
+    found = {}
+    for start in range(0, len(hashes), SQLITE_BATCH):
+        batch = hashes[start:start + SQLITE_BATCH]
+        rows = connection.execute(
+            f"SELECT hash, scores FROM sentiment WHERE engine = ? AND hash IN ({','.join('?' * len(batch))})",
+            [engine] + batch
+        )
+        for text_hash, scores in rows:
+            found[text_hash] = tuple(float(value) for value in scores.split(','))
+    return found
+
+
+def _write_disk_cache(connection, engine, scored):
+    connection.executemany(
+        'INSERT OR REPLACE INTO sentiment (engine, hash, scores) VALUES (?, ?, ?)',
+        [(engine, text_hash, ','.join(repr(value) for value in scores)) for text_hash, scores in scored.items()]
+    )
+    connection.commit()
+
+
+def analyze_sentiment(series, engine='textblob', n_jobs=-1, use_disk_cache=True, cache_path=CACHE_PATH,
+                      parallel_threshold=PARALLEL_THRESHOLD):
+    """
+    Score the sentiment of a text column, scoring each distinct text at most once.
+
+    Distinct texts are keyed by a 64-bit content hash and looked up in an in-memory cache,
+    then in an on-disk SQLite cache; only texts seen for the first time are scored, in
+    batches across a process pool when there are many. Returns a DataFrame of scores aligned
+    with the series (NaN for missing values) and a stats dict with cache hits and throughput.
+    """
+    start_time = time.time()
+    columns = ENGINE_COLUMNS[engine]
+
+    codes, uniques = pd.factorize(series)
+    texts = np.array([value if isinstance(value, str) else str(value) for value in uniques], dtype=object)
+    hashes = pd.util.hash_array(texts).view(np.int64).tolist() if len(texts) else []
+
+    memory = _memory_cache[engine]
+    scores = {}
+    misses = []
+    for position, text_hash in enumerate(hashes):
+        cached = memory.get(text_hash)
+        if cached is None:
+            misses.append(position)
+        else:
+            memory.move_to_end(text_hash)
+            scores[text_hash] = cached
+    memory_hits = len(scores)
+
+    connection = None
+    disk_hits = 0
+    if misses and use_disk_cache:
+        try:
+            connection = _connect(cache_path)
+            found = _read_disk_cache(connection, engine, [hashes[position] for position in misses])
+        except sqlite3.Error:
+            connection, found = None, {}
+        disk_hits = len(found)
+        scores.update(found)
+        _remember(memory, found)
+        misses = [position for position in misses if hashes[position] not in found]
+
+    workers = 1
+    if misses:
+        miss_texts = texts[misses].tolist()
+        if len(misses) > parallel_threshold and n_jobs != 1:
+            workers = (os.cpu_count() or 1) if n_jobs in (None, -1) else n_jobs
+        if workers > 1:
+            batches = [miss_texts[start:start + BATCH_SIZE] for start in range(0, len(miss_texts), BATCH_SIZE)]
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+                results = [row for batch in executor.map(_score_batch, [engine] * len(batches), batches) for row in batch]
+        else:
+            results = _score_batch(engine, miss_texts)
+
+        scored = {hashes[position]: result for position, result in zip(misses, results)}
+        scores.update(scored)
+        _remember(memory, scored)
+        if connection is not None:
+            try:
+                _write_disk_cache(connection, engine, scored)
+            except sqlite3.Error:
+                pass
+    if connection is not None:
+        connection.close()
+
+    # Distinct-value score matrix, expanded to rows through the factorize codes
+    matrix = np.full((len(hashes) + 1, len(columns)), np.nan)
+    if hashes:
+        matrix[:-1] = [scores[text_hash] for text_hash in hashes]
+    result = pd.DataFrame(matrix[codes], index=series.index, columns=columns)
+
+    elapsed = time.time() - start_time
+    stats = {
+        'rows': len(series),
+        'distinct_texts': len(hashes),
+        'memory_hits': memory_hits,
+        'disk_hits': disk_hits,
+        'scored': len(misses),
+        'workers': workers,
+        'elapsed_seconds': elapsed,
+        'rows_per_second': len(series) / elapsed if elapsed > 0 else float('inf')
+    }
+    return result, stats
+
+
+def sentiment_labels(polarity, threshold=0.1):
+    """Positive / Negative / Neutral labels from polarity scores (Unknown where missing)"""
+    labels = np.select([polarity > threshold, polarity < -threshold, polarity.notna()],
+                       ['Positive', 'Negative', 'Neutral'], default='Unknown')
+    return pd.Series(labels, index=polarity.index)
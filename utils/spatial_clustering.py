@@ -0,0 +1,122 @@
+import pandas as pd
+import numpy as np
+import time
+from sklearn.cluster import DBSCAN, HDBSCAN
+from utils.geospatial import EARTH_RADIUS_KM, KM_PER_DEGREE_LAT, coordinate_values, haversine_km, unit_vectors
+
+# Points above which pings are aggregated to grid cells before clustering (aggregate='auto')
+AGGREGATION_THRESHOLD = 50000
+# Grid cell size as a fraction of the DBSCAN radius
+CELL_FRACTION = 0.25
+
+
+def aggregate_to_cells(lat, lon, cell_km):
+    """
+    Snap points to an approximately equal-area grid of cell_km cells.
+
+    Longitude steps widen with latitude (1 / cos(lat)) so cells stay roughly square on the
+    ground. Returns the mean lat / lon and point count of each occupied cell, plus the cell
+    of every point.
+    """
+    lat_step = cell_km / KM_PER_DEGREE_LAT
+    row = np.floor(lat / lat_step).astype(np.int64)
+    lon_step = lat_step / np.maximum(np.cos(np.radians((row + 0.5) * lat_step)), 0.01)
+    col = np.floor((lon + 180) / lon_step).astype(np.int64)
+    _, cell_of_point, counts = np.unique(row * (np.int64(1) << 32) + col, return_inverse=True, return_counts=True)
+    cell_lat = np.bincount(cell_of_point, weights=lat) / counts
+    cell_lon = np.bincount(cell_of_point, weights=lon) / counts
+    return cell_lat, cell_lon, counts, cell_of_point
+
+
+def cluster_centroids(lat, lon, labels):
+    """Spherical centroid (mean unit vector) of each cluster label >= 0, as (lat, lon) arrays by label"""
+    clustered = labels >= 0
+    n_clusters = int(labels.max()) + 1 if clustered.any() else 0
+    vectors = unit_vectors(lat[clustered], lon[clustered])
+    x, y, z = (np.bincount(labels[clustered], weights=vectors[:, axis], minlength=n_clusters) for axis in range(3))
+    return np.degrees(np.arctan2(z, np.hypot(x, y))), np.degrees(np.arctan2(y, x))
+
+
+def cluster_points(lat, lon, method='dbscan', eps_km=0.5, min_samples=5, min_cluster_size=10, n_jobs=-1,
+                   aggregate='auto', cell_km=None):
+    """
+    Cluster GPS points with DBSCAN or HDBSCAN on the haversine metric.
+
+    DBSCAN neighbourhoods come from a haversine BallTree over (lat, lon) in radians. HDBSCAN
+    runs on 3D unit vectors with a Euclidean KD-tree instead: chord length is monotonic in
+    great-circle distance, so the hierarchy and labels are the same as with haversine, at a
+    fraction of the cost. n_jobs is passed to scikit-learn. For DBSCAN with aggregate=True (or
+    'auto' above AGGREGATION_THRESHOLD points) the points are first snapped to grid cells of
+    cell_km (default eps_km * CELL_FRACTION) and the cells are clustered instead, each weighted
+    by its point count; cell labels are mapped back to points. HDBSCAN has no sample weights,
+    so clustering cells would measure which cells are occupied rather than point density: it
+    always clusters the individual points ('auto' does not aggregate, True raises ValueError).
+
+    Returns a DataFrame aligned with lat (cluster_id: -1 for noise, <NA> where coordinates
+    are missing; centroid_distance_km), a per-cluster summary and a stats dict.
+    """
+    start_time = time.time()
+    lat_values = coordinate_values(lat).to_numpy()
+    lon_values = coordinate_values(lon).to_numpy()
+    present = ~(np.isnan(lat_values) | np.isnan(lon_values))
+    point_lat, point_lon = lat_values[present], lon_values[present]
+
+    if method == 'hdbscan' and aggregate is True:
+        raise ValueError("HDBSCAN cannot weight grid cells by point count; use aggregate=False or 'auto'")
+    if aggregate == 'auto':
+        aggregate = method != 'hdbscan' and len(point_lat) > AGGREGATION_THRESHOLD
+    if aggregate:
+        cell_lat, cell_lon, weights, cell_of_point = aggregate_to_cells(point_lat, point_lon,
+                                                                        cell_km or eps_km * CELL_FRACTION)
+    else:
+        cell_lat, cell_lon, weights, cell_of_point = point_lat, point_lon, None, None
+
+    coordinates = np.radians(np.column_stack([cell_lat, cell_lon]))
+    if len(coordinates) == 0:
+        unit_labels = np.empty(0, dtype=np.int64)
+    elif method == 'hdbscan':
+        model = HDBSCAN(min_cluster_size=max(2, min_cluster_size), min_samples=min_samples,
+                        algorithm='kd_tree', n_jobs=n_jobs, copy=True)
+        unit_labels = model.fit_predict(unit_vectors(cell_lat, cell_lon)) if len(coordinates) > 1 \
+            else np.full(len(coordinates), -1)
+    else:
+        model = DBSCAN(eps=eps_km / EARTH_RADIUS_KM, min_samples=min_samples, metric='haversine',
+                       algorithm='ball_tree', n_jobs=n_jobs)
+        unit_labels = model.fit_predict(coordinates, sample_weight=weights)
+
+    labels = unit_labels[cell_of_point] if aggregate else unit_labels
+    centroid_lat, centroid_lon = cluster_centroids(point_lat, point_lon, labels)
+    distances = np.full(len(labels), np.nan)
+    clustered = labels >= 0
+    distances[clustered] = haversine_km(point_lat[clustered], point_lon[clustered],
+                                        centroid_lat[labels[clustered]], centroid_lon[labels[clustered]])
+
+    cluster_id = pd.array(np.full(len(lat_values), -1), dtype='Int64')
+    cluster_id[present] = labels
+    cluster_id[~present] = pd.NA
+    centroid_distance = np.full(len(lat_values), np.nan)
+    centroid_distance[present] = distances
+    result = pd.DataFrame({'cluster_id': cluster_id, 'centroid_distance_km': centroid_distance}, index=lat.index)
+
+    points_per_cluster = np.bincount(labels[clustered], minlength=len(centroid_lat))
+    summary = pd.DataFrame({
+        'cluster_id': np.arange(len(centroid_lat)),
+        'points': points_per_cluster,
+        'centroid_lat': centroid_lat,
+        'centroid_lon': centroid_lon,
+        'mean_distance_km': np.bincount(labels[clustered], weights=distances[clustered], minlength=len(centroid_lat))
+                            / np.maximum(points_per_cluster, 1),
+        'max_distance_km': pd.Series(distances[clustered]).groupby(labels[clustered]).max()
+                             .reindex(np.arange(len(centroid_lat))).to_numpy()
+    }).sort_values('points', ascending=False, ignore_index=True)
+
+    stats = {
+        'method': method,
+        'points': int(present.sum()),
+        'clustered_units': len(coordinates),
+        'aggregated': bool(aggregate),
+        'clusters': len(centroid_lat),
+        'noise_points': int((labels < 0).sum()),
+        'elapsed_seconds': time.time() - start_time
+    }
+    return result, summary, stats
@@ -0,0 +1,188 @@
+import pandas as pd
+import numpy as np
+import streamlit as st
+
+# Finest pyramid level has 2**MAX_ZOOM cells per side
+MAX_ZOOM = 9
+# Points drawn individually in scatter maps before they are thinned per grid cell
+SCATTER_POINT_LIMIT = 20000
+
+
+def _clean(lat, lon):
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    keep = ~(np.isnan(lat) | np.isnan(lon))
+    return lat[keep], lon[keep]
+
+
+def _bounds(lat, lon):
+    """(lat_min, lat_max, lon_min, lon_max), widened slightly when a range is zero"""
+    if len(lat) == 0:
+        return (-1.0, 1.0, -1.0, 1.0)
+    lat_min, lat_max, lon_min, lon_max = lat.min(), lat.max(), lon.min(), lon.max()
+    if lat_max == lat_min:
+        lat_min, lat_max = lat_min - 0.5, lat_max + 0.5
+    if lon_max == lon_min:
+        lon_min, lon_max = lon_min - 0.5, lon_max + 0.5
+    return (float(lat_min), float(lat_max), float(lon_min), float(lon_max))
+
+
+def _cell_index(lat, lon, bounds, cells):
+    """Row (latitude) and column (longitude) of each point in a cells x cells grid"""
+    lat_min, lat_max, lon_min, lon_max = bounds
+    row = np.clip(((lat - lat_min) / (lat_max - lat_min) * cells).astype(np.int64), 0, cells - 1)
+    col = np.clip(((lon - lon_min) / (lon_max - lon_min) * cells).astype(np.int64), 0, cells - 1)
+    return row, col
+
+
+def density_grid(lat, lon, cells, bounds=None):
+    """
+    Point counts on a cells x cells grid, equivalent to np.histogram2d with uniform bins.
+
+    Bin indices are computed arithmetically and counted with one bincount, so the cost is a
+    single pass over the points at any resolution. Returns (counts, lat_edges, lon_edges)
+    with counts indexed [latitude row, longitude column].
+    """
+    lat, lon = _clean(lat, lon)
+    bounds = bounds or _bounds(lat, lon)
+    row, col = _cell_index(lat, lon, bounds, cells)
+    counts = np.bincount(row * cells + col, minlength=cells * cells).reshape(cells, cells)
+    return counts, np.linspace(bounds[0], bounds[1], cells + 1), np.linspace(bounds[2], bounds[3], cells + 1)
+
+
+def hexbin_counts(lat, lon, size=None, resolution=64):
+    """
+    Point counts per hexagon (pointy-top, axial coordinates) of circumradius `size` degrees.
+
+    Points are assigned to hexagons with vectorized cube rounding and counted with one
+    bincount. The default size gives about `resolution` hexagons across the latitude
+    range. Returns a DataFrame of hexagon centre lat / lon and count, densest first.
+    """
+    lat, lon = _clean(lat, lon)
+    if len(lat) == 0:
+        return pd.DataFrame({'lat': [], 'lon': [], 'count': []})
+    bounds = _bounds(lat, lon)
+    size = size or (bounds[1] - bounds[0]) / (1.5 * resolution)
+
+    q = (np.sqrt(3) / 3 * lon - lat / 3) / size
+    r = (2 / 3 * lat) / size
+    s = -q - r
+    rq, rr, rs = np.round(q), np.round(r), np.round(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    rq = np.where(fix_q, -rr - rs, rq)
+    rr = np.where(fix_r, -rq - rs, rr)
+
+    # One integer key per hexagon, counted with bincount over the occupied key range
+    rq, rr = rq.astype(np.int64), rr.astype(np.int64)
+    q_min, r_min = rq.min(), rr.min()
+    width = rr.max() - r_min + 1
+    counts = np.bincount((rq - q_min) * width + (rr - r_min))
+    keys = np.flatnonzero(counts)
+    hex_q, hex_r = keys // width + q_min, keys % width + r_min
+    hexagons = pd.DataFrame({
+        'lat': size * 1.5 * hex_r,
+        'lon': size * np.sqrt(3) * (hex_q + hex_r / 2),
+        'count': counts[keys]
+    })
+    return hexagons.sort_values('count', ascending=False, ignore_index=True)
+
+
+class DensityPyramid:
+    """
+    Multi-resolution point counts over a dataset's bounding box.
+
+    Level z has 2**z x 2**z cells. The finest level is counted from the points once; each
+    coarser level sums 2 x 2 blocks of the level below, so every zoom, viewport window and
+    hotspot query afterwards is answered from the precomputed grids without touching the
+    points again.
+    """
+
+    def __init__(self, lat, lon, max_zoom=MAX_ZOOM):
+        lat, lon = _clean(lat, lon)
+        self.max_zoom = max_zoom
+        self.total_points = len(lat)
+        self.bounds = _bounds(lat, lon)
+        finest, _, _ = density_grid(lat, lon, 2 ** max_zoom, self.bounds)
+        self.levels = [None] * (max_zoom + 1)
+        self.levels[max_zoom] = finest
+        for zoom in range(max_zoom - 1, -1, -1):
+            cells = 2 ** zoom
+            self.levels[zoom] = self.levels[zoom + 1].reshape(cells, 2, cells, 2).sum(axis=(1, 3))
+
+    def edges(self, zoom):
+        cells = 2 ** zoom
+        lat_min, lat_max, lon_min, lon_max = self.bounds
+        return np.linspace(lat_min, lat_max, cells + 1), np.linspace(lon_min, lon_max, cells + 1)
+
+    def grid(self, zoom):
+        """Counts at a zoom level as a DataFrame indexed by cell-centre latitude, columns by longitude"""
+        lat_edges, lon_edges = self.edges(zoom)
+        return pd.DataFrame(self.levels[zoom], index=(lat_edges[:-1] + lat_edges[1:]) / 2,
+                            columns=(lon_edges[:-1] + lon_edges[1:]) / 2)
+
+    def window(self, zoom, lat_range, lon_range):
+        """The tiles of one zoom level covering a viewport (lat_range, lon_range)"""
+        lat_edges, lon_edges = self.edges(zoom)
+        rows = slice(max(np.searchsorted(lat_edges, lat_range[0], side='right') - 1, 0),
+                     np.searchsorted(lat_edges, lat_range[1], side='left'))
+        cols = slice(max(np.searchsorted(lon_edges, lon_range[0], side='right') - 1, 0),
+                     np.searchsorted(lon_edges, lon_range[1], side='left'))
+        return self.grid(zoom).iloc[rows, cols]
+
+    def cells(self, zoom):
+        """Occupied cells with their centres and counts, densest first"""
+        lat_edges, lon_edges = self.edges(zoom)
+        rows, cols = np.nonzero(self.levels[zoom])
+        occupied = pd.DataFrame({
+            'lat_center': (lat_edges[rows] + lat_edges[rows + 1]) / 2,
+            'lon_center': (lon_edges[cols] + lon_edges[cols + 1]) / 2,
+            'count': self.levels[zoom][rows, cols]
+        })
+        return occupied.sort_values('count', ascending=False, ignore_index=True)
+
+    def stats(self, zoom):
+        """Occupied cells, max / mean points per occupied cell and the densest cell"""
+        occupied = self.cells(zoom)
+        if occupied.empty:
+            return {'occupied_cells': 0, 'max_count': 0, 'mean_count': 0.0, 'total_points': 0, 'hotspot': None}
+        return {
+            'occupied_cells': len(occupied),
+            'max_count': int(occupied['count'].iloc[0]),
+            'mean_count': float(occupied['count'].mean()),
+            'total_points': self.total_points,
+            'hotspot': occupied.iloc[0].to_dict()
+        }
+
+    def zoom_for_cells(self, max_cells):
+        """Finest zoom level with at most max_cells occupied cells"""
+        for zoom in range(self.max_zoom, -1, -1):
+            if np.count_nonzero(self.levels[zoom]) <= max_cells:
+                return zoom
+        return 0
+
+    def representatives(self, lat, lon, max_points=SCATTER_POINT_LIMIT):
+        """
+        Positions of at most max_points points (no missing values) covering every occupied cell.
+
+        One point is kept per cell at the finest zoom that fits the budget, so thinned
+        scatter plots keep the spatial coverage of the full data (unlike random sampling).
+        """
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        if len(lat) <= max_points:
+            return np.arange(len(lat))
+        zoom = self.zoom_for_cells(max_points)
+        row, col = _cell_index(lat, lon, self.bounds, 2 ** zoom)
+        # Scatter every position into its cell; whichever lands last represents the cell
+        chosen = np.full(4 ** zoom, -1, dtype=np.int64)
+        chosen[row * 2 ** zoom + col] = np.arange(len(lat))
+        return np.sort(chosen[chosen >= 0])
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def get_density_pyramid(lat, lon, max_zoom=MAX_ZOOM):
+    """Density pyramid cached per dataset version and column pair"""
+    return DensityPyramid(lat.to_numpy(dtype=np.float64, na_value=np.nan),
+                          lon.to_numpy(dtype=np.float64, na_value=np.nan), max_zoom)
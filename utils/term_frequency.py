@@ -0,0 +1,140 @@
+import pandas as pd
+import numpy as np
+import re
+import time
+import heapq
+from collections import Counter
+from operator import itemgetter
+import streamlit as st
+from utils.text_cleaning import STOP_WORDS
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+# Distinct texts tokenized per chunk; bounds the per-chunk n-gram buffers
+CHUNK_SIZE = 20000
+# Distinct terms kept exactly before switching to a Space-Saving sketch
+MAX_VOCABULARY = 500000
+SKETCH_CAPACITY = 10000
+
+
+class SpaceSaving:
+    """
+    Space-Saving top-k summary over weighted term counts.
+
+    Holds at most `capacity` terms. A term entering a full summary inherits the smallest
+    tracked count as its error, so every estimate overcounts by at most `errors[term]` and
+    any term more frequent than total / capacity is guaranteed to be tracked. Counts are
+    merged a chunk at a time and pruned back to capacity.
+    """
+
+    def __init__(self, capacity=SKETCH_CAPACITY):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+
+    def merge(self, counts):
+        floor = min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+        for term, count in counts.items():
+            if term in self.counts:
+                self.counts[term] += count
+            else:
+                self.counts[term] = count + floor
+                self.errors[term] = floor
+        if len(self.counts) > self.capacity:
+            self.counts = dict(heapq.nlargest(self.capacity, self.counts.items(), key=itemgetter(1)))
+            self.errors = {term: self.errors[term] for term in self.counts}
+
+    def most_common(self, k):
+        return heapq.nlargest(k, self.counts.items(), key=itemgetter(1))
+
+
+def _ngrams(tokens, ngram_range):
+    low, high = ngram_range
+    if low == high == 1:
+        return tokens
+    grams = []
+    for n in range(low, high + 1):
+        grams.extend(' '.join(tokens[start:start + n]) for start in range(len(tokens) - n + 1))
+    return grams
+
+
+def _chunk_counts(texts, weights, ngram_range, stop_words, lowercase, min_length):
+    """Weighted term counts for one chunk of distinct texts"""
+    grams, repeats = [], []
+    for text in texts:
+        if lowercase:
+            tokens = TOKEN_PATTERN.findall(text.lower())
+            if stop_words:
+                tokens = [token for token in tokens if token not in stop_words]
+        else:
+            tokens = TOKEN_PATTERN.findall(text)
+            if stop_words:
+                tokens = [token for token in tokens if token.lower() not in stop_words]
+        if min_length > 1:
+            tokens = [token for token in tokens if len(token) >= min_length]
+        text_grams = _ngrams(tokens, ngram_range)
+        grams.extend(text_grams)
+        repeats.append(len(text_grams))
+    if not grams:
+        return {}
+    gram_weights = np.repeat(weights, repeats)
+    return pd.Series(gram_weights).groupby(np.array(grams, dtype=object), sort=False).sum().to_dict()
+
+
+def term_frequencies(series, top_k=10, ngram_range=(1, 1), stop_words=STOP_WORDS, lowercase=True, min_length=1,
+                     chunk_size=CHUNK_SIZE, max_vocabulary=MAX_VOCABULARY, sketch_capacity=SKETCH_CAPACITY):
+    """
+    Most frequent terms (words or n-grams) over an entire text column.
+
+    Each distinct text is tokenized once, in chunks, and its terms are weighted by how many
+    rows hold it; tokens in stop_words or shorter than min_length are dropped before
+    n-grams are formed. Counts are exact while the vocabulary stays under max_vocabulary; past
+    that they are folded into a Space-Saving sketch of sketch_capacity terms, keeping memory
+    bounded. Returns a DataFrame of term / count (plus max_overcount when approximate) and
+    a stats dict.
+    """
+    start_time = time.time()
+    codes, uniques = pd.factorize(series)
+    texts = [value if isinstance(value, str) else str(value) for value in uniques]
+    rows_per_value = np.bincount(codes[codes >= 0], minlength=len(texts))
+
+    exact = Counter()
+    sketch = None
+    total_terms = 0
+    for start in range(0, len(texts), chunk_size):
+        counts = _chunk_counts(texts[start:start + chunk_size], rows_per_value[start:start + chunk_size],
+                               ngram_range, stop_words, lowercase, min_length)
+        total_terms += int(sum(counts.values()))
+        if sketch is None:
+            exact.update(counts)
+            if len(exact) > max_vocabulary:
+                sketch = SpaceSaving(max(sketch_capacity, top_k))
+                sketch.merge(exact)
+                exact = None
+        else:
+            sketch.merge(counts)
+
+    if sketch is None:
+        result = pd.DataFrame(exact.most_common(top_k), columns=['term', 'count'])
+        vocabulary = len(exact)
+    else:
+        result = pd.DataFrame(sketch.most_common(top_k), columns=['term', 'count'])
+        result['max_overcount'] = result['term'].map(sketch.errors)
+        vocabulary = None
+
+    stats = {
+        'rows': int(rows_per_value.sum()),
+        'distinct_texts': len(texts),
+        'total_terms': total_terms,
+        'vocabulary': vocabulary,
+        'exact': sketch is None,
+        'elapsed_seconds': time.time() - start_time
+    }
+    return result, stats
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def get_term_frequencies(series, top_k=10, ngram_range=(1, 1), remove_stop_words=False, min_length=1):
+    """Term frequencies cached per column version and settings"""
+    return term_frequencies(series, top_k=top_k, ngram_range=ngram_range,
+                            stop_words=STOP_WORDS if remove_stop_words else None, min_length=min_length)
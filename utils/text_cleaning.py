@@ -0,0 +1,205 @@
+import pandas as pd
+import numpy as np
+import re
+import os
+import time
+import concurrent.futures
+from functools import lru_cache
+
+# Distinct-value count above which cleaning is split across worker processes
+PARALLEL_THRESHOLD = 200000
+CHUNK_SIZE = 50000
+
+STOP_WORDS = frozenset({
+    'a', 'an', 'the', 'and', 'or', 'but', 'if', 'then', 'so', 'than', 'too', 'very',
+    'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'from', 'up', 'down', 'out', 'over',
+    'into', 'about', 'as', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'am',
+    'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'can',
+    'may', 'might', 'must', 'shall', 'i', 'me', 'my', 'we', 'our', 'you', 'your', 'he',
+    'him', 'his', 'she', 'her', 'it', 'its', 'they', 'them', 'their', 'this', 'that',
+    'these', 'those', 'what', 'which', 'who', 'whom', 'there', 'here', 'when', 'where',
+    'why', 'how', 'all', 'any', 'both', 'each', 'few', 'more', 'most', 'other', 'some',
+    'such', 'no', 'nor', 'not', 'only', 'own', 'same', 'just', 'now'
+})
+
+# "'s" is only expanded after pronouns; elsewhere it is usually a possessive ("John's car")
+CONTRACTIONS = {
+    "won't": 'will not', "can't": 'cannot', "n't": ' not', "'re": ' are',
+    "it's": 'it is', "that's": 'that is', "he's": 'he is', "she's": 'she is', "what's": 'what is',
+    "'d": ' would', "'ll": ' will', "'ve": ' have', "'m": ' am'
+}
+
+URL_PATTERN = r'http\S+|www\S+|https\S+'
+EMAIL_PATTERN = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+PHONE_PATTERN = r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'
+HTML_TAG_PATTERN = r'<[^<>]*>'
+
+# Suffixes ("n't", "'re") match anywhere; whole-word contractions only at a word start,
+# so "summit's" is left alone
+_CONTRACTION_RE = re.compile(
+    '|'.join((re.escape(key) if key in ("n't", "'re", "'d", "'ll", "'ve", "'m") else r'\b' + re.escape(key))
+             for key in CONTRACTIONS),
+    re.IGNORECASE
+)
+
+
+def _standardize_whitespace(text):
+    return ' '.join(text.split())
+
+
+def _remove_duplicate_words(text):
+    return ' '.join(dict.fromkeys(text.split()))
+
+
+def _expand_contraction(match):
+    expanded = CONTRACTIONS[match.group(0).lower()]
+    # Keep a leading capital ("It's" -> "It is"); lowercasing is the lowercase step's job
+    return expanded[0].upper() + expanded[1:] if match.group(0)[0].isupper() else expanded
+
+
+def _expand_contractions(text):
+    return _CONTRACTION_RE.sub(_expand_contraction, text)
+
+
+def _remove_stop_words(text):
+    return ' '.join(word for word in text.split() if word.lower() not in STOP_WORDS)
+
+
+def _fix_encoding(text):
+    return text.translate({0x2019: "'", 0x2018: "'", 0x201c: '"', 0x201d: '"'})
+
+
+# Operation name -> ('sub', pattern, replacement) or ('call', function)
+TEXT_OPERATIONS = {
+    'strip': ('call', str.strip),
+    'remove_extra_spaces': ('sub', r'\s+', ' '),
+    'standardize_whitespace': ('call', _standardize_whitespace),
+    'lowercase': ('call', str.lower),
+    'uppercase': ('call', str.upper),
+    'title_case': ('call', str.title),
+    'sentence_case': ('call', str.capitalize),
+    'remove_numbers': ('sub', r'\d+', ''),
+    'remove_punctuation': ('sub', r'[^\w\s]', ''),
+    'remove_special_chars': ('sub', r'[^a-zA-Z0-9\s]', ''),
+    'remove_urls': ('sub', URL_PATTERN, ''),
+    'remove_emails': ('sub', EMAIL_PATTERN, ''),
+    'remove_phones': ('sub', PHONE_PATTERN, ''),
+    'remove_html': ('sub', HTML_TAG_PATTERN, ''),
+    'standardize_line_breaks': ('sub', r'\r\n|\r|\n', ' '),
+    'remove_duplicate_words': ('call', _remove_duplicate_words),
+    'expand_contractions': ('call', _expand_contractions),
+    'remove_stop_words': ('call', _remove_stop_words),
+    'fix_encoding': ('call', _fix_encoding)
+}
+
+# Deletions of single character classes: deleting one class never creates or hides a match
+# of another, so running them in sequence equals one pass deleting the union
+CHARACTER_DELETIONS = frozenset({'remove_numbers', 'remove_punctuation', 'remove_special_chars'})
+
+
+class TextPipeline:
+    """
+    A sequence of text operations compiled into precompiled steps.
+
+    Consecutive character-class deletions (numbers, punctuation, special characters) are
+    fused into one alternation regex, so they are a single scan per value. Structured
+    patterns (URLs, emails, ...) and the custom pattern run as their own steps, since they
+    can overlap or match text left by an earlier step. Instances are picklable and can be
+    shipped to worker processes.
+    """
+
+    def __init__(self, operations, custom_pattern=None, replacement=''):
+        self.operations = list(operations)
+        self.steps = []
+        for op in self.operations:
+            step = TEXT_OPERATIONS[op]
+            previous = self.steps[-1] if self.steps else None
+            if op in CHARACTER_DELETIONS and previous and previous[0] == 'delete':
+                self.steps[-1] = ('delete', previous[1] + [step[1]])
+            elif op in CHARACTER_DELETIONS:
+                self.steps.append(('delete', [step[1]]))
+            else:
+                self.steps.append(step)
+        if custom_pattern:
+            self.steps.append(('sub', custom_pattern, replacement or ''))
+        self._compiled = [self._compile(step) for step in self.steps]
+
+    @staticmethod
+    def _compile(step):
+        if step[0] == 'delete':
+            return ('sub', re.compile('|'.join(f'(?:{pattern})' for pattern in step[1])), '')
+        if step[0] == 'sub':
+            return ('sub', re.compile(step[1]), step[2])
+        return step
+
+    def __getstate__(self):
+        return {'operations': self.operations, 'steps': self.steps}
+
+    def __setstate__(self, state):
+        self.operations = state['operations']
+        self.steps = state['steps']
+        self._compiled = [self._compile(step) for step in self.steps]
+
+    def __call__(self, text):
+        for step in self._compiled:
+            if step[0] == 'sub':
+                text = step[1].sub(step[2], text)
+            else:
+                text = step[1](text)
+        return text
+
+    def apply_many(self, texts):
+        return [self(text) for text in texts]
+
+
+@lru_cache(maxsize=64)
+def compile_text_pipeline(operations, custom_pattern=None, replacement=''):
+    """Compiled pipeline for a tuple of operation names (memoized)"""
+    return TextPipeline(operations, custom_pattern, replacement)
+
+
+def clean_text_series(series, operations, custom_pattern=None, replacement='', n_jobs=-1,
+                      parallel_threshold=PARALLEL_THRESHOLD):
+    """
+    Apply text operations to a column once per distinct value and map the results back.
+
+    Missing and non-string values come back missing, as with the pandas .str methods. When the column has more distinct values than
+    parallel_threshold, the distinct values are cleaned in chunks across a process pool.
+    Returns the cleaned Series and a stats dict.
+    """
+    start_time = time.time()
+    pipeline = compile_text_pipeline(tuple(operations), custom_pattern or None, replacement or '')
+
+    codes, uniques = pd.factorize(series)
+    # Non-string values are treated as missing, as the pandas .str methods do
+    is_text = np.fromiter((isinstance(value, str) for value in uniques), dtype=bool, count=len(uniques))
+    if not is_text.all():
+        remap = np.where(is_text, np.cumsum(is_text) - 1, -1)
+        codes = np.where(codes >= 0, remap[codes], -1)
+        uniques = uniques[is_text]
+    texts = list(uniques)
+
+    workers = 1
+    if len(texts) > parallel_threshold and n_jobs != 1:
+        workers = (os.cpu_count() or 1) if n_jobs in (None, -1) else n_jobs
+    if workers > 1:
+        chunks = [texts[start:start + CHUNK_SIZE] for start in range(0, len(texts), CHUNK_SIZE)]
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            cleaned = [text for chunk in executor.map(pipeline.apply_many, chunks) for text in chunk]
+    else:
+        cleaned = pipeline.apply_many(texts)
+
+    values = np.empty(len(cleaned) + 1, dtype=object)
+    values[:len(cleaned)] = cleaned
+    values[-1] = np.nan
+    result = pd.Series(values[codes], index=series.index, name=series.name)
+    if isinstance(series.dtype, pd.StringDtype):
+        result = result.astype(series.dtype)
+
+    stats = {
+        'rows': len(series),
+        'distinct_values': len(texts),
+        'workers': workers,
+        'elapsed_seconds': time.time() - start_time
+    }
+    return result, stats
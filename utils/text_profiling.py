@@ -0,0 +1,159 @@
+import pandas as pd
+import numpy as np
+import re
+import streamlit as st
+from utils.text_cleaning import URL_PATTERN, PHONE_PATTERN, HTML_TAG_PATTERN
+
+# Same as EMAIL_PATTERN, but the lookbehind rejects starts inside a word in O(1) instead of
+# rescanning the rest of the word at every position
+EMAIL_SCAN_PATTERN = r'(?<![A-Za-z0-9._%+-])[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+
+# Issue pattern -> (regex, gate). A text is only searched when its gate passes: a required
+# substring, or a minimum count of one character class (from the character histogram).
+ISSUE_PATTERNS = {
+    'url': (re.compile(URL_PATTERN), ('substring', ('http', 'www'))),
+    'email': (re.compile(EMAIL_SCAN_PATTERN), ('substring', ('@',))),
+    'phone': (re.compile(PHONE_PATTERN), ('class', 'digit', 10)),
+    'html': (re.compile(HTML_TAG_PATTERN), ('substring', ('<',))),
+    'extra_spaces': (re.compile(r'\s{2,}'), ('class', 'space', 2))
+}
+
+CHAR_CLASSES = ['upper', 'lower', 'digit', 'space', 'other_letter', 'special']
+# Characters classified per chunk; bounds the per-character temporary arrays (~30 bytes each)
+CHAR_CHUNK = 1 << 22
+
+
+_bmp_classes = None
+
+
+def _classify_codepoints(codepoints):
+    """Character class index for each codepoint"""
+    classes = np.empty(len(codepoints), dtype=np.int64)
+    for position, codepoint in enumerate(codepoints):
+        char = chr(codepoint)
+        if char.isupper():
+            classes[position] = 0
+        elif char.islower():
+            classes[position] = 1
+        elif char.isdigit():
+            classes[position] = 2
+        elif char.isspace():
+            classes[position] = 3
+        elif char.isalpha():
+            classes[position] = 4
+        else:
+            classes[position] = 5
+    return classes
+
+
+def _codepoint_classes(codepoints):
+    """Classify a codepoint array: table lookup for the BMP, classification of distinct others"""
+    global _bmp_classes
+    if _bmp_classes is None:
+        _bmp_classes = _classify_codepoints(range(0x10000)).astype(np.int8)
+    classes = _bmp_classes[np.minimum(codepoints, 0xFFFF)].astype(np.int64)
+    astral = codepoints > 0xFFFF
+    if astral.any():
+        distinct, inverse = np.unique(codepoints[astral], return_inverse=True)
+        classes[astral] = _classify_codepoints(distinct.tolist())[inverse.ravel()]
+    return classes
+
+
+def _char_class_counts(texts, lengths, chunk_chars=CHAR_CHUNK):
+    """Characters per class for each text, over codepoint arrays of about chunk_chars characters"""
+    counts = np.zeros((len(texts), len(CHAR_CLASSES)), dtype=np.int64)
+    ends = np.cumsum(lengths)
+    start = 0
+    while start < len(texts):
+        # At least one text per chunk, however long it is
+        stop = max(start + 1, int(np.searchsorted(ends, ends[start] - lengths[start] + chunk_chars, side='right')))
+        chunk_lengths = lengths[start:stop]
+        if chunk_lengths.sum():
+            # surrogatepass keeps lone surrogates (from broken decoding) as codepoints instead of failing
+            codepoints = np.frombuffer(''.join(texts[start:stop]).encode('utf-32-le', errors='surrogatepass'),
+                                       dtype=np.uint32)
+            text_ids = np.repeat(np.arange(stop - start), chunk_lengths)
+            flat = np.bincount(text_ids * len(CHAR_CLASSES) + _codepoint_classes(codepoints),
+                               minlength=(stop - start) * len(CHAR_CLASSES))
+            counts[start:stop] = flat.reshape(stop - start, len(CHAR_CLASSES))
+        start = stop
+    return counts
+
+
+def _issue_flags(texts, by_class):
+    """Which issue patterns occur in each text; each regex only visits texts passing its gate"""
+    flags = {}
+    for name, (pattern, gate) in ISSUE_PATTERNS.items():
+        if gate[0] == 'class':
+            candidates = np.flatnonzero(by_class[gate[1]].to_numpy() >= gate[2])
+        else:
+            candidates = [position for position, text in enumerate(texts)
+                          if gate[1][0] in text or (len(gate[1]) > 1 and gate[1][1] in text)]
+        found = np.zeros(len(texts), dtype=bool)
+        found[[position for position in candidates if pattern.search(texts[position])]] = True
+        flags[name] = found
+    return pd.DataFrame(flags)
+
+
+def _weighted_median(values, cumulative):
+    """Median of sorted values given their cumulative row counts; even counts average the middle pair"""
+    total = int(cumulative[-1]) if len(cumulative) else 0
+    if total == 0:
+        return 0.0
+    lower = values[np.searchsorted(cumulative, (total + 1) // 2)]
+    upper = values[np.searchsorted(cumulative, total // 2 + 1)]
+    return float((lower + upper) / 2)
+
+
+def profile_text_series(series):
+    """
+    Profile a text column, visiting each distinct value once.
+
+    Returns a dict with row/distinct/empty counts, length statistics and the length
+    distribution, rows matching each pattern (URLs, emails, phones, HTML, extra spaces,
+    special characters), casing and numeric-only counts, and a character-class histogram.
+    All counts are weighted by how many rows hold each distinct value.
+    """
+    codes, uniques = pd.factorize(series)
+    texts = [value if isinstance(value, str) else str(value) for value in uniques]
+    rows_per_value = np.bincount(codes[codes >= 0], minlength=len(texts))
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+
+    by_class = pd.DataFrame(_char_class_counts(texts, lengths), columns=CHAR_CLASSES)
+    issues = _issue_flags(texts, by_class)
+
+    def rows_where(mask):
+        return int(rows_per_value[np.asarray(mask)].sum())
+
+    non_null = int(rows_per_value.sum())
+    pattern_counts = {name: rows_where(issues[name]) for name in issues.columns}
+    pattern_counts.update({
+        'special_chars': rows_where(by_class['special'] > 0),
+        'all_caps': rows_where((by_class['upper'] > 0) & (by_class['lower'] == 0)),
+        'all_lower': rows_where((by_class['lower'] > 0) & (by_class['upper'] == 0)),
+        'mixed_case': rows_where((by_class['upper'] > 0) & (by_class['lower'] > 0)),
+        'numeric': rows_where((lengths > 0) & (by_class['digit'] == lengths))
+    })
+
+    length_counts = pd.Series(rows_per_value, index=lengths).groupby(level=0).sum().sort_index()
+    length_counts.index.name = 'length'
+    cumulative = length_counts.cumsum().to_numpy()
+
+    return {
+        'rows': non_null,
+        'distinct': len(texts),
+        'empty': rows_where(lengths == 0),
+        'length_mean': float((lengths * rows_per_value).sum() / non_null) if non_null else 0.0,
+        'length_min': int(length_counts.index.min()) if non_null else 0,
+        'length_max': int(length_counts.index.max()) if non_null else 0,
+        'length_median': _weighted_median(length_counts.index.to_numpy(), cumulative),
+        'length_counts': length_counts,
+        'pattern_counts': pattern_counts,
+        'char_histogram': pd.Series((by_class.to_numpy() * rows_per_value[:, None]).sum(axis=0), index=CHAR_CLASSES)
+    }
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def get_text_profile(series):
+    """Text profile cached per column version"""
+    return profile_text_series(series)
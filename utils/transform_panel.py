@@ -0,0 +1,74 @@
+import streamlit as st
+from datetime import datetime
+from utils.transform_registry import TransformRegistry, list_versions
+
+
+def get_session_registry():
+    """Fitted transforms recorded by the encoding and scaling pages during this session"""
+    if 'transform_registry' not in st.session_state:
+        st.session_state.transform_registry = TransformRegistry()
+    return st.session_state.transform_registry
+
+
+def _log(action, details):
+    if 'processing_log' not in st.session_state:
+        st.session_state.processing_log = []
+    st.session_state.processing_log.append({
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'action': action,
+        'details': details
+    })
+
+
+def show_transform_registry_panel(df, key):
+    """Save this session's fitted transforms under a pipeline version, or apply a saved version to df"""
+    registry = get_session_registry()
+
+    col1, col2 = st.columns([1, 1])
+
+    with col1:
+        st.markdown("#### Save Fitted Transforms")
+        st.write(f"**Fitted this session:** {len(registry)} transforms")
+        for entry in registry.entries[-10:]:
+            st.write(f"- {', '.join(entry['source'])} → {entry['kind']} ({len(entry['output'])} output columns)")
+
+        version = st.text_input("Pipeline version:", value=f"pipeline_{datetime.now().strftime('%Y%m%d')}",
+                                key=f"{key}_version", help="Saving to an existing version overwrites it")
+
+        if st.button("💾 Save Fitted Transforms", key=f"{key}_save", disabled=len(registry) == 0):
+            try:
+                registry.version = version
+                path = registry.save()
+                _log('Save Fitted Transforms', f"Saved {len(registry)} fitted transforms as version {version}")
+                st.success(f"✅ Saved {len(registry)} transforms to {path}")
+            except Exception as e:
+                st.error(f"❌ Saving transforms failed: {str(e)}")
+
+    with col2:
+        st.markdown("#### Apply Saved Transforms")
+        versions = list_versions()
+
+        if not versions:
+            st.info("No saved pipeline versions yet.")
+            return
+
+        selected = st.selectbox(
+            "Saved version:",
+            [item['version'] for item in versions],
+            format_func=lambda name: next(f"{item['version']} ({item['transforms']} transforms, {item['saved_at']})"
+                                          for item in versions if item['version'] == name),
+            key=f"{key}_saved_version"
+        )
+
+        if st.button("▶️ Apply Saved Transforms", key=f"{key}_apply", type="primary"):
+            try:
+                saved = TransformRegistry.load(selected)
+                transformed, applied = saved.transform(df)
+                st.session_state.current_dataset = transformed
+                _log('Apply Fitted Transforms',
+                     f"Applied {len(applied)} of {len(saved)} transforms from version {selected} (transform only)")
+                st.success(f"✅ Applied {len(applied)} of {len(saved)} saved transforms without refitting")
+                if len(applied) < len(saved):
+                    st.warning(f"⚠️ {len(saved) - len(applied)} transforms skipped: source columns not in this dataset")
+            except Exception as e:
+                st.error(f"❌ Applying transforms failed: {str(e)}")
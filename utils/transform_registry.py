@@ -0,0 +1,242 @@
+import pandas as pd
+import numpy as np
+import os
+import json
+import joblib
+from datetime import datetime
+from sklearn.utils import get_tags
+from utils.categorical_encoding import one_hot_encode, hash_encode
+
+REGISTRY_DIR = os.path.join(os.environ.get('KLINITALL_CACHE_DIR', os.path.expanduser('~/.cache/klinitall')),
+                            'transforms')
+MANIFEST_FILE = 'manifest.json'
+
+
+def _plain(values):
+    """JSON-safe list from an array or index (NumPy scalars become Python scalars)"""
+    return np.asarray(values).tolist()
+
+
+def describe_estimator(estimator):
+    """
+    JSON form of a fitted scikit-learn encoder / scaler, or None when it has none.
+
+    Linear scalers become one 'affine' spec (x * multiplier + offset per column), label and
+    ordinal encoders a category vocabulary and target encoders a category -> value mapping.
+    """
+    name = type(estimator).__name__
+    if name == 'LabelEncoder':
+        return {'kind': 'label', 'categories': _plain(estimator.classes_)}
+    if name == 'OrdinalEncoder' and len(estimator.categories_) == 1:
+        return {'kind': 'label', 'categories': _plain(estimator.categories_[0])}
+    if name == 'StandardScaler':
+        # mean_ is fitted even with with_mean=False, but transform only uses what is enabled
+        scale = estimator.scale_ if estimator.with_std and estimator.scale_ is not None \
+            else np.ones(estimator.n_features_in_)
+        mean = estimator.mean_ if estimator.with_mean and estimator.mean_ is not None \
+            else np.zeros(estimator.n_features_in_)
+        return {'kind': 'affine', 'multiplier': _plain(1 / scale), 'offset': _plain(-mean / scale)}
+    if name == 'MinMaxScaler':
+        return {'kind': 'affine', 'multiplier': _plain(estimator.scale_), 'offset': _plain(estimator.min_)}
+    if name == 'RobustScaler':
+        scale = estimator.scale_ if estimator.scale_ is not None else np.ones(estimator.n_features_in_)
+        center = estimator.center_ if estimator.center_ is not None else np.zeros(estimator.n_features_in_)
+        return {'kind': 'affine', 'multiplier': _plain(1 / scale), 'offset': _plain(-center / scale)}
+    if name == 'MaxAbsScaler':
+        return {'kind': 'affine', 'multiplier': _plain(1 / estimator.scale_),
+                'offset': _plain(np.zeros(len(estimator.scale_)))}
+    if name == 'TargetEncoder' and len(estimator.encodings_) == 1:
+        return {'kind': 'mapping', 'categories': _plain(estimator.categories_[0]),
+                'values': _plain(estimator.encodings_[0]), 'default': float(estimator.target_mean_)}
+    return None
+
+
+def _allows_nan(estimator):
+    """Whether a fitted estimator accepts missing values in transform (scikit-learn estimator tags)"""
+    # category_encoders encoders map missing values themselves unless handle_missing='error'
+    handle_missing = getattr(estimator, 'handle_missing', None)
+    if isinstance(handle_missing, str):
+        return handle_missing != 'error'
+    try:
+        return get_tags(estimator).input_tags.allow_nan
+    except Exception:
+        return False
+
+
+def _prepare(series, entry):
+    """Column values as the encoder saw them at fit time (optionally .astype(str), then .fillna(na_value))"""
+    values = series.astype(str) if entry.get('as_text') else series
+    if entry.get('na_value') is not None:
+        values = values.fillna(entry['na_value'])
+    return values
+
+
+class TransformRegistry:
+    """
+    Fitted encoders and scalers for one pipeline version, applied transform-only to new data.
+
+    Each entry records its source column(s), output column(s) and the fitted state as plain
+    JSON (vocabularies, mappings, affine coefficients); estimators without a JSON form are
+    kept as joblib files. save() writes REGISTRY_DIR/<version>/manifest.json, load() reads it
+    back, and transform() applies every entry with vectorized pandas / NumPy operations
+    instead of refitting.
+    """
+
+    def __init__(self, version='default'):
+        self.version = version
+        self.entries = []
+        self.estimators = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _add(self, spec, source, output, drop_source=False):
+        source = [source] if isinstance(source, str) else list(source)
+        output = [output] if isinstance(output, str) else list(output)
+        # A refit of the same outputs replaces the earlier entry
+        self.entries = [entry for entry in self.entries if entry['output'] != output]
+        spec = {**spec, 'source': source, 'output': output, 'drop_source': drop_source,
+                'fitted_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+        self.entries.append(spec)
+        return spec
+
+    def record(self, source, output, estimator, drop_source=False, as_text=False, na_value=None, dtype=None):
+        """
+        Register a fitted scikit-learn / category_encoders estimator under its output column(s).
+
+        as_text / na_value describe how the column was prepared before fitting
+        (.astype(str), .fillna(na_value)) so new data is prepared the same way; dtype is the
+        output dtype of scaled columns (e.g. 'float32'), float64 when not given.
+        """
+        spec = describe_estimator(estimator)
+        if spec is None:
+            spec = {'kind': 'estimator', 'estimator': type(estimator).__name__,
+                    'file': f"{'_'.join(output if isinstance(output, list) else [output])}.joblib"}
+            self.estimators[spec['file']] = estimator
+        spec.update(as_text=as_text, na_value=na_value, dtype=np.dtype(dtype).name if dtype is not None else None)
+        return self._add(spec, source, output, drop_source)
+
+    def record_mapping(self, source, output, mapping, default=np.nan, as_text=False, na_value=None):
+        """Register a category -> value lookup (e.g. frequency encoding)"""
+        return self._add({'kind': 'mapping', 'categories': _plain(list(mapping.keys())),
+                          'values': _plain(list(mapping.values())), 'default': default,
+                          'as_text': as_text, 'na_value': na_value}, source, output)
+
+    def record_one_hot(self, df, columns, output, dummy_na=True, drop_source=False):
+        """Register a one-hot block with the category vocabulary of each column at fit time"""
+        categories = {}
+        for col in columns:
+            series = df[col]
+            values = series.cat.categories if isinstance(series.dtype, pd.CategoricalDtype) \
+                else pd.factorize(series, sort=True)[1]
+            categories[col] = _plain(values)
+        return self._add({'kind': 'one_hot', 'categories': categories, 'dummy_na': dummy_na}, columns, output, drop_source)
+
+    def record_hash(self, columns, output, n_components, seed=0):
+        """Register a feature-hashing block (stateless apart from its settings)"""
+        return self._add({'kind': 'hash', 'n_components': n_components, 'seed': seed}, columns, output)
+
+    def transform(self, df):
+        """
+        Apply every registered transform to df without refitting.
+
+        Entries are applied in the order they were recorded, each to the output of the ones
+        before it. Unseen categories get -1 (label / ordinal), the mapping default, or no
+        indicator (one-hot). Entries whose source columns are missing are skipped. Returns the
+        transformed DataFrame and the list of entries applied.
+        """
+        result = df.copy()
+        dropped, applied = [], []
+        # Entries run in recorded order on the running result, so a scaler fitted on an
+        # encoder's output (encode -> scale) reads the encoded column
+        for entry in self.entries:
+            if not all(col in result.columns for col in entry['source']):
+                continue
+            kind = entry['kind']
+            block = None
+            source = result[entry['source'][0]]
+            if kind == 'label':
+                codes = pd.Categorical(_prepare(source, entry), categories=pd.Index(entry['categories'])).codes
+                result[entry['output'][0]] = codes.astype(np.int64)
+            elif kind == 'mapping':
+                codes = pd.Categorical(_prepare(source, entry), categories=pd.Index(entry['categories'])).codes
+                # Code -1 (unseen or missing) picks the trailing default
+                mapped = np.append(np.asarray(entry['values'], dtype=np.float64), entry['default'])
+                result[entry['output'][0]] = mapped[codes]
+            elif kind == 'affine':
+                data = result[entry['source']].to_numpy(dtype=np.float64, na_value=np.nan)
+                scaled = data * np.asarray(entry['multiplier']) + np.asarray(entry['offset'])
+                if entry.get('dtype'):
+                    scaled = scaled.astype(entry['dtype'])
+                for position, col in enumerate(entry['output']):
+                    result[col] = scaled[:, position]
+            elif kind == 'one_hot':
+                fixed = pd.DataFrame({col: pd.Categorical(result[col], categories=pd.Index(entry['categories'][col]))
+                                      for col in entry['source']}, index=result.index)
+                block, _ = one_hot_encode(fixed, entry['source'], dummy_na=entry['dummy_na'])
+            elif kind == 'hash':
+                block = hash_encode(result, entry['source'], n_components=entry['n_components'], seed=entry['seed'])
+            elif kind == 'estimator':
+                estimator = self.estimators[entry['file']]
+                frame = result[entry['source']]
+                # Estimators that accept NaN get every row; others only complete rows
+                present = np.ones(len(frame), dtype=bool) if _allows_nan(estimator) \
+                    else frame.notna().all(axis=1).to_numpy()
+                # Estimators fitted on a DataFrame expect one back; the scaling pages fit on arrays
+                rows = frame[present] if hasattr(estimator, 'feature_names_in_') else frame[present].to_numpy()
+                output = estimator.transform(rows)
+                output = output.to_numpy() if hasattr(output, 'to_numpy') else np.asarray(output)
+                values = np.full((len(result), output.reshape(len(output), -1).shape[1]), np.nan)
+                values[present] = output.reshape(len(output), -1)
+                if entry.get('dtype'):
+                    values = values.astype(entry['dtype'])
+                for position, col in enumerate(entry['output']):
+                    result[col] = values[:, position]
+            if block is not None:
+                result = pd.concat([result.drop(columns=[col for col in block.columns if col in result.columns]), block],
+                                   axis=1)
+            if entry['drop_source']:
+                dropped.extend(col for col in entry['source'] if col not in entry['output'])
+            applied.append(entry)
+
+        if dropped:
+            result = result.drop(columns=[col for col in dict.fromkeys(dropped) if col in result.columns])
+        return result, applied
+
+    def save(self, directory=REGISTRY_DIR):
+        """Write the manifest (JSON) and any joblib estimators to directory/<version>"""
+        target = os.path.join(directory, self.version)
+        os.makedirs(target, exist_ok=True)
+        for file_name, estimator in self.estimators.items():
+            joblib.dump(estimator, os.path.join(target, file_name))
+        manifest = {'version': self.version, 'saved_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    'transforms': self.entries}
+        with open(os.path.join(target, MANIFEST_FILE), 'w') as handle:
+            json.dump(manifest, handle, indent=2, default=str)
+        return target
+
+    @classmethod
+    def load(cls, version, directory=REGISTRY_DIR):
+        target = os.path.join(directory, version)
+        with open(os.path.join(target, MANIFEST_FILE)) as handle:
+            manifest = json.load(handle)
+        registry = cls(manifest['version'])
+        registry.entries = manifest['transforms']
+        for entry in registry.entries:
+            if entry['kind'] == 'estimator':
+                registry.estimators[entry['file']] = joblib.load(os.path.join(target, entry['file']))
+        return registry
+
+
+def list_versions(directory=REGISTRY_DIR):
+    """Saved pipeline versions with their save time and transform count, newest first"""
+    versions = []
+    if os.path.isdir(directory):
+        for name in os.listdir(directory):
+            manifest_path = os.path.join(directory, name, MANIFEST_FILE)
+            if os.path.exists(manifest_path):
+                with open(manifest_path) as handle:
+                    manifest = json.load(handle)
+                versions.append({'version': manifest['version'], 'saved_at': manifest['saved_at'],
+                                 'transforms': len(manifest['transforms'])})
+    return sorted(versions, key=lambda item: item['saved_at'], reverse=True)
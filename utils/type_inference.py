@@ -0,0 +1,262 @@
+import pandas as pd
+import numpy as np
+from collections import OrderedDict
+from utils.numeric_coercion import coerce_numeric
+
+SAMPLE_SIZE = 1000
+MATCH_THRESHOLD = 0.8
+_CACHE_SIZE = 2048
+
+# Vectorized value signatures, checked against a stratified sample of each column
+BOOLEAN_VALUES = {'true', 'false', 'yes', 'no', 'y', 'n', 't', 'f', '1', '0'}
+INTEGER_PATTERN = r'[+-]?\d+'
+FLOAT_PATTERN = r'[+-]?(?:\d+\.\d*|\.\d+|\d+)(?:[eE][+-]?\d+)?'
+# Comma groups are optional so the values under 1000 of a '{:,.2f}' column ('12.50') match too
+THOUSANDS_PATTERN = r'[+-]?\d{1,3}(?:,\d{3})*(?:\.\d+)?'
+CURRENCY_PATTERN = r'[+-]?\(?\s*(?:[$€£¥₹]|USD|EUR|GBP)\s?[+-]?[\d,]*\.?\d+\s*\)?|[+-]?[\d,]*\.?\d+\s?(?:[$€£¥₹]|USD|EUR|GBP)'
+PERCENT_PATTERN = r'[+-]?\d*\.?\d+\s?%'
+UUID_PATTERN = r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}'
+CODE_ID_PATTERN = r'[A-Za-z]{1,5}[-_]?\d{3,}'
+# Both halves need a decimal part, which keeps '1.234,56' and comma-joined ids out; ranges are checked separately
+LATLON_PAIR_PATTERN = r'\(?\s*([+-]?\d{1,2}\.\d+)\s*,\s*([+-]?\d{1,3}\.\d+)\s*\)?'
+
+# (regex, strptime format) pairs; ambiguous day/month orders are resolved from the values
+DATETIME_SIGNATURES = [
+    (r'\d{4}-\d{2}-\d{2}', '%Y-%m-%d'),
+    (r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}', '%Y-%m-%d %H:%M:%S'),
+    (r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}', '%Y-%m-%dT%H:%M:%S'),
+    (r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}', '%Y-%m-%d %H:%M'),
+    (r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}', '%Y-%m-%dT%H:%M'),
+    (r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?', 'ISO8601'),
+    (r'\d{4}/\d{2}/\d{2}', '%Y/%m/%d'),
+    (r'\d{1,2}/\d{1,2}/\d{4}', '%m/%d/%Y'),
+    (r'\d{1,2}/\d{1,2}/\d{4} \d{1,2}:\d{2}:\d{2}', '%m/%d/%Y %H:%M:%S'),
+    (r'\d{1,2}/\d{1,2}/\d{4} \d{1,2}:\d{2}', '%m/%d/%Y %H:%M'),
+    (r'\d{1,2}-\d{1,2}-\d{4}', '%m-%d-%Y'),
+    (r'\d{1,2}\.\d{1,2}\.\d{4}', '%d.%m.%Y'),
+    (r'\d{1,2} [A-Za-z]{3} \d{4}', '%d %b %Y'),
+    (r'\d{1,2}-[A-Za-z]{3}-\d{4}', '%d-%b-%Y'),
+    (r'[A-Za-z]{3} \d{1,2}, \d{4}', '%b %d, %Y'),
+    (r'[A-Za-z]{4,9} \d{1,2}, \d{4}', '%B %d, %Y'),
+]
+
+NUMERIC_SEMANTIC_TYPES = ('integer', 'float', 'currency', 'percent')
+
+ID_NAME_HINTS = ['id', 'uuid', 'guid', 'key', 'code', 'number', 'no']
+GEO_NAME_HINTS = ['lat', 'lon', 'lng', 'latitude', 'longitude', 'coord', 'geo', 'location']
+
+_inference_cache = OrderedDict()
+
+
+def stratified_sample(series, size=SAMPLE_SIZE):
+    """Non-null values taken at evenly spaced positions, so every part of the column is represented"""
+    if len(series) > size * 4:
+        positions = np.linspace(0, len(series) - 1, size * 4).astype(np.int64)
+        candidates = series.iloc[positions].dropna()
+        # Mostly-empty columns need the slower full scan to find enough values
+        if len(candidates) >= size:
+            return candidates.iloc[np.linspace(0, len(candidates) - 1, size).astype(np.int64)]
+    non_null = series.dropna()
+    if len(non_null) <= size:
+        return non_null
+    positions = np.linspace(0, len(non_null) - 1, size).astype(np.int64)
+    return non_null.iloc[positions]
+
+
+def is_text_column(series):
+    """Whether a column holds raw strings (object or pandas string dtype)"""
+    return pd.api.types.is_object_dtype(series) or isinstance(series.dtype, pd.StringDtype)
+
+
+def column_fingerprint(series, sample=None):
+    """Cheap content fingerprint: name, dtype, length, null count and a hash of the stratified sample"""
+    if sample is None:
+        sample = stratified_sample(series)
+    sample_hash = int(pd.util.hash_pandas_object(sample.astype(str), index=False).sum()) if len(sample) else 0
+    return (str(series.name), str(series.dtype), len(series), int(series.isnull().sum()), sample_hash)
+
+
+def _match_rate(text, pattern):
+    """Share of sample strings fully matching a regex"""
+    return text.str.fullmatch(pattern).mean() if len(text) else 0.0
+
+
+def _resolve_day_first(text, fmt):
+    """Switch month/day order when the first field exceeds 12 somewhere in the sample"""
+    if fmt.startswith('%m'):
+        first_field = pd.to_numeric(text.str.extract(r'^(\d{1,2})', expand=False), errors='coerce')
+        if (first_field > 12).any():
+            return fmt.replace('%m', '%_').replace('%d', '%m').replace('%_', '%d')
+    return fmt
+
+
+def detect_datetime_format(text):
+    """Best-matching explicit datetime format for a sample of strings, with its match rate"""
+    best_format, best_rate = None, 0.0
+    for pattern, fmt in DATETIME_SIGNATURES:
+        rate = _match_rate(text, pattern)
+        if rate > best_rate:
+            best_format, best_rate = fmt, rate
+    if best_format is not None:
+        best_format = _resolve_day_first(text, best_format)
+    return best_format, best_rate
+
+
+def _name_has_hint(name, hints):
+    """Whether a column name contains one of the hint words as a token"""
+    tokens = str(name).lower().replace('-', '_').replace(' ', '_').split('_')
+    return any(hint in tokens for hint in hints) or str(name).lower() in hints
+
+
+def _is_geo_name(name):
+    """Coordinate-like column name that is not an identifier ('location_id' is an id, not a coordinate)"""
+    return _name_has_hint(name, GEO_NAME_HINTS) and not _name_has_hint(name, ID_NAME_HINTS)
+
+
+def _latlon_pair_rate(text):
+    """Share of sample strings that are 'lat, lon' pairs with |lat| <= 90 and |lon| <= 180"""
+    if not len(text):
+        return 0.0
+    pairs = text.str.extract(f'^{LATLON_PAIR_PATTERN}$').astype(np.float64)
+    return float(((pairs[0].abs() <= 90) & (pairs[1].abs() <= 180)).mean())
+
+
+def _result(semantic_type, storage_type, confidence, **extra):
+    result = {'semantic_type': semantic_type, 'storage_type': storage_type, 'confidence': float(confidence)}
+    result.update(extra)
+    return result
+
+
+def _infer_uncached(series, sample):
+    """Classify one column from its stratified sample"""
+    if len(sample) == 0:
+        return _result('empty', str(series.dtype), 1.0)
+
+    unique_count = sample.nunique()
+    unique_ratio = unique_count / len(sample)
+
+    if pd.api.types.is_bool_dtype(series):
+        return _result('boolean', 'boolean', 1.0)
+
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return _result('datetime', 'datetime64', 1.0)
+
+    if pd.api.types.is_numeric_dtype(series):
+        # Coordinates are fractional; integer columns named 'location' or 'geo_id' are codes
+        if _is_geo_name(series.name) and not pd.api.types.is_integer_dtype(series) \
+                and (sample != np.floor(sample)).any() and sample.between(-180, 180).all():
+            return _result('geo', str(series.dtype), 0.9)
+        if unique_count == 2 and set(sample.unique()) <= {0, 1}:
+            return _result('boolean', 'boolean', 0.9)
+        if pd.api.types.is_integer_dtype(series) or (sample == np.floor(sample)).all():
+            if unique_ratio > 0.95 and _name_has_hint(series.name, ID_NAME_HINTS):
+                return _result('id', str(series.dtype), 0.9)
+            return _result('integer', 'int64' if pd.api.types.is_integer_dtype(series) else str(series.dtype), 0.9)
+        return _result('float', 'float64', 0.9)
+
+    text = sample.astype(str).str.strip()
+    lowered = text.str.lower()
+
+    bool_rate = lowered.isin(BOOLEAN_VALUES).mean()
+    if bool_rate >= MATCH_THRESHOLD and lowered.nunique() <= 3:
+        return _result('boolean', 'boolean', 0.9 if bool_rate == 1 else bool_rate)
+
+    int_rate = _match_rate(text, INTEGER_PATTERN)
+    float_rate = _match_rate(text, FLOAT_PATTERN)
+    if float_rate >= MATCH_THRESHOLD:
+        if int_rate >= float_rate and unique_ratio > 0.95 and _name_has_hint(series.name, ID_NAME_HINTS):
+            return _result('id', 'object', int_rate)
+        if int_rate >= float_rate:
+            return _result('integer', 'int64', int_rate)
+        if _is_geo_name(series.name):
+            return _result('geo', 'float64', float_rate)
+        return _result('float', 'float64', float_rate)
+
+    datetime_format, datetime_rate = detect_datetime_format(text)
+    if datetime_rate >= MATCH_THRESHOLD:
+        return _result('datetime', 'datetime64', datetime_rate, datetime_format=datetime_format)
+
+    for semantic_type, pattern in [('currency', CURRENCY_PATTERN), ('percent', PERCENT_PATTERN),
+                                   ('float', THOUSANDS_PATTERN)]:
+        rate = _match_rate(text, pattern)
+        if rate >= MATCH_THRESHOLD:
+            return _result(semantic_type, 'float64', rate)
+
+    latlon_rate = _latlon_pair_rate(text)
+    if latlon_rate >= MATCH_THRESHOLD:
+        return _result('geo', 'object', latlon_rate)
+
+    id_rate = max(_match_rate(text, UUID_PATTERN), _match_rate(text, CODE_ID_PATTERN))
+    if unique_ratio > 0.95 and (id_rate >= MATCH_THRESHOLD or _name_has_hint(series.name, ID_NAME_HINTS)):
+        return _result('id', 'object', max(id_rate, 0.8))
+
+    if unique_ratio < 0.5 and unique_count <= 200:
+        return _result('categorical', 'category', 0.7)
+
+    return _result('text', 'object', 0.7)
+
+
+def infer_column_type(series):
+    """Classify a column, reusing the cached result while its content fingerprint is unchanged"""
+    sample = stratified_sample(series)
+    key = column_fingerprint(series, sample)
+    if key in _inference_cache:
+        _inference_cache.move_to_end(key)
+        return _inference_cache[key]
+
+    result = _infer_uncached(series, sample)
+    result['sample_unique_ratio'] = float(sample.nunique() / len(sample)) if len(sample) else 0.0
+    _inference_cache[key] = result
+    if len(_inference_cache) > _CACHE_SIZE:
+        _inference_cache.popitem(last=False)
+    return result
+
+
+def infer_column_types(df):
+    """Classify every column of a DataFrame"""
+    return {col: infer_column_type(df[col]) for col in df.columns}
+
+
+def convert_column(series, inference):
+    """
+    Convert a whole column to its inferred storage type.
+
+    This is the commit-time validation step: the full column is parsed (errors coerced) and
+    the share of non-null values that survived conversion is returned with the result.
+    """
+    semantic_type = inference['semantic_type']
+    non_null = series.notna().sum()
+
+    if semantic_type == 'datetime':
+        fmt = inference.get('datetime_format')
+        if pd.api.types.is_datetime64_any_dtype(series):
+            converted = series
+        elif fmt == 'ISO8601':
+            converted = pd.to_datetime(series, format='ISO8601', errors='coerce')
+        else:
+            converted = pd.to_datetime(series, format=fmt, errors='coerce')
+            if fmt is not None and converted.notna().sum() < series.notna().sum():
+                # Values in other layouts fall back to per-value inference
+                leftovers = converted.isna() & series.notna()
+                converted[leftovers] = pd.to_datetime(series[leftovers], errors='coerce')
+    elif semantic_type == 'boolean':
+        bool_map = {'true': True, 'false': False, '1': True, '0': False, 'yes': True, 'no': False,
+                    'y': True, 'n': False, 't': True, 'f': False}
+        if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            converted = series.astype('boolean')
+        else:
+            converted = series.astype(str).str.strip().str.lower().map(bool_map).astype('boolean')
+    elif semantic_type in NUMERIC_SEMANTIC_TYPES or inference['storage_type'] in ('int64', 'float64'):
+        if pd.api.types.is_numeric_dtype(series):
+            converted = series
+        else:
+            converted, _ = coerce_numeric(series)
+        if inference['storage_type'] == 'int64' and converted.notna().all() and (converted == np.floor(converted)).all():
+            converted = converted.astype('int64')
+    elif inference['storage_type'] == 'category':
+        converted = series.astype('category')
+    else:
+        converted = series
+
+    success_rate = converted.notna().sum() / non_null if non_null else 1.0
+    return converted, float(success_rate)
@@ -6,22 +6,67 @@ import seaborn as sns
 import matplotlib.pyplot as plt
 from plotly.subplots import make_subplots
 
-def create_missing_heatmap(df):
-    """Create a heatmap showing missing values pattern"""
-    missing_data = df.isnull()
-    
-    # Create heatmap
-    fig = px.imshow(
-        missing_data.T,
-        title="Missing Values Heatmap",
-        labels=dict(x="Row Index", y="Columns", color="Missing"),
-        color_continuous_scale=["white", "red"],
-        aspect="auto"
-    )
+def missing_fraction_by_bucket(df, row_buckets=200):
+    """Missing fraction per column within contiguous row buckets (columns x buckets)"""
+    mask = df.isnull().to_numpy()
+    n_buckets = max(1, min(row_buckets, len(df)))
+    starts = np.linspace(0, len(df), n_buckets + 1).astype(np.int64)[:-1]
+    starts = np.unique(starts)
+    sizes = np.diff(np.append(starts, len(df)))
+    
+    fractions = np.add.reduceat(mask, starts, axis=0) / sizes[:, None] if len(df) else np.zeros((0, len(df.columns)))
+    return pd.DataFrame(fractions.T, index=df.columns, columns=starts).round(3)
+
+def create_missing_heatmap(df, mode='auto', row_buckets=200, max_patterns=30, max_raw_rows=1000):
+    """
+    Create a heatmap showing missing values pattern.
+    
+    Modes: 'rows' plots every cell, 'buckets' plots the missing fraction per row bucket and
+    'patterns' plots the most frequent missing-row patterns. 'auto' uses rows for small
+    frames and buckets otherwise, so the figure size does not grow with the row count.
+    """
+    if mode == 'auto':
+        mode = 'rows' if len(df) <= max_raw_rows else 'buckets'
+    
+    if mode == 'patterns':
+        from utils.missingness_engine import get_missingness_profile
+        profile = get_missingness_profile(df, max_patterns=max_patterns)
+        matrix = profile['patterns'].T.astype(int)
+        matrix.columns = [f"#{i + 1} ({rows:,} rows)" for i, rows in enumerate(profile['pattern_rows'])]
+        fig = px.imshow(
+            matrix,
+            title="Most Frequent Missing Patterns",
+            labels=dict(x="Pattern (rows)", y="Columns", color="Missing"),
+            color_continuous_scale=["white", "red"],
+            aspect="auto"
+        )
+        x_title = "Pattern (rows)"
+    elif mode == 'buckets':
+        fractions = missing_fraction_by_bucket(df, row_buckets)
+        fig = px.imshow(
+            fractions,
+            title=f"Missing Values Heatmap ({fractions.shape[1]} row buckets)",
+            labels=dict(x="Starting Row Index", y="Columns", color="Missing Fraction"),
+            color_continuous_scale=["white", "red"],
+            zmin=0,
+            zmax=1,
+            aspect="auto"
+        )
+        x_title = "Starting Row Index"
+    else:
+        missing_data = df.isnull()
+        fig = px.imshow(
+            missing_data.T,
+            title="Missing Values Heatmap",
+            labels=dict(x="Row Index", y="Columns", color="Missing"),
+            color_continuous_scale=["white", "red"],
+            aspect="auto"
+        )
+        x_title = "Row Index"
     
     fig.update_layout(
         height=max(400, len(df.columns) * 20),
-        xaxis_title="Row Index",
+        xaxis_title=x_title,
         yaxis_title="Columns"
     )
     